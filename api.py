@@ -1,48 +1,674 @@
-from fastapi import FastAPI, HTTPException
-import numpy as np
+import asyncio
+import json
+import os
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import Optional
+
+from src.serving.startup import StartupTimer
+
+startup = StartupTimer()
+
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from starlette.background import BackgroundTask
+
+startup.mark("import_fastapi")
 import torch
-from data.process_data import DataCollector
+
+startup.mark("import_torch")
+from data.price_store import CsvFeed, PriceStore, YFinanceFeed
 from src.model.lstm_model import LSTMModel
-from src.utils.model_manager import ModelManager
+from src.serving import config
+from src.serving.batch_predict import parse_stocks, predict_many
+from src.serving.batcher import MicroBatcher
+from src.serving.executors import InflightLimiter, configure_torch_threads, make_executors, release_once
+from src.serving.model_registry import ModelRegistry
+from src.serving.pipeline import (
+    build_input,
+    feature_names,
+    inverse_target,
+    resolve_horizon,
+    resolve_window,
+)
+from src.serving.prediction_cache import PredictionCache, prediction_key
+from src.serving.prediction_log import PredictionLog, input_hash
+from src.serving.shadow import ShadowTracker, input_adapter
+from src.utils import instrumentation
+from src.utils.instrumentation import LATENCY_BUCKETS, Histogram
+
+startup.mark("import_app")
+
+registry = ModelRegistry(LSTMModel, mmap=config.MODEL_MMAP)
+price_store = PriceStore(
+    feed=CsvFeed() if config.PRICE_FEED == "csv" else YFinanceFeed(),
+    root=config.PRICE_STORE_DIR,
+    ttl=config.PRICE_STORE_TTL,
+    max_items=config.PRICE_STORE_MAX_ITEMS,
+)
+batcher = MicroBatcher(
+    lambda: registry.get("champion").model,
+    max_batch_size=config.BATCH_MAX_SIZE,
+    max_wait_ms=config.BATCH_MAX_WAIT_MS,
+)
+limiter = InflightLimiter(config.MAX_INFLIGHT)
+prediction_cache = None
+if config.PREDICTION_CACHE_ENABLED:
+    prediction_cache = PredictionCache(
+        max_items=config.PREDICTION_CACHE_MAX_ITEMS, path=config.PREDICTION_CACHE_PATH
+    )
+    # Champion novo invalida tudo; barra nova (ou revista) invalida só o ticker
+    registry.on_swap(
+        lambda name, previous, entry: prediction_cache.invalidate() if name == "champion" else None
+    )
+    price_store.on_update(lambda ticker, last_date: prediction_cache.invalidate(ticker))
+prediction_log = None
+if config.PREDICTION_LOG_ENABLED:
+    prediction_log = PredictionLog(
+        config.PREDICTION_LOG_DIR,
+        max_queue=config.PREDICTION_LOG_QUEUE_SIZE,
+        flush_interval=config.PREDICTION_LOG_FLUSH_INTERVAL,
+        max_bytes=config.PREDICTION_LOG_MAX_BYTES,
+        rotate_seconds=config.PREDICTION_LOG_ROTATE_SECONDS,
+    )
+shadow = None
+shadow_batcher = None
+if config.SHADOW_ENABLED:
+    shadow = ShadowTracker(min_samples=config.SHADOW_MIN_SAMPLES, margin=config.SHADOW_MARGIN)
+    shadow_batcher = MicroBatcher(
+        lambda: registry.get("challenger").model,
+        max_batch_size=config.BATCH_MAX_SIZE,
+        max_wait_ms=config.BATCH_MAX_WAIT_MS,
+        path="shadow",
+    )
+    # Qualquer troca de modelo recomeça a comparação; a barra seguinte que fecha
+    # realiza as predições pendentes do ticker
+    registry.on_swap(lambda name, previous, entry: reset_shadow())
+    # Challenger registrado depois do startup (ou arquivo ainda inexistente) é
+    # carregado no próximo ciclo do watcher
+    registry.on_refresh(lambda: retry_challenger())
+    price_store.on_update(lambda ticker, last_date: resolve_shadow(ticker))
+fetch_executor = None
+inference_executor = None
+shadow_executor = None
+challenger_error = None
+shadow_tasks = set()
+promotion_lock = threading.Lock()
+
+REQUEST_SECONDS = Histogram(
+    "lstm_http_request_duration_seconds",
+    "HTTP request latency until the response headers are sent",
+    LATENCY_BUCKETS,
+    ("path", "status"),
+)
+instrumentation.register_collector(
+    "lstm_price_store_requests_total",
+    "Price store lookups by result",
+    "counter",
+    lambda: {(("result", "hit"),): price_store.hits, (("result", "miss"),): price_store.misses},
+)
+instrumentation.register_collector(
+    "lstm_inflight_requests",
+    "Requests currently in progress",
+    "gauge",
+    lambda: {(): limiter.inflight},
+)
+instrumentation.register_collector(
+    "lstm_rejected_requests_total",
+    "Requests rejected with 503 because of backpressure",
+    "counter",
+    lambda: {(): limiter.rejected},
+)
+instrumentation.register_collector(
+    "lstm_batcher_queue_depth",
+    "Requests waiting for the micro-batcher",
+    "gauge",
+    lambda: {(): batcher.queue_depth},
+)
+if prediction_cache is not None:
+    instrumentation.register_collector(
+        "lstm_prediction_cache_requests_total",
+        "Prediction cache lookups by result",
+        "counter",
+        lambda: {
+            (("result", "memory_hit"),): prediction_cache.memory_hits,
+            (("result", "disk_hit"),): prediction_cache.disk_hits,
+            (("result", "miss"),): prediction_cache.misses,
+        },
+    )
+if prediction_log is not None:
+    instrumentation.register_collector(
+        "lstm_prediction_log_records_total",
+        "Prediction log records by outcome",
+        "counter",
+        lambda: {
+            (("outcome", "written"),): prediction_log.written,
+            (("outcome", "dropped"),): prediction_log.dropped,
+        },
+    )
+
+
+def load_champion():
+    if config.MLFLOW_MODEL_NAME:
+        import mlflow
+
+        mlflow.set_tracking_uri(uri=config.MLFLOW_TRACKING_URI)
+        registry.load_mlflow("champion", config.MLFLOW_MODEL_NAME, config.MLFLOW_MODEL_ALIAS)
+    else:
+        registry.load("champion", config.MODEL_PATH)
+
+
+def load_challenger():
+    if config.MLFLOW_MODEL_NAME:
+        registry.load_mlflow("challenger", config.MLFLOW_MODEL_NAME, config.MLFLOW_CHALLENGER_ALIAS)
+    elif config.CHALLENGER_MODEL_PATH:
+        registry.load("challenger", config.CHALLENGER_MODEL_PATH)
+    else:
+        return
+    reset_shadow()
+
+
+def retry_challenger():
+    global challenger_error
+    try:
+        registry.get("challenger")
+        return
+    except KeyError:
+        pass
+    try:
+        load_challenger()
+        challenger_error = None
+    except Exception as e:
+        # Sem challenger o serving segue normal, só não há shadow scoring. Loga só
+        # quando o erro muda, não a cada ciclo do watcher
+        if str(e) != challenger_error:
+            print(f"Challenger not loaded: {e}")
+        challenger_error = str(e)
+
+
+def challenger_entry():
+    # None sem challenger ou quando ele já é o champion (mesma versão/artefato)
+    try:
+        challenger = registry.get("challenger")
+    except KeyError:
+        return None
+    champion = registry.get("champion")
+    if challenger.version == champion.version or challenger.version == shadow.promoted_version:
+        return None
+    return challenger
+
+
+def reset_shadow():
+    try:
+        version = registry.get("challenger").version
+    except KeyError:
+        version = None
+    shadow.reset(version)
+
+
+def resolve_shadow(ticker):
+    # Roda dentro do refresh do PriceStore (thread de fetch), nunca no event loop
+    if shadow.resolve(ticker, price_store.peek(ticker)) and config.SHADOW_AUTO_PROMOTE and shadow.should_promote():
+        threading.Thread(target=promote_challenger, name="promote-challenger", daemon=True).start()
+
+
+def promote_challenger():
+    # MLflow: move o alias do champion para a versão do challenger. Arquivo: copia
+    # os artefatos do challenger sobre MODEL_PATH (tmp + replace) e recarrega
+    with promotion_lock:
+        challenger = challenger_entry()
+        if challenger is None:
+            return None
+        # A troca do champion zera o tracker, então guarda os erros antes
+        errors = shadow.errors()
+        if config.MLFLOW_MODEL_NAME:
+            from mlflow import MlflowClient
+
+            MlflowClient().set_registered_model_alias(
+                config.MLFLOW_MODEL_NAME, config.MLFLOW_MODEL_ALIAS, challenger.version
+            )
+            registry.load_mlflow("champion", config.MLFLOW_MODEL_NAME, config.MLFLOW_MODEL_ALIAS)
+        else:
+            source, target = os.path.splitext(challenger.source)[0], os.path.splitext(config.MODEL_PATH)[0]
+            # _training.json leva o cutoff: sem ele o próximo fine-tune partiria do cutoff antigo
+            sidecars = ("_metadata.json", "_scalers.joblib", "_training.json")
+            for suffix in sidecars + (os.path.splitext(challenger.source)[1],):
+                if os.path.exists(source + suffix):
+                    shutil.copyfile(source + suffix, target + suffix + ".tmp")
+                    os.replace(target + suffix + ".tmp", target + suffix)
+                elif suffix in sidecars and os.path.exists(target + suffix):
+                    # Arquivo do champion antigo que não vale para o challenger
+                    os.remove(target + suffix)
+            registry.load("champion", config.MODEL_PATH)
+        shadow.promoted_version = challenger.version
+        shadow.promotions += 1
+        print(
+            f"Challenger version {challenger.version} promoted to champion "
+            f"(rmse {errors['challenger']['rmse']} vs {errors['champion']['rmse']})"
+        )
+        return {"promoted_version": challenger.version, "errors": errors}
+
+
+def warm_forward():
+    # Um forward com entrada zerada inicializa kernels e alocações antes do 1º request
+    entry = registry.get("champion")
+    window = resolve_window(None, entry.scalers)
+    if entry.scalers is None:
+        # Artefato sem scalers: o 1º request reajusta com sklearn, importado aqui
+        import sklearn.preprocessing  # noqa: F401
+    n_features = len(feature_names(entry.scalers))
+    MicroBatcher._forward(entry.model, torch.zeros(1, window, n_features))
+
+
+async def warm_up():
+    loop = asyncio.get_running_loop()
+    try:
+        await loop.run_in_executor(inference_executor, load_champion)
+        startup.mark("load_model")
+        await loop.run_in_executor(inference_executor, warm_forward)
+        startup.mark("warm_forward")
+        registry.start_watcher(interval=config.MODEL_WATCH_INTERVAL)
+        startup.set_ready()
+        if shadow is not None:
+            # Depois do ready: o challenger não atrasa o champion
+            await loop.run_in_executor(shadow_executor, retry_challenger)
+    except Exception as e:
+        startup.fail(e)
+    print(f"Startup: {json.dumps(startup.report())}")
+
+
+@asynccontextmanager
+async def lifespan(app):
+    global fetch_executor, inference_executor, shadow_executor
+
+    configure_torch_threads(config.TORCH_NUM_THREADS)
+    fetch_executor, inference_executor = make_executors(
+        config.FETCH_WORKERS, config.INFERENCE_WORKERS
+    )
+    batcher.executor = inference_executor
+    if config.BATCHING_ENABLED:
+        await batcher.start()
+    if prediction_log is not None:
+        prediction_log.start()
+    if shadow is not None:
+        # Executor próprio: o forward do challenger nunca fica na frente do champion
+        shadow_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="shadow")
+        shadow_batcher.executor = shadow_executor
+        await shadow_batcher.start()
+    startup.mark("executors")
+
+    # O modelo é carregado e aquecido em background: a porta abre logo e
+    # /ready só responde 200 depois do forward de aquecimento
+    warm_task = asyncio.create_task(warm_up())
+    yield
+    warm_task.cancel()
+    await batcher.stop()
+    if shadow is not None:
+        await shadow_batcher.stop()
+        shadow_executor.shutdown(wait=False, cancel_futures=True)
+    registry.stop_watcher()
+    if prediction_cache is not None:
+        prediction_cache.close()
+    if prediction_log is not None:
+        prediction_log.stop()
+    fetch_executor.shutdown(wait=False, cancel_futures=True)
+    inference_executor.shutdown(wait=False, cancel_futures=True)
+
+
+app = FastAPI(lifespan=lifespan)
+
+
+@app.middleware("http")
+async def record_latency(request: Request, call_next):
+    start = time.perf_counter()
+    response = await call_next(request)
+    # Path da rota (não a URL), para não criar uma série por query string
+    route = request.scope.get("route")
+    path = route.path if route is not None else "unmatched"
+    REQUEST_SECONDS.observe(time.perf_counter() - start, path=path, status=response.status_code)
+    return response
+
+
+@app.get("/metrics")
+def metrics():
+    body = instrumentation.render() + "\n".join(REQUEST_SECONDS.render()) + "\n"
+    return PlainTextResponse(body, media_type="text/plain; version=0.0.4")
+
+
+@app.get("/models")
+def models():
+    return registry.stats()
+
+
+@app.get("/ready")
+def ready():
+    return JSONResponse(startup.report(), status_code=200 if startup.ready else 503)
+
+
+@app.get("/stats")
+def stats():
+    return {
+        "batcher": batcher.stats(),
+        "inflight": limiter.stats(),
+        "prediction_cache": prediction_cache.stats() if prediction_cache is not None else None,
+        "prediction_log": prediction_log.stats() if prediction_log is not None else None,
+        "shadow": shadow_stats() if shadow is not None else None,
+        "price_store": {"hits": price_store.hits, "misses": price_store.misses},
+        "stages": instrumentation.STAGE_SECONDS.summary(),
+        "startup": startup.report(),
+    }
+
+
+def shadow_stats():
+    stats = shadow.stats()
+    stats["queue_depth"] = shadow_batcher.queue_depth
+    stats["active"] = startup.ready and challenger_entry() is not None
+    return stats
+
+
+@app.get("/shadow")
+def shadow_status():
+    if shadow is None:
+        raise HTTPException(status_code=404, detail="Shadow scoring is disabled (SHADOW_ENABLED=0)")
+    return shadow_stats()
+
+
+@app.post("/shadow/promote")
+def shadow_promote(force: bool = False):
+    if shadow is None:
+        raise HTTPException(status_code=404, detail="Shadow scoring is disabled (SHADOW_ENABLED=0)")
+    if not force and not shadow.should_promote():
+        raise HTTPException(status_code=409, detail={"detail": "Challenger is not better yet", **shadow.stats()})
+    result = promote_challenger()
+    if result is None:
+        raise HTTPException(status_code=404, detail="No challenger to promote")
+    return result
+
+
+def overloaded():
+    return HTTPException(
+        status_code=503,
+        detail="Server overloaded, retry later",
+        headers={"Retry-After": str(config.RETRY_AFTER_SECONDS)},
+    )
+
+
+def not_ready():
+    return HTTPException(
+        status_code=503,
+        detail="Model is still warming up, retry later",
+        headers={"Retry-After": str(config.RETRY_AFTER_SECONDS)},
+    )
+
+
+def cache_key(stock, window, start_date, entry):
+    # Sem os preços em memória (TTL expirado) não dá para saber a última barra
+    # sem I/O; nesse caso a predição segue o caminho normal
+    if prediction_cache is None:
+        return None
+    last_date = price_store.fresh_last_date(stock)
+    if last_date is None:
+        return None
+    return prediction_key(stock, window, start_date, entry.version, last_date)
+
+
+def remember_prediction(stock, window, start_date, entry, path):
+    # O cache guarda o caminho completo; cada resposta recorta o horizonte pedido
+    key = cache_key(stock, window, start_date, entry)
+    if key is not None:
+        prediction_cache.put(key, stock, {"stock": stock, "predicted_path": path})
+
+
+def log_prediction(stock, window, start_date, entry, path, endpoint, digest=None, latency=None, cached=False):
+    # Só monta o registro e enfileira; a escrita fica com a thread do PredictionLog
+    if prediction_log is None:
+        return
+    record = {
+        "ts": time.time(),
+        "endpoint": endpoint,
+        "stock": stock,
+        "window": window,
+        "start_date": start_date,
+        "model_version": entry.version,
+        "input_hash": digest,
+        "predicted_path": path,
+        "cached": cached,
+        "latency": latency or {},
+    }
+    prediction_log.log(record)
+
+
+def model_horizon(entry):
+    return entry.scalers.get("horizon", 1) if entry.scalers is not None else 1
+
+
+def format_prediction(stock, path, horizon):
+    result = {"stock": stock, "predicted_value": path[0]}
+    if horizon is not None:
+        result["horizon"] = horizon
+        result["predicted_path"] = path[:horizon]
+    return result
+
+
+async def run_model(model, input_seq):
+    # `model` vem da entry pega no início do request, a mesma dos scalers da entrada
+    input_tensor = torch.from_numpy(input_seq)
+    if config.BATCHING_ENABLED:
+        return await batcher.submit(input_tensor, model)
+    return await asyncio.get_running_loop().run_in_executor(
+        inference_executor, MicroBatcher._forward, model, input_tensor.unsqueeze(0)
+    )
+
+
+def schedule_shadow(stock, input_seq, target_scaler, champion_value, champion):
+    # Dispara o challenger em background com a janela já montada; a resposta do
+    # champion não espera por ele. Com a fila cheia a amostra é descartada
+    if shadow is None or not shadow_batcher.running:
+        return
+    challenger = challenger_entry()
+    last_date = price_store.fresh_last_date(stock)
+    if challenger is None or last_date is None:
+        return
+    if shadow_batcher.queue_depth >= config.SHADOW_MAX_QUEUE:
+        shadow.skipped += 1
+        return
+    task = asyncio.create_task(
+        shadow_score(stock, last_date, input_seq, target_scaler, champion_value, champion, challenger)
+    )
+    shadow_tasks.add(task)
+    task.add_done_callback(shadow_tasks.discard)
+
+
+async def shadow_score(stock, last_date, input_seq, target_scaler, champion_value, champion, challenger):
+    try:
+        adapt = input_adapter(champion.scalers, challenger.scalers)
+        output = await shadow_batcher.submit(torch.from_numpy(adapt(input_seq)), challenger.model)
+        if challenger.scalers is not None:
+            target_scaler = challenger.scalers["target"]
+        value = float(inverse_target(target_scaler, output)[0])
+        shadow.record(stock, last_date, champion_value, value)
+    except Exception as e:
+        shadow.failed += 1
+        if shadow.failed == 1:
+            print(f"Shadow scoring failed: {e}")
+
+
+def profiled_predict(stock, window, start_date, entry, horizon):
+    # Roda o request inteiro na thread atual sob o torch profiler (sem batcher
+    # nem cache) e salva um trace Chrome/Perfetto em PROFILE_DIR
+    from torch.profiler import ProfilerActivity, profile, record_function
+
+    with profile(activities=[ProfilerActivity.CPU], record_shapes=True) as prof:
+        with record_function("build_input"):
+            input_seq, target_scaler = build_input(
+                stock, window, start_date, price_store, entry.scalers
+            )
+        with record_function("forward"):
+            output = MicroBatcher._forward(entry.model, torch.from_numpy(input_seq).unsqueeze(0))
+        with record_function("inverse_transform"):
+            path = inverse_target(target_scaler, output).tolist()
+
+    os.makedirs(config.PROFILE_DIR, exist_ok=True)
+    trace_path = os.path.join(
+        config.PROFILE_DIR, f"predict-{stock}-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}.json"
+    )
+    prof.export_chrome_trace(trace_path)
+    return dict(format_prediction(stock, path, horizon), trace=trace_path)
 
-app = FastAPI()
 
 @app.get("/predict")
-def predict(stock: str = "PETR4.SA", window: int = 30, start_date: str = "2024-01-01"):
-    try:
-        # Initialize data collector and fetch data
-        collector = DataCollector(stock)
-        collector.get_data(start_date=start_date)
-        collector.split_data(test_size=0.1, window=window)
-        collector.standard_scale()
-        
-        if collector.data is None:
-            raise HTTPException(status_code=500, detail="DataCollector missing 'data' attribute with fetched prices")
-        
-        close_prices = np.array(collector.data["close"])
-        if close_prices.shape[0] < window:
-            raise HTTPException(status_code=400, detail=f"Not enough data to form a window of size {window}")
-        
-        # Get the last `window` number of close prices and reshape
-        latest_window = close_prices[-window:]
-        input_seq = latest_window.reshape(window, 1)
-        
-        # Load trained model
-        device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-        model = ModelManager.load_model(LSTMModel, "models/lstm_petra.pth")
-        model = model.to(device)
-        model.eval()
-        
-        # Convert input sequence to torch tensor with batch dimension
-        input_tensor = torch.tensor(input_seq, dtype=torch.float32).unsqueeze(0).to(device)
-        
-        with torch.no_grad():
-            prediction_scaled = model(input_tensor)
-        
-        # Get prediction value and inverse transform to original scale
-        pred_value = prediction_scaled.cpu().numpy().flatten()[0]
-        pred_original = float(collector.target_scaler.inverse_transform(np.array([[pred_value]]))[0, 0])
-        
-        return {"stock": stock, "predicted_value": pred_original}
+async def predict(
+    stock: str = "PETR4.SA",
+    window: Optional[int] = None,
+    start_date: str = "2024-01-01",
+    horizon: Optional[int] = None,
+    profile: bool = False,
+):
+    if not startup.ready:
+        raise not_ready()
+    if profile and not config.PROFILING_ENABLED:
+        raise HTTPException(status_code=403, detail="Profiling is disabled (set PROFILING_ENABLED=1)")
+    entry = registry.get("champion")
+    try:
+        window = resolve_window(window, entry.scalers)
+        horizon = resolve_horizon(horizon, entry.scalers)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if profile:
+        try:
+            return await asyncio.get_running_loop().run_in_executor(
+                inference_executor, profiled_predict, stock, window, start_date, entry, horizon
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    request_start = time.perf_counter()
+    if prediction_cache is not None:
+        cached = prediction_cache.get(cache_key(stock, window, start_date, entry))
+        if cached is not None:
+            log_prediction(
+                stock, window, start_date, entry, cached["predicted_path"], "predict",
+                latency={"total_s": time.perf_counter() - request_start}, cached=True,
+            )
+            return format_prediction(stock, cached["predicted_path"], horizon)
+
+    if not limiter.try_acquire():
+        raise overloaded()
+    try:
+        # Fetch data and build the scaled input window on the fetch executor
+        stage_start = time.perf_counter()
+        input_seq, target_scaler = await asyncio.get_running_loop().run_in_executor(
+            fetch_executor, build_input, stock, window, start_date, price_store, entry.scalers
+        )
+        fetch_s = time.perf_counter() - stage_start
+
+        # Um forward devolve todos os passos do horizonte do modelo
+        stage_start = time.perf_counter()
+        prediction_scaled = await run_model(entry.model, input_seq)
+        forward_s = time.perf_counter() - stage_start
+
+        # Inverse transform the whole path to the original scale
+        path = inverse_target(target_scaler, prediction_scaled).tolist()
+
+        remember_prediction(stock, window, start_date, entry, path)
+        schedule_shadow(stock, input_seq, target_scaler, path[0], entry)
+        log_prediction(
+            stock, window, start_date, entry, path, "predict",
+            digest=input_hash(input_seq) if prediction_log is not None else None,
+            latency={"fetch_s": fetch_s, "forward_s": forward_s, "total_s": time.perf_counter() - request_start},
+        )
+        return format_prediction(stock, path, horizon)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        limiter.release()
+
+
+@app.get("/predict/batch")
+def predict_batch(
+    stocks: str,
+    window: Optional[int] = None,
+    start_date: str = "2024-01-01",
+    horizon: Optional[int] = None,
+):
+    if not startup.ready:
+        raise not_ready()
+    tickers = parse_stocks(stocks)
+    if not tickers:
+        raise HTTPException(status_code=400, detail="No stocks given")
+    if len(tickers) > config.BATCH_MAX_TICKERS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Too many stocks ({len(tickers)}), max is {config.BATCH_MAX_TICKERS}",
+        )
+
+    entry = registry.get("champion")
+    try:
+        window = resolve_window(window, entry.scalers)
+        horizon = resolve_horizon(horizon, entry.scalers)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    cached, missing = [], []
+    for ticker in tickers:
+        hit = None
+        if prediction_cache is not None:
+            hit = prediction_cache.get(cache_key(ticker, window, start_date, entry))
+        if hit is not None:
+            cached.append(hit)
+        else:
+            missing.append(ticker)
+
+    # Só os misses buscam e rodam o modelo: batch todo em cache não ocupa o limiter
+    release = None
+    results = []
+    if missing:
+        if not limiter.try_acquire():
+            raise overloaded()
+        release = release_once(limiter)
+        results = predict_many(
+            entry.model,
+            missing,
+            window=window,
+            start_date=start_date,
+            store=price_store,
+            max_workers=config.BATCH_FETCH_WORKERS,
+            scalers=entry.scalers,
+            horizon=model_horizon(entry),
+            audit=prediction_log is not None,
+            fetch_executor=fetch_executor,
+            inference_executor=inference_executor,
+        )
+
+    def stream():
+        try:
+            for hit in cached:
+                log_prediction(hit["stock"], window, start_date, entry, hit["predicted_path"], "predict_batch", cached=True)
+                yield json.dumps(format_prediction(hit["stock"], hit["predicted_path"], horizon)) + "\n"
+            for result in results:
+                if "error" in result:
+                    yield json.dumps(result) + "\n"
+                    continue
+                remember_prediction(result["stock"], window, start_date, entry, result["predicted_path"])
+                log_prediction(
+                    result["stock"], window, start_date, entry, result["predicted_path"], "predict_batch",
+                    digest=result.get("input_hash"), latency={"forward_s": result.get("forward_s")},
+                )
+                yield json.dumps(format_prediction(result["stock"], result["predicted_path"], horizon)) + "\n"
+        finally:
+            if release is not None:
+                release()
+
+    # Um JSON por linha (NDJSON), enviado conforme cada chunk fica pronto. O
+    # BackgroundTask libera o limiter mesmo se o stream nunca chegar a começar
+    return StreamingResponse(
+        stream(),
+        media_type="application/x-ndjson",
+        background=BackgroundTask(release) if release is not None else None,
+    )
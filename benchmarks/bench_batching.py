@@ -0,0 +1,90 @@
+import argparse
+import asyncio
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import numpy as np
+import torch
+
+from src.model.lstm_model import LSTMModel
+from src.serving.batcher import MicroBatcher
+from src.utils.model_manager import ModelManager
+
+
+def summarize(name, latencies, elapsed, extra=""):
+    latencies = np.array(latencies) * 1000
+    print(
+        f"{name:<12} {len(latencies) / elapsed:10.1f} req/s   "
+        f"p50 {np.percentile(latencies, 50):7.2f} ms   "
+        f"p99 {np.percentile(latencies, 99):7.2f} ms   {extra}"
+    )
+
+
+async def run_per_request(model, inputs, concurrency):
+    # Caminho atual: cada request faz seu próprio forward com batch 1
+    loop = asyncio.get_running_loop()
+    executor = ThreadPoolExecutor(max_workers=concurrency)
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one(x):
+        async with semaphore:
+            start = time.perf_counter()
+            await loop.run_in_executor(executor, MicroBatcher._forward, model, x.unsqueeze(0))
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(x) for x in inputs))
+    elapsed = time.perf_counter() - start
+    executor.shutdown()
+    return latencies, elapsed
+
+
+async def run_batched(model, inputs, concurrency, max_batch_size, max_wait_ms):
+    batcher = MicroBatcher(lambda: model, max_batch_size=max_batch_size, max_wait_ms=max_wait_ms)
+    await batcher.start()
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one(x):
+        async with semaphore:
+            start = time.perf_counter()
+            await batcher.submit(x)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(x) for x in inputs))
+    elapsed = time.perf_counter() - start
+    await batcher.stop()
+    return latencies, elapsed, batcher.stats()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-request vs micro-batched inference")
+    parser.add_argument("--model", type=str, default="models/lstm_petra.pth")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32, 128])
+    parser.add_argument("--window", type=int, default=30)
+    parser.add_argument("--max_batch_size", type=int, default=64)
+    parser.add_argument("--max_wait_ms", type=float, default=5.0)
+    args = parser.parse_args()
+
+    model = ModelManager.load_model(LSTMModel, args.model)
+    inputs = torch.randn(args.requests, args.window, 1)
+
+    for concurrency in args.concurrency:
+        print(f"\nconcurrency={concurrency}")
+        latencies, elapsed = asyncio.run(run_per_request(model, inputs, concurrency))
+        summarize("per-request", latencies, elapsed)
+        latencies, elapsed, stats = asyncio.run(
+            run_batched(model, inputs, concurrency, args.max_batch_size, args.max_wait_ms)
+        )
+        summarize("batched", latencies, elapsed, f"avg batch {stats['avg_batch_size']:.1f}")
+
+
+if __name__ == "__main__":
+    main()
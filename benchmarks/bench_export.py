@@ -0,0 +1,71 @@
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+
+def rss_bytes():
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+def measure(path, window, repeats, queue):
+    # Roda num processo novo para medir imports + carga + RSS de forma isolada
+    start = time.perf_counter()
+    rss_before = rss_bytes()
+    import numpy as np
+    import torch
+
+    from src.model.lstm_model import LSTMModel
+    from src.utils.model_manager import ModelManager
+
+    torch.set_num_threads(1)
+    if path.endswith(".pth"):
+        model = ModelManager.load_model(LSTMModel, path).cpu()
+    else:
+        model = ModelManager.load_exported(path)
+    load_s = time.perf_counter() - start
+
+    result = {"artifact": path, "load_s": load_s, "size_bytes": os.path.getsize(path)}
+    for batch in (1, 64):
+        x = torch.randn(batch, window, 1)
+        with torch.no_grad():
+            for _ in range(10):
+                model(x)
+            latencies = []
+            for _ in range(repeats):
+                t0 = time.perf_counter()
+                model(x)
+                latencies.append(time.perf_counter() - t0)
+        result[f"p50_ms_b{batch}"] = float(np.percentile(latencies, 50) * 1000)
+        result[f"p99_ms_b{batch}"] = float(np.percentile(latencies, 99) * 1000)
+    result["rss_mb"] = (rss_bytes() - rss_before) / 2**20
+    queue.put(result)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latency/memory of eager vs exported artifacts")
+    parser.add_argument("artifacts", nargs="*", default=["models/lstm_petra.pth"])
+    parser.add_argument("--window", type=int, default=30)
+    parser.add_argument("--repeats", type=int, default=200)
+    args = parser.parse_args()
+
+    context = multiprocessing.get_context("spawn")
+    print(f"{'artifact':<40} {'size KB':>8} {'load s':>7} {'RSS MB':>7} {'b1 p50':>8} {'b1 p99':>8} {'b64 p50':>8}")
+    for path in args.artifacts:
+        queue = context.Queue()
+        process = context.Process(target=measure, args=(path, args.window, args.repeats, queue))
+        process.start()
+        r = queue.get()
+        process.join()
+        print(
+            f"{r['artifact']:<40} {r['size_bytes'] / 1024:8.1f} {r['load_s']:7.2f} {r['rss_mb']:7.1f} "
+            f"{r['p50_ms_b1']:8.3f} {r['p99_ms_b1']:8.3f} {r['p50_ms_b64']:8.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+
+def memory_mb():
+    # Rss e Pss (o Pss divide cada página compartilhada pelo nº de processos que a mapeiam)
+    values = {}
+    with open("/proc/self/smaps_rollup") as f:
+        for line in f:
+            name, _, rest = line.partition(":")
+            if name in ("Rss", "Pss"):
+                values[name.lower()] = int(rest.split()[0]) / 1024
+    return values
+
+
+def worker(path, mmap, window, loaded, release, queue):
+    # Simula um worker do uvicorn: carrega o modelo, roda um forward e fica vivo
+    # até todos carregarem, para o Pss refletir o compartilhamento real
+    start = time.perf_counter()
+    import torch
+
+    from src.model.lstm_model import LSTMModel
+    from src.utils.model_manager import ModelManager
+
+    torch.set_num_threads(1)
+    before = memory_mb()
+    model = ModelManager.load_model(LSTMModel, path, mmap=mmap)
+    load_s = time.perf_counter() - start
+    with torch.no_grad():
+        model(torch.zeros(1, window, model.lstm.input_size))
+    loaded.wait()
+    after = memory_mb()
+    queue.put({
+        "load_s": load_s,
+        "rss_mb": after["rss"],
+        "pss_mb": after["pss"],
+        "model_rss_mb": after["rss"] - before["rss"],
+    })
+    release.wait()
+
+
+def run(path, mmap, workers, window):
+    context = multiprocessing.get_context("spawn")
+    loaded = context.Barrier(workers + 1)
+    release = context.Event()
+    queue = context.Queue()
+    processes = [
+        context.Process(target=worker, args=(path, mmap, window, loaded, release, queue))
+        for _ in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    loaded.wait()
+    results = [queue.get() for _ in processes]
+    release.set()
+    for process in processes:
+        process.join()
+    return results
+
+
+def synthetic_model(hidden_size, num_layers, directory):
+    # Modelo maior que o de produção (~1 MB) para os pesos dominarem a medida
+    import torch
+
+    from src.model.lstm_model import LSTMModel
+    from src.utils.model_manager import ModelManager
+
+    model_args = {"input_size": 1, "hidden_size": hidden_size, "num_layers": num_layers, "output_size": 1}
+    path = os.path.join(directory, "bench_memory.pth")
+    with torch.device("meta"):
+        template = LSTMModel(**model_args)
+    state = {name: torch.randn(t.shape) * 0.01 for name, t in template.state_dict().items()}
+    with open(path.replace(".pth", "_metadata.json"), "w") as f:
+        json.dump(model_args, f)
+    torch.save(state, path)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Resident memory per worker with copied vs memory-mapped weights")
+    parser.add_argument("--model", type=str, default=None, help=".pth to load (default: a synthetic model)")
+    parser.add_argument("--hidden_size", type=int, default=1024, help="Hidden size of the synthetic model")
+    parser.add_argument("--num_layers", type=int, default=4)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--window", type=int, default=30)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="bench_memory_") as directory:
+        path = args.model or synthetic_model(args.hidden_size, args.num_layers, directory)
+        print(f"{path}: {os.path.getsize(path) / 2**20:.1f} MB of weights")
+        print(f"{'mode':<6} {'workers':>7} {'load s':>7} {'RSS MB':>8} {'PSS MB':>8} {'PSS total':>10} {'model RSS':>10}")
+        for workers in args.workers:
+            for mmap in (False, True):
+                results = run(path, mmap, workers, args.window)
+                mean = {k: sum(r[k] for r in results) / len(results) for k in results[0]}
+                print(
+                    f"{'mmap' if mmap else 'copy':<6} {workers:>7} {mean['load_s']:7.2f} {mean['rss_mb']:8.1f} "
+                    f"{mean['pss_mb']:8.1f} {mean['pss_mb'] * workers:10.1f} {mean['model_rss_mb']:10.1f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,252 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import numpy as np
+import pandas as pd
+import torch
+from torch.utils.data import DataLoader
+
+CSV_PATH = "data/PETRA_4.csv"
+BASELINE_PATH = "benchmarks/baseline.json"
+OUTPUT_PATH = "benchmarks/results/latest.json"
+
+
+def synthetic_prices(n, seed=0):
+    # Passeio aleatório geométrico, com o mesmo formato de frame do DataCollector
+    rng = np.random.default_rng(seed)
+    closes = 20 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+    dates = pd.date_range("2000-01-03", periods=n, freq="min")
+    return pd.DataFrame({"date": dates, "close": closes})
+
+
+def csv_prices():
+    return pd.read_csv(CSV_PATH, parse_dates=["date"])
+
+
+def timeit(fn, repeat):
+    # Melhor de `repeat` execuções (após um aquecimento), em ms: o mínimo é bem
+    # menos ruidoso que a média para comparar com o baseline
+    fn()
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times) * 1000
+
+
+def result(value, unit, better="lower", gate=True):
+    # gate=False: só reportado, não falha a comparação (ex.: p99, muito ruidoso)
+    return {"value": round(value, 4), "unit": unit, "better": better, "gate": gate}
+
+
+def collector_for(data, window=30):
+    from data.process_data import DataCollector
+
+    collector = DataCollector("BENCH")
+    collector.data = data
+    collector.split_data(test_size=0.2, window=window)
+    collector.standard_scale()
+    return collector
+
+
+def bench_data(lengths, repeat):
+    from data.process_data import DataCollector
+
+    results = {}
+    for name, data in [("csv", csv_prices())] + [(str(n), synthetic_prices(n)) for n in lengths]:
+        collector = DataCollector("BENCH")
+        collector.data = data
+
+        def run():
+            collector.split_data(test_size=0.2, window=30)
+            collector.standard_scale()
+
+        results[f"split_scale/{name}"] = result(timeit(run, repeat), "ms")
+    return results
+
+
+def bench_dataset(repeat):
+    from src.utils.dataset import TimeSeriesDataset
+
+    collector = collector_for(csv_prices())
+    dataset = TimeSeriesDataset(collector.X_train, collector.y_train)
+
+    def run():
+        for _ in DataLoader(dataset, batch_size=64, shuffle=True):
+            pass
+
+    return {"dataset_iter/csv": result(timeit(run, repeat), "ms")}
+
+
+def bench_training(epochs, repeat):
+    from src.model.lstm_model import LSTMModel
+    from src.training.train import evaluate_model, train_model
+    from src.utils.dataset import TimeSeriesDataset
+
+    torch.manual_seed(0)
+    collector = collector_for(csv_prices())
+    train_dataset = TimeSeriesDataset(collector.X_train, collector.y_train)
+    test_dataset = TimeSeriesDataset(collector.X_test, collector.y_test)
+    model = LSTMModel(input_size=1, hidden_size=50, num_layers=3, output_size=1)
+
+    def run_train():
+        with contextlib.redirect_stdout(io.StringIO()):
+            train_model(model, train_dataset, test_dataset, num_epochs=epochs, batch_size=256, shuffle=True)
+
+    train_ms = timeit(run_train, repeat)
+    samples_per_sec = len(train_dataset) * epochs / (train_ms / 1000)
+    return {
+        "train/samples_per_sec": result(samples_per_sec, "samples/s", better="higher"),
+        "evaluate/csv": result(timeit(lambda: evaluate_model(model, test_dataset), repeat), "ms"),
+    }
+
+
+def bench_predict(concurrency_levels, requests):
+    # /predict de ponta a ponta via TestClient, com feed CSV e um store temporário
+    os.environ["PRICE_FEED"] = "csv"
+    # Sem o cache de predições, senão todo request depois do 1º é um hit e o gate
+    # não mede o pipeline; o custo de um hit é medido à parte em predict_cache/hit
+    os.environ["PREDICTION_CACHE_ENABLED"] = "0"
+    os.environ.setdefault("PRICE_STORE_DIR", tempfile.mkdtemp(prefix="bench_store_"))
+    os.environ.setdefault("PREDICTION_LOG_DIR", tempfile.mkdtemp(prefix="bench_log_"))
+    from fastapi.testclient import TestClient
+
+    import api
+
+    results = {}
+    with contextlib.redirect_stdout(io.StringIO()), TestClient(api.app) as client:
+        deadline = time.monotonic() + 60
+        while client.get("/ready").status_code != 200:
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"API not ready: {client.get('/ready').json()}")
+            time.sleep(0.05)
+        client.get("/predict")
+
+        def one(_):
+            start = time.perf_counter()
+            response = client.get("/predict")
+            response.raise_for_status()
+            return time.perf_counter() - start
+
+        for concurrency in concurrency_levels:
+            with ThreadPoolExecutor(max_workers=concurrency) as executor:
+                start = time.perf_counter()
+                latencies = np.array(list(executor.map(one, range(requests)))) * 1000
+                elapsed = time.perf_counter() - start
+            results[f"predict/c{concurrency}/p50"] = result(np.percentile(latencies, 50), "ms")
+            results[f"predict/c{concurrency}/p99"] = result(np.percentile(latencies, 99), "ms", gate=False)
+            results[f"predict/c{concurrency}/rps"] = result(requests / elapsed, "req/s", better="higher")
+    results.update(bench_cache_hit())
+    return results
+
+
+def bench_cache_hit(lookups=10_000):
+    from src.serving.prediction_cache import PredictionCache, prediction_key
+
+    cache = PredictionCache()
+    key = prediction_key("PETR4.SA", 30, "2024-01-01", "v1", "2025-05-16")
+    cache.put(key, "PETR4.SA", {"stock": "PETR4.SA", "predicted_path": [32.0]})
+
+    def run():
+        for _ in range(lookups):
+            cache.get(key)
+
+    return {"predict_cache/hit": result(timeit(run, 5) * 1000 / lookups, "us")}
+
+
+def compare(results, baseline, tolerance):
+    # Devolve (nome, baseline, atual, variação relativa, regrediu) para cada
+    # benchmark presente nos dois lados; variação > 0 significa pior
+    rows = []
+    for name, current in results.items():
+        reference = baseline.get(name)
+        if reference is None or not reference["value"]:
+            continue
+        change = (current["value"] - reference["value"]) / reference["value"]
+        if current["better"] == "higher":
+            change = -change
+        regressed = current.get("gate", True) and change > tolerance
+        rows.append((name, reference["value"], current["value"], change, regressed))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmarks for the data, training and serving hot paths")
+    parser.add_argument("--suites", nargs="+", default=["data", "dataset", "train", "predict"])
+    parser.add_argument("--lengths", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--epochs", type=int, default=3)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--output", type=str, default=OUTPUT_PATH)
+    parser.add_argument("--baseline", type=str, default=BASELINE_PATH)
+    parser.add_argument("--tolerance", type=float, default=0.5, help="Max relative slowdown before failing")
+    parser.add_argument("--update_baseline", action="store_true")
+    args = parser.parse_args()
+
+    torch.set_num_threads(1)
+    results = {}
+    if "data" in args.suites:
+        results.update(bench_data(args.lengths, args.repeat))
+    if "dataset" in args.suites:
+        results.update(bench_dataset(args.repeat))
+    if "train" in args.suites:
+        results.update(bench_training(args.epochs, max(1, args.repeat // 5)))
+    if "predict" in args.suites:
+        results.update(bench_predict(args.concurrency, args.requests))
+
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "torch": torch.__version__,
+            "machine": platform.machine(),
+            "cpu_count": os.cpu_count(),
+        },
+        "results": results,
+    }
+    os.makedirs(os.path.dirname(args.output), exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=4)
+
+    if args.update_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=4)
+        print(f"Baseline written to {args.baseline}")
+
+    if not os.path.isfile(args.baseline):
+        for name, current in results.items():
+            print(f"{name:<28} {current['value']:>12.3f} {current['unit']}")
+        print(f"\nNo baseline at {args.baseline}; run with --update_baseline to create one")
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)["results"]
+
+    rows = compare(results, baseline, args.tolerance)
+    print(f"{'benchmark':<28} {'baseline':>12} {'current':>12} {'change':>8}")
+    for name, reference, current, change, regressed in rows:
+        flag = "  REGRESSION" if regressed else ""
+        print(f"{name:<28} {reference:>12.3f} {current:>12.3f} {change:>+8.1%}{flag}")
+
+    regressions = [row[0] for row in rows if row[4]]
+    if regressions:
+        print(f"\n{len(regressions)} benchmark(s) regressed more than {args.tolerance:.0%}: {', '.join(regressions)}")
+        return 1
+    print(f"\nResults written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
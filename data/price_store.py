@@ -0,0 +1,174 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from src.utils.features import OHLCV_COLUMNS
+
+
+class YFinanceFeed:
+    def fetch(self, ticker, start=None):
+        import yfinance as yf
+
+        stock = yf.Ticker(ticker)
+        if start is None:
+            collected = stock.history(period="max", auto_adjust=True)
+        else:
+            collected = stock.history(start=start, auto_adjust=True)
+        collected.index = collected.index.tz_localize(None)
+        data = pd.DataFrame({"date": collected.index})
+        for column in OHLCV_COLUMNS:
+            data[column] = collected[column.capitalize()].values
+        return data
+
+
+class CsvFeed:
+    # Feed local (ex.: PETRA_4.csv) para testes e para quando o yfinance falha
+    def __init__(self, path=os.path.join("data", "PETRA_4.csv")):
+        self.path = path
+
+    def fetch(self, ticker, start=None):
+        data = pd.read_csv(self.path, parse_dates=["date"])
+        if start is not None:
+            data = data[data["date"] >= pd.to_datetime(start)]
+        return data.reset_index(drop=True)
+
+
+class PriceStore:
+    def __init__(self, feed=None, root=os.path.join("data", "store"), ttl=300, max_items=256):
+        self.feed = feed if feed is not None else YFinanceFeed()
+        self.root = root
+        self.ttl = ttl
+        self.max_items = max_items
+        self.hits = 0
+        self.misses = 0
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self._ticker_locks = {}
+        self._update_listeners = []
+
+    def on_update(self, callback):
+        # callback(ticker, last_date), chamado quando a última barra de um ticker
+        # muda em um refresh
+        self._update_listeners.append(callback)
+
+    def _path(self, ticker):
+        return os.path.join(self.root, f"{ticker}.parquet")
+
+    def _ticker_lock(self, ticker):
+        with self._lock:
+            return self._ticker_locks.setdefault(ticker, threading.Lock())
+
+    def _remember(self, ticker, data):
+        with self._lock:
+            self._cache[ticker] = (time.monotonic(), data)
+            self._cache.move_to_end(ticker)
+            while len(self._cache) > self.max_items:
+                self._cache.popitem(last=False)
+
+    def _cached(self, ticker):
+        with self._lock:
+            item = self._cache.get(ticker)
+            if item is not None:
+                self._cache.move_to_end(ticker)
+        return item
+
+    def _load_disk(self, ticker):
+        path = self._path(ticker)
+        if not os.path.exists(path):
+            return None
+        return pd.read_parquet(path, memory_map=True)
+
+    def _save_disk(self, ticker, data):
+        os.makedirs(self.root, exist_ok=True)
+        tmp_path = self._path(ticker) + ".tmp"
+        data.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, self._path(ticker))
+
+    def _refresh(self, ticker, cached):
+        if cached is None:
+            cached = self._load_disk(ticker)
+
+        if cached is None or cached.empty:
+            data = self.feed.fetch(ticker)
+        else:
+            # Busca só a cauda a partir da última barra; ela é rebuscada porque
+            # pode ter sido salva antes do fechamento do pregão
+            last_date = cached["date"].iloc[-1]
+            try:
+                tail = self.feed.fetch(ticker, start=last_date)
+            except Exception as e:
+                print(f"Error fetching new bars for {ticker}, serving cached data: {e}")
+                return cached
+            if tail.empty or not (tail["date"] == last_date).any():
+                # Feed sem dados (o yfinance devolve frame vazio em rate limit) ou sem a
+                # barra de referência: descartar a última barra em cache perderia dados
+                return cached
+            if not set(tail.columns) <= set(cached.columns):
+                # Store antigo (só close) e feed com OHLCV: rebusca tudo
+                data = self.feed.fetch(ticker)
+            else:
+                data = pd.concat([cached[cached["date"] < last_date], tail], ignore_index=True)
+
+        columns = ["date"] + [c for c in OHLCV_COLUMNS if c in data]
+        data = data[columns].sort_values("date", kind="stable")
+        data = data.drop_duplicates("date", keep="last").reset_index(drop=True)
+        self._save_disk(ticker, data)
+        return data
+
+    def history(self, ticker):
+        item = self._cached(ticker)
+        if item is not None and time.monotonic() - item[0] < self.ttl:
+            self.hits += 1
+            return item[1]
+
+        with self._ticker_lock(ticker):
+            # Outra thread pode ter atualizado enquanto esperávamos o lock
+            current = self._cached(ticker)
+            if current is not None and time.monotonic() - current[0] < self.ttl:
+                self.hits += 1
+                return current[1]
+            self.misses += 1
+            previous = current[1] if current is not None else None
+            data = self._refresh(ticker, previous)
+            self._remember(ticker, data)
+            if previous is not None and not previous.empty and not data.empty:
+                # Barra nova, ou a última barra foi revista (pregão ainda aberto)
+                last, previous_last = data.iloc[-1], previous.iloc[-1]
+                if last["date"] != previous_last["date"] or last["close"] != previous_last["close"]:
+                    for callback in self._update_listeners:
+                        callback(ticker, data["date"].iloc[-1])
+            return data
+
+    def fresh_last_date(self, ticker):
+        # Data da última barra se o ticker está em memória e dentro do TTL; não faz I/O
+        item = self._cached(ticker)
+        if item is None or time.monotonic() - item[0] >= self.ttl or item[1].empty:
+            return None
+        return item[1]["date"].iloc[-1]
+
+    def peek(self, ticker):
+        # Histórico em memória sem olhar o TTL nem fazer I/O (None se não está no cache);
+        # seguro dentro de um callback de on_update
+        item = self._cached(ticker)
+        return item[1] if item is not None else None
+
+    def get_range(self, ticker, start_date=None, end_date=None):
+        data = self.history(ticker)
+        dates = data["date"].values
+        lo, hi = 0, len(dates)
+        if start_date:
+            lo = np.searchsorted(dates, np.datetime64(pd.to_datetime(start_date)), side="left")
+        if end_date:
+            hi = np.searchsorted(dates, np.datetime64(pd.to_datetime(end_date)), side="right")
+        return data.iloc[lo:hi].reset_index(drop=True)
+
+    def invalidate(self, ticker=None):
+        with self._lock:
+            if ticker is None:
+                self._cache.clear()
+            else:
+                self._cache.pop(ticker, None)
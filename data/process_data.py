@@ -1,69 +1,138 @@
 import os
+import sys
 import pandas as pd
-import yfinance as yf
-from sklearn.preprocessing import MinMaxScaler, StandardScaler
 import numpy as np
-import requests 
+
+# Permite rodar como script (python data/process_data.py, make process-data)
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.utils.features import OHLCV_COLUMNS, build_features
+from src.utils.instrumentation import timed
+from src.utils.windows import make_windows, split_windows
+
+# Ticker cujos preços estão em data/PETRA_4.csv (fallback quando o yfinance falha)
+FALLBACK_TICKER = "PETR4.SA"
+
 
 class DataCollector:
-    def __init__(self, ticker):
+    def __init__(self, ticker, store=None, features=None):
         self.ticker = ticker
+        self.store = store
+        # None: só o close (modelos antigos, input_size=1); senão, nomes de
+        # src.utils.features com o close primeiro
+        self.features = list(features) if features is not None else None
         self.data = None
+        self._feature_matrix = None
         self.X_train = None
         self.X_test = None
+        self.window = None
+        self.horizon = 1
+        self.scaler = None
+        self.target_scaler = None
 
+    @timed("get_data")
     def get_data(self, start_date=None, end_date=None, session=None):
-        if session is None:
-            session = requests.Session()
-            session.headers.update({
-                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                              "AppleWebKit/537.36 (KHTML, like Gecko) "
-                              "Chrome/70.0.3538.77 Safari/537.36"
-            })
         try:
+            if self.store is not None:
+                self.data = self.store.get_range(self.ticker, start_date, end_date)
+                return
+
+            # yfinance/requests só são importados quando não há PriceStore
+            import requests
+            import yfinance as yf
+
+            if session is None:
+                session = requests.Session()
+                session.headers.update({
+                    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+                                  "AppleWebKit/537.36 (KHTML, like Gecko) "
+                                  "Chrome/70.0.3538.77 Safari/537.36"
+                })
             stock = yf.Ticker(self.ticker)
             stock_collected = stock.history(period="max", auto_adjust=True)
             stock_collected.index = stock_collected.index.tz_localize(None)
 
-            data = pd.DataFrame({
-                "date": stock_collected.index,
-                "close": stock_collected["Close"].values,
-            })
-            if start_date:
-                start_date = pd.to_datetime(start_date)
-                data = data[data["date"] >= start_date]
-            if end_date:
-                end_date = pd.to_datetime(end_date)
-                data = data[data["date"] <= end_date]
-            self.data = data.reset_index(drop=True)
+            data = pd.DataFrame({"date": stock_collected.index})
+            for column in OHLCV_COLUMNS:
+                data[column] = stock_collected[column.capitalize()].values
         except Exception as e:
-            print(f"Error fetching data from yfinance: {e}")
+            # PETRA_4.csv só tem os preços da PETR4: para outro ticker o erro sobe e o
+            # caller (ex.: /predict/batch) responde erro em vez de prever com outros preços
+            if self.ticker != FALLBACK_TICKER:
+                raise
+            print(f"Error fetching data for {self.ticker}: {e}")
             print("Falling back to PETRA_4.csv data for prediction.")
-            fallback_path = os.path.join("data", "PETRA_4.csv")
-            self.data = pd.read_csv(fallback_path, parse_dates=["date"])
+            data = pd.read_csv(os.path.join("data", "PETRA_4.csv"), parse_dates=["date"])
 
-    def split_data(self, test_size=0.2, window=30):
+        if start_date:
+            start_date = pd.to_datetime(start_date)
+            data = data[data["date"] >= start_date]
+        if end_date:
+            end_date = pd.to_datetime(end_date)
+            data = data[data["date"] <= end_date]
+        self.data = data.reset_index(drop=True)
+
+    def feature_matrix(self):
+        # (T, n_features) float32, construída uma vez por carga de dados e
+        # compartilhada entre todos os tamanhos de janela
         if self.data is None:
             raise ValueError("Data not loaded. Please call get_data() first.")
-        data = self.data.copy()
-        closes = data["close"].values
+        if self._feature_matrix is None or self._feature_matrix[0] is not self.data:
+            matrix, _ = build_features(self.data, self.features)
+            self._feature_matrix = (self.data, matrix)
+        return self._feature_matrix[1]
 
-        X, y = [], []
-        for i in range(window, len(closes)):
-            X.append(closes[i - window : i])
-            y.append(closes[i])
+    @timed("split_data")
+    def split_data(self, test_size=0.2, window=30, horizon=1):
+        if self.data is None:
+            raise ValueError("Data not loaded. Please call get_data() first.")
 
-        X = np.array(X)
-        y = np.array(y)
+        # X e y são views sobre os closes (ou a matriz de features), nenhuma janela é copiada
+        # Com horizon > 1, y é (N, horizon): os próximos `horizon` closes de cada janela
+        if self.features is None:
+            X, y = make_windows(self.data["close"].to_numpy(), window, horizon)
+        else:
+            X, y = make_windows(self.feature_matrix(), window, horizon)
+        if horizon == 1:
+            y = y[:, 0]
 
-        split_index = int((1 - test_size) * len(X))
-        self.X_train, self.X_test = X[:split_index], X[split_index:]
-        self.y_train, self.y_test = y[:split_index], y[split_index:]
+        self.X_train, self.X_test, self.y_train, self.y_test = split_windows(X, y, test_size)
+        self.window = window
+        self.horizon = horizon
 
+    @timed("standard_scale")
     def standard_scale(self):
+        from sklearn.preprocessing import StandardScaler
+
         if self.X_train is None or self.X_test is None:
             raise ValueError("Data not split yet. Please call split_data() first.")
 
+        if self.features is not None:
+            self._scale_features(StandardScaler)
+        else:
+            self._scale_windows(StandardScaler)
+
+        # Scale y (target): um único scaler para todos os passos do horizonte
+        train_samples, test_samples = len(self.y_train), len(self.y_test)
+        self.target_scaler = StandardScaler()
+        self.y_train = self.target_scaler.fit_transform(self.y_train.reshape(-1, 1))
+        self.y_test = self.target_scaler.transform(self.y_test.reshape(-1, 1))
+        self.y_train = self.y_train.reshape(train_samples, self.horizon)
+        self.y_test = self.y_test.reshape(test_samples, self.horizon)
+
+    def _scale_features(self, scaler_class):
+        # Um scaler por feature, ajustado nas linhas que aparecem nas janelas de treino.
+        # A matriz é escalada uma vez e as janelas continuam sendo views sobre ela
+        matrix = self.feature_matrix()
+        train_samples = len(self.X_train)
+        self.scaler = scaler_class().fit(matrix[: train_samples + self.window - 1])
+        scaled = self.scaler.transform(matrix).astype(np.float32, copy=False)
+
+        X, _ = make_windows(scaled, self.window, self.horizon)
+        self.X_train, self.X_test = X[:train_samples], X[train_samples:]
+
+    def _scale_windows(self, scaler_class):
+        # Caminho close-only: um scaler por posição da janela
         train_samples, train_nx = self.X_train.shape
         test_samples, test_nx = self.X_test.shape
 
@@ -72,7 +141,7 @@ class DataCollector:
         self.X_test = self.X_test.reshape((test_samples, test_nx, 1))
 
         # Scale X
-        self.scaler = StandardScaler()
+        self.scaler = scaler_class()
         X_train_flat = self.X_train.reshape((train_samples, -1))
         X_test_flat = self.X_test.reshape((test_samples, -1))
 
@@ -82,10 +151,26 @@ class DataCollector:
         self.X_train = X_train_scaled.reshape((train_samples, train_nx, 1))
         self.X_test = X_test_scaled.reshape((test_samples, test_nx, 1))
 
-        # Scale y (target)
-        self.target_scaler = StandardScaler()
-        self.y_train = self.target_scaler.fit_transform(self.y_train.reshape(-1, 1))
-        self.y_test = self.target_scaler.transform(self.y_test.reshape(-1, 1))
+    def train_cutoff(self):
+        # Data do último target usado no treino: o fine-tuning incremental parte daqui
+        if self.X_train is None:
+            raise ValueError("Data not split yet. Please call split_data() first.")
+        rows = len(self.feature_matrix()) if self.features is not None else len(self.data)
+        dates = self.data["date"].iloc[len(self.data) - rows :].to_numpy()
+        return pd.Timestamp(dates[len(self.X_train) + self.window + self.horizon - 2])
+
+    def get_scalers(self):
+        if self.target_scaler is None:
+            raise ValueError("Scalers not fitted yet. Please call standard_scale() first.")
+        scalers = {
+            "feature": self.scaler,
+            "target": self.target_scaler,
+            "window": self.window,
+            "horizon": self.horizon,
+        }
+        if self.features is not None:
+            scalers["features"] = self.features
+        return scalers
 
     def save_csv(self, file_path=None):
         if self.data is None:
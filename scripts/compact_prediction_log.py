@@ -0,0 +1,26 @@
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import argparse
+
+from src.serving import config
+from src.serving.prediction_log import compact
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compact closed prediction log segments into daily Parquet partitions")
+    parser.add_argument("--log_dir", type=str, default=config.PREDICTION_LOG_DIR)
+    parser.add_argument("--output", type=str, default=os.path.join("logs", "predictions_parquet"))
+    parser.add_argument("--keep", action="store_true", help="Keep the JSONL segments after compaction")
+    args = parser.parse_args()
+
+    summary = compact(args.log_dir, args.output, remove=not args.keep)
+    print(f"Compacted {summary['records']} records from {summary['segments']} segments")
+    for path in summary["files"]:
+        print(f"  {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import argparse
+
+import numpy as np
+import torch
+
+from data.price_store import CsvFeed
+from src.model.lstm_model import LSTMModel
+from src.serving.pipeline import feature_names
+from src.utils.features import build_features
+from src.utils.model_manager import ModelManager
+from src.utils.windows import make_windows
+
+
+def parity_inputs(scalers, window, n=256):
+    # Janelas reais (PETRA_4.csv) escaladas como no serving; sem scalers, ruído N(0, 1)
+    if scalers is None:
+        return torch.randn(n, window, 1)
+    prices = CsvFeed().fetch("CSV")
+    if scalers.get("features") is not None:
+        matrix, _ = build_features(prices, scalers["features"])
+        X, _ = make_windows(scalers["feature"].transform(matrix), window)
+        return torch.tensor(np.asarray(X[-n:]), dtype=torch.float32)
+    X, _ = make_windows(prices["close"].to_numpy(), window)
+    scaled = scalers["feature"].transform(np.asarray(X[-n:]))
+    return torch.tensor(scaled, dtype=torch.float32).unsqueeze(-1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the trained model to TorchScript or ONNX")
+    parser.add_argument("--model", type=str, default="models/lstm_petra.pth")
+    parser.add_argument("--output", type=str, default="models/lstm_petra.pt", help=".pt (TorchScript) or .onnx")
+    parser.add_argument("--quantize", action="store_true", help="int8 dynamic quantization of LSTM/Linear")
+    parser.add_argument("--window", type=int, default=None)
+    parser.add_argument("--atol", type=float, default=None, help="Parity tolerance in scaled units (default 1e-4, or 5e-2 when quantized)")
+    args = parser.parse_args()
+
+    model = ModelManager.load_model(LSTMModel, args.model).cpu()
+    scalers = ModelManager.load_scalers(args.model)
+    window = args.window or (scalers["window"] if scalers is not None else 30)
+
+    ModelManager.export_model(
+        model,
+        args.output,
+        torch.zeros(1, window, len(feature_names(scalers))),
+        quantize=args.quantize,
+        scalers=scalers,
+    )
+
+    # Paridade com o modelo eager nas mesmas entradas
+    atol = args.atol if args.atol is not None else (5e-2 if args.quantize else 1e-4)
+    exported = ModelManager.load_exported(args.output)
+    parity = ModelManager.check_parity(model, exported, parity_inputs(scalers, window), atol=atol)
+    print(f"Parity vs eager (atol={atol}): {parity}")
+    print(f"Size: {os.path.getsize(args.model)} bytes (eager) -> {os.path.getsize(args.output)} bytes")
+    if not parity["ok"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
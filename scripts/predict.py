@@ -3,68 +3,85 @@ import os
 sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
 
 import argparse
-import numpy as np
+import json
 import torch
 from datetime import datetime
 
-from data.process_data import DataCollector
+from data.price_store import PriceStore
+from src.serving.batch_predict import parse_stocks, predict_many
+from src.serving.pipeline import build_input, inverse_target, resolve_horizon, resolve_window
 from src.model.lstm_model import LSTMModel
+from src.model.runtime import model_device
 from src.utils.model_manager import ModelManager
 
-def predict_next_day(stock="PETR4.SA", window=30, start_date="2024-01-01"):
+MODEL_PATH = "models/lstm_petra.pth"
+
+def predict_next_day(stock="PETR4.SA", window=None, start_date="2024-01-01", horizon=None):
     print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] Starting prediction for stock: {stock}")
     
-    # Initialize data collector and fetch data
-    collector = DataCollector(stock)
-    collector.get_data(start_date=start_date)
-    
-    # Split data (needed before scaling)
-    collector.split_data(test_size=0.1, window=window)
+    # Scalers saved with the model (None for older artifacts, which refit them)
+    scalers = ModelManager.load_scalers(MODEL_PATH)
     
-    # Apply scaling (this function is assumed to scale and store the scaler in collector.target_scaler)
-    collector.standard_scale()
-    
-    # Check that the raw data is loaded
-    if collector.data is None:
-        print("DataCollector missing 'data' attribute with fetched prices")
-        return
-
-    # Extract only the close prices as input for prediction
-    close_prices = np.array(collector.data["close"])
-    if close_prices.shape[0] < window:
-        print(f"Not enough data to form a window of size {window}")
+    # Fetch data and build the scaled input window (window, 1)
+    try:
+        window = resolve_window(window, scalers)
+        horizon = resolve_horizon(horizon, scalers)
+        input_seq, target_scaler = build_input(stock, window, start_date, scalers=scalers)
+    except ValueError as e:
+        print(e)
         return
-
-    # Get the last `window` number of close prices
-    latest_window = close_prices[-window:]
-    # Reshape to (window, 1) for model input
-    input_seq = latest_window.reshape(window, 1)
     
     # Load trained model
-    device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-    model = ModelManager.load_model(LSTMModel, "models/lstm_petra.pth")
-    model = model.to(device)
-    model.eval()
+    model = ModelManager.load_model(LSTMModel, MODEL_PATH)
+    device = model_device(model)
     
     # Convert input sequence to torch tensor with batch dimension
-    input_tensor = torch.tensor(input_seq, dtype=torch.float32).unsqueeze(0).to(device)
+    input_tensor = torch.from_numpy(input_seq).unsqueeze(0).to(device)
     
     with torch.no_grad():
         prediction_scaled = model(input_tensor)
     
-    # Get the prediction value (assumed shape is (1, 1))
-    pred_value = prediction_scaled.cpu().numpy().flatten()[0]
-    
-    # Inverse transform to original scale using the stored target scaler
-    pred_original = collector.target_scaler.inverse_transform(np.array([[pred_value]]))[0, 0]
+    # Inverse transform to original scale using the target scaler
+    path = inverse_target(target_scaler, prediction_scaled.cpu().numpy())
+    pred_original = path[0]
     
     print(f"Predicted next day value for {stock}: {pred_original:.4f}")
+    if horizon is not None:
+        # Caminho inteiro do mesmo forward (modelo multi-horizonte)
+        print(f"Predicted {horizon}-day path for {stock}: {[round(float(v), 4) for v in path[:horizon]]}")
+
+def predict_stocks(stocks, window=None, start_date="2024-01-01", workers=16, horizon=None):
+    # Modo batch: um forward para vários tickers, saída em NDJSON no stdout
+    scalers = ModelManager.load_scalers(MODEL_PATH)
+    model = ModelManager.load_model(LSTMModel, MODEL_PATH)
+    results = predict_many(
+        model,
+        stocks,
+        window=resolve_window(window, scalers),
+        start_date=start_date,
+        store=PriceStore(),
+        max_workers=workers,
+        scalers=scalers,
+        horizon=resolve_horizon(horizon, scalers),
+    )
+    for result in results:
+        print(json.dumps(result), flush=True)
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Predict next day stock price")
     parser.add_argument("--stock", type=str, default="PETR4.SA", help="Stock symbol")
-    parser.add_argument("--window", type=int, default=30, help="Window size for prediction")
+    parser.add_argument("--stocks", type=str, default=None, help="Comma-separated stock symbols, or a file with one symbol per line (batch mode, NDJSON output)")
+    parser.add_argument("--workers", type=int, default=16, help="Concurrent data fetches in batch mode")
+    parser.add_argument("--window", type=int, default=None, help="Window size for prediction (defaults to the model's training window, or 30)")
+    parser.add_argument("--horizon", type=int, default=None, help="Also print the predicted path for the next N days (up to the model's training horizon)")
     parser.add_argument("--start_date", type=str, default="2024-01-01", help="Start date for fetching data (YYYY-MM-DD)")
     args = parser.parse_args()
     
-    predict_next_day(stock=args.stock, window=args.window, start_date=args.start_date)
\ No newline at end of file
+    if args.stocks:
+        stocks = args.stocks
+        if os.path.isfile(stocks):
+            with open(stocks) as f:
+                stocks = ",".join(f.read().split())
+        predict_stocks(parse_stocks(stocks), window=args.window, start_date=args.start_date, workers=args.workers, horizon=args.horizon)
+    else:
+        predict_next_day(stock=args.stock, window=args.window, start_date=args.start_date, horizon=args.horizon)
\ No newline at end of file
@@ -0,0 +1,126 @@
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from data.price_store import CsvFeed, PriceStore
+from src.serving.batch_predict import parse_stocks
+from src.training.backtest import run_backtest
+
+SERIES_METRICS = ("rmse", "mae", "mape", "directional_accuracy")
+
+
+def load_prices(tickers, start_date, store, workers):
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        frames = executor.map(lambda t: store.get_range(t, start_date), tickers)
+        return dict(zip(tickers, frames))
+
+
+def log_to_mlflow(results, args, tracking_uri, experiment):
+    import mlflow
+
+    from src.utils.mlflow_logging import MlflowBatchLogger
+
+    mlflow.set_tracking_uri(uri=tracking_uri)
+    logger = MlflowBatchLogger(experiment)
+    params = {
+        k: getattr(args, k)
+        for k in ("window", "horizon", "features", "initial_train", "test_size", "step", "max_train",
+                  "epochs", "warm_epochs", "hidden_size", "num_layers", "lr")
+    }
+    params["warm_start"] = not args.no_warm_start
+
+    # Uma run por ticker: média dos folds como métrica final e cada fold como step
+    for ticker, folds in results.groupby("ticker"):
+        folds = folds.sort_values("fold")
+        metrics = {f"mean_{name}": folds[name].mean() for name in SERIES_METRICS}
+        metrics["folds"] = len(folds)
+        series = {f"fold_{name}": folds[name].tolist() for name in SERIES_METRICS}
+        logger.add_run(f"backtest-{ticker}", params, metrics, series=series, tags={"ticker": ticker})
+    logger.flush()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Walk-forward backtest over one or more tickers")
+    parser.add_argument("--stocks", type=str, default="PETR4.SA", help="Comma-separated symbols, or a file with one symbol per line")
+    parser.add_argument("--start_date", type=str, default=None)
+    parser.add_argument("--csv", action="store_true", help="Read prices from data/PETRA_4.csv instead of yfinance")
+    parser.add_argument("--window", type=int, default=30)
+    parser.add_argument("--horizon", type=int, default=1)
+    parser.add_argument("--features", type=str, default=None, help="Comma-separated features, close first (default: close only)")
+    parser.add_argument("--initial_train", type=int, default=756, help="Windows in the first training fold (~3 years)")
+    parser.add_argument("--test_size", type=int, default=63, help="Windows scored per fold (~1 quarter)")
+    parser.add_argument("--step", type=int, default=None, help="Windows between folds (default: test_size)")
+    parser.add_argument("--max_train", type=int, default=None, help="Rolling training length (default: expanding)")
+    parser.add_argument("--epochs", type=int, default=100, help="Epochs for a fold trained from scratch")
+    parser.add_argument("--warm_epochs", type=int, default=20, help="Epochs for a fold warm-started from the previous one")
+    parser.add_argument("--no_warm_start", action="store_true", help="Train every fold from scratch (folds run in parallel)")
+    parser.add_argument("--hidden_size", type=int, default=50)
+    parser.add_argument("--num_layers", type=int, default=2)
+    parser.add_argument("--lr", type=float, default=0.005)
+    parser.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 2) // 2))
+    parser.add_argument("--threads_per_worker", type=int, default=1)
+    parser.add_argument("--output", type=str, default="backtests/backtest.parquet")
+    parser.add_argument("--no_mlflow", action="store_true")
+    parser.add_argument("--tracking_uri", type=str, default=os.environ.get("MLFLOW_TRACKING_URI", "http://0.0.0.0:8081"))
+    parser.add_argument("--experiment", type=str, default="LSTM-PETRA-backtest")
+    args = parser.parse_args()
+
+    stocks = args.stocks
+    if os.path.isfile(stocks):
+        with open(stocks) as f:
+            stocks = ",".join(f.read().split())
+    tickers = parse_stocks(stocks)
+    store = PriceStore(feed=CsvFeed(), root=os.path.join("data", "store", "csv")) if args.csv else PriceStore()
+    prices = load_prices(tickers, args.start_date, store, workers=16)
+
+    def on_result(result):
+        print(
+            f"{result['ticker']} fold {result['fold']} ({str(result['test_start'])[:10]} -> "
+            f"{str(result['test_end'])[:10]}, {result['epochs']} epochs, {result['train_s']:.1f}s): "
+            f"rmse {result['rmse']:.4f}, directional {result['directional_accuracy']:.3f}"
+        )
+
+    start = time.perf_counter()
+    results = run_backtest(
+        prices,
+        window=args.window,
+        horizon=args.horizon,
+        features=args.features.split(",") if args.features else None,
+        initial_train=args.initial_train,
+        test_size=args.test_size,
+        step=args.step,
+        max_train=args.max_train,
+        epochs=args.epochs,
+        warm_epochs=args.warm_epochs,
+        warm_start=not args.no_warm_start,
+        lr=args.lr,
+        hidden_size=args.hidden_size,
+        num_layers=args.num_layers,
+        max_workers=args.workers,
+        threads_per_worker=args.threads_per_worker,
+        on_result=on_result,
+    )
+    if not results:
+        print("No folds to run")
+        return
+
+    results = pd.DataFrame(results)
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    results.to_parquet(args.output, index=False)
+    print(f"\n{len(results)} folds over {results['ticker'].nunique()} tickers in {time.perf_counter() - start:.1f}s")
+    print(results.groupby("ticker")[list(SERIES_METRICS)].mean().to_string())
+    print(f"Per-fold metrics written to {args.output}")
+
+    if not args.no_mlflow:
+        log_to_mlflow(results, args, args.tracking_uri, args.experiment)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import argparse
+import time
+
+import pandas as pd
+
+from data.price_store import CsvFeed, PriceStore
+from data.process_data import DataCollector
+from src.model.lstm_model import LSTMModel
+from src.training.incremental import fine_tune
+from src.utils.model_manager import ModelManager
+
+
+def fit_scalers(data, ticker, window):
+    # Artefato antigo sem scalers: ajusta como o serving fazia (90% do histórico)
+    # e salva junto com o modelo novo
+    collector = DataCollector(ticker)
+    collector.data = data
+    collector.split_data(test_size=0.1, window=window)
+    collector.standard_scale()
+    return collector.get_scalers()
+
+
+def register_challenger(path, model, scalers, result, args):
+    import mlflow
+
+    mlflow.set_tracking_uri(uri=args.tracking_uri)
+    mlflow.set_experiment("LSTM-PETRA")
+    with mlflow.start_run(run_name="incremental"):
+        mlflow.log_params({k: getattr(args, k) for k in ("epochs", "lr", "recent", "older", "val_size")})
+        mlflow.log_metrics({f"val_before_{k}": v for k, v in result["before"].items()})
+        mlflow.log_metrics({f"val_after_{k}": v for k, v in result["after"].items()})
+        mlflow.set_tag("Training Info", f"Incremental update of {path} up to {result['new_cutoff']:%Y-%m-%d}")
+        ModelManager.log_scalers_mlflow(scalers)
+        model_info = mlflow.pytorch.log_model(
+            pytorch_model=model.cpu(), artifact_path="mlartifacts", registered_model_name=args.model_name
+        )
+    # Vai para o shadow scoring da API (GET /shadow) em vez de virar champion direto
+    client = mlflow.MlflowClient()
+    client.set_registered_model_alias(args.model_name, "challenger", model_info.registered_model_version)
+    print(f"Model version {model_info.registered_model_version} set as 'challenger' alias")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fine-tune the current model on bars added since its last training cutoff")
+    parser.add_argument("--model", type=str, default="models/lstm_petra.pth")
+    parser.add_argument("--output", type=str, default=None, help="Where to save the updated model (default: <model>_challenger.pth)")
+    parser.add_argument("--in_place", action="store_true", help="Overwrite --model (the serving champion) instead of writing a challenger")
+    parser.add_argument("--stock", type=str, default=None, help="Ticker (default: the one in the training info)")
+    parser.add_argument("--start_date", type=str, default=None, help="History start (default: the one in the training info)")
+    parser.add_argument("--cutoff", type=str, default=None, help="Override the training cutoff date")
+    parser.add_argument("--window", type=int, default=30, help="Only used for artifacts saved without scalers")
+    parser.add_argument("--csv", action="store_true", help="Read prices from data/PETRA_4.csv instead of yfinance")
+    parser.add_argument("--epochs", type=int, default=20)
+    parser.add_argument("--lr", type=float, default=0.001)
+    parser.add_argument("--recent", type=int, default=128, help="Most recent already-seen windows replayed")
+    parser.add_argument("--older", type=int, default=256, help="Older windows sampled at random for replay")
+    parser.add_argument("--val_size", type=int, default=60, help="Latest windows held out for the regression check")
+    parser.add_argument("--tolerance", type=float, default=0.0, help="Allowed relative RMSE increase")
+    parser.add_argument("--dry_run", action="store_true", help="Report the result without saving")
+    parser.add_argument("--register", action="store_true", help="Also register the new version in MLflow as 'challenger'")
+    parser.add_argument("--model_name", type=str, default="lstm-2000-epochs")
+    parser.add_argument("--tracking_uri", type=str, default=os.environ.get("MLFLOW_TRACKING_URI", "http://0.0.0.0:8081"))
+    args = parser.parse_args()
+
+    # Por padrão o modelo novo é um challenger (CHALLENGER_MODEL_PATH na API) e passa
+    # pelo shadow scoring; sobrescrever o champion em uso exige --in_place
+    output = args.model if args.in_place else args.output or args.model.replace(".pth", "_challenger.pth")
+    if os.path.abspath(output) == os.path.abspath(args.model) and not args.in_place:
+        parser.error("--output is the serving model; pass --in_place to overwrite it")
+
+    start = time.perf_counter()
+    info = ModelManager.load_training_info(args.model) or {}
+    cutoff = args.cutoff or info.get("cutoff")
+    if cutoff is None:
+        parser.error(f"{args.model} has no training info with a cutoff; pass --cutoff")
+    ticker = args.stock or info.get("ticker", "PETR4.SA")
+    start_date = args.start_date or info.get("start_date", "2023-01-01")
+
+    # O PriceStore só busca no feed as barras depois da última que já tem em disco
+    store = PriceStore(feed=CsvFeed(), root=os.path.join("data", "store", "csv")) if args.csv else PriceStore()
+    data = store.get_range(ticker, start_date)
+
+    model = ModelManager.load_model(LSTMModel, args.model)
+    scalers = ModelManager.load_scalers(args.model)
+    if scalers is None:
+        scalers = fit_scalers(data, ticker, args.window)
+
+    model, result = fine_tune(
+        model,
+        data,
+        scalers,
+        cutoff,
+        epochs=args.epochs,
+        lr=args.lr,
+        recent=args.recent,
+        older=args.older,
+        val_size=args.val_size,
+        tolerance=args.tolerance,
+    )
+    print(f"Cutoff {pd.Timestamp(cutoff):%Y-%m-%d}: {result['new_windows']} new windows")
+    if model is None:
+        print(f"Nothing to do: {result['reason']}")
+        return
+    print(
+        f"Fine-tuned on {result['train_windows']} windows in {result['train_s']:.2f}s: "
+        f"val rmse {result['before']['rmse']:.4f} -> {result['after']['rmse']:.4f}"
+    )
+    if not result["accepted"]:
+        print(f"Not saved: {result['reason']}")
+        return
+    if args.dry_run:
+        print("Dry run, not saved")
+        return
+
+    training_info = dict(
+        info,
+        ticker=ticker,
+        start_date=start_date,
+        cutoff=result["new_cutoff"],
+        mode="incremental",
+        parent=args.model,
+        parent_cutoff=pd.Timestamp(cutoff),
+        epochs=args.epochs,
+        val_rmse=result["after"]["rmse"],
+        updated_at=pd.Timestamp.now(),
+    )
+    ModelManager.save_model(model, output, ModelManager.load_metadata(args.model), scalers=scalers, training_info=training_info)
+    if args.register:
+        register_challenger(output, model, scalers, result, args)
+    print(f"Done in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import argparse
+import json
+
+from data.process_data import DataCollector
+from src.model.lstm_model import LSTMModel
+from src.training.sweep import DEFAULT_SPACE, expand_space, run_sweep
+from src.utils.model_manager import ModelManager
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parallel hyperparameter sweep for the LSTM model")
+    parser.add_argument("--space", type=str, default=None, help="JSON search space (inline or a file path)")
+    parser.add_argument("--trials", type=int, default=None, help="Random sample of N trials from the grid")
+    parser.add_argument("--stock", type=str, default="PETR4.SA")
+    parser.add_argument("--start_date", type=str, default="2023-01-01")
+    parser.add_argument("--features", type=str, default=None, help="Comma-separated features, close first (default: close only)")
+    parser.add_argument("--horizon", type=int, default=1, help="Days predicted per forward pass")
+    parser.add_argument("--epochs", type=int, default=500)
+    parser.add_argument("--batch_size", type=int, default=256)
+    parser.add_argument("--patience", type=int, default=50)
+    parser.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 2) // 2))
+    parser.add_argument("--threads_per_trial", type=int, default=1)
+    parser.add_argument("--prune_warmup", type=int, default=50, help="Epoch of the first pruning check")
+    parser.add_argument("--prune_every", type=int, default=25, help="Epochs between pruning checks")
+    parser.add_argument("--no_prune", action="store_true")
+    parser.add_argument("--output", type=str, default="models/sweep/lstm_petra_best.pth")
+    parser.add_argument("--no_mlflow", action="store_true")
+    parser.add_argument("--tracking_uri", type=str, default=os.environ.get("MLFLOW_TRACKING_URI", "http://0.0.0.0:8081"))
+    parser.add_argument("--experiment", type=str, default="LSTM-PETRA-sweep")
+    parser.add_argument("--model_name", type=str, default="lstm-2000-epochs")
+    args = parser.parse_args()
+
+    space = DEFAULT_SPACE
+    if args.space:
+        if os.path.isfile(args.space):
+            with open(args.space) as f:
+                space = json.load(f)
+        else:
+            space = json.loads(args.space)
+    trials = expand_space(space, args.trials)
+    print(f"Running {len(trials)} trials on {args.workers} workers")
+
+    features = args.features.split(",") if args.features else None
+    collector = DataCollector(args.stock, features=features)
+    collector.get_data(start_date=args.start_date)
+
+    logger = None
+    if not args.no_mlflow:
+        import mlflow
+
+        from src.utils.mlflow_logging import MlflowBatchLogger
+
+        mlflow.set_tracking_uri(uri=args.tracking_uri)
+        logger = MlflowBatchLogger(args.experiment)
+
+    def on_result(result):
+        status = "pruned" if result["pruned"] else "done"
+        print(
+            f"Trial {result['trial']} {status} after {result['epochs']} epochs "
+            f"({result['duration_s']:.1f}s): {result['params']} -> {result['metrics']}"
+        )
+        if logger is not None:
+            logger.add_run(
+                f"trial-{result['trial']}",
+                result["params"],
+                dict(result["metrics"], epochs=result["epochs"], duration_s=result["duration_s"]),
+                series={"val_loss": result["val_loss_history"]},
+                tags={"pruned": result["pruned"], "stock": args.stock},
+            )
+
+    results = run_sweep(
+        collector,
+        trials,
+        num_epochs=args.epochs,
+        batch_size=args.batch_size,
+        patience=args.patience,
+        max_workers=args.workers,
+        threads_per_trial=args.threads_per_trial,
+        prune_config=None if args.no_prune else {"warmup": args.prune_warmup, "every": args.prune_every},
+        on_result=on_result,
+        horizon=args.horizon,
+    )
+    if logger is not None:
+        logger.flush()
+
+    best = results[0]
+    print(f"\nBest trial {best['trial']}: {best['params']} -> {best['metrics']}")
+
+    model = LSTMModel(**best["model_args"])
+    model.load_state_dict(best["state_dict"])
+    ModelManager.save_model(model, args.output, best["model_args"], scalers=best["scalers"])
+
+    if logger is not None:
+        import mlflow
+
+        from src.utils.mlflow_logging import promote_if_better
+
+        # Registra o melhor trial e promove a champion se superar o atual no teste,
+        # que nenhum trial usou para pruning, early stopping ou ranking
+        with mlflow.start_run(run_id=logger.run_ids[f"trial-{best['trial']}"]):
+            ModelManager.log_scalers_mlflow(best["scalers"])
+            model_info = mlflow.pytorch.log_model(
+                pytorch_model=model,
+                artifact_path="mlartifacts",
+                registered_model_name=args.model_name,
+            )
+        promote_if_better(
+            args.model_name,
+            model_info.registered_model_version,
+            "test_rmse",
+            best["metrics"]["test_rmse"],
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -3,41 +3,82 @@ import sys
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
-import numpy as np
-
 from data.process_data import DataCollector
 from src.model.lstm_model import LSTMModel
-from src.training.train import evaluate_model, train_model
+from src.training.train import evaluate_metrics, evaluate_model, train_model
 from src.utils.dataset import TimeSeriesDataset
-from src.utils.metrics import root_mean_squared_error
+from src.utils.features import DEFAULT_FEATURES
+from src.utils.metrics import compute_metrics, root_mean_squared_error
 from src.utils.model_manager import ModelManager
+from src.utils.windows import split_validation
+
+# Close + features derivadas; use FEATURES = None para o modelo antigo só com close
+FEATURES = list(DEFAULT_FEATURES)
 
-collector = DataCollector("PETR4.SA")
+collector = DataCollector("PETR4.SA", features=FEATURES)
 collector.get_data(start_date="2023-01-01")
-collector.split_data(test_size=0.2, window=7)
+# Passos previstos por forward (output_size); 1 = só o próximo dia
+HORIZON = 1
+
+collector.split_data(test_size=0.2, window=7, horizon=HORIZON)
 collector.standard_scale()
 
-train_dataset = TimeSeriesDataset(collector.X_train, collector.y_train)
+# Early stopping e o checkpoint da melhor época usam as últimas janelas de treino;
+# o teste fica só para as métricas finais
+X_fit, X_val, y_fit, y_val = split_validation(collector.X_train, collector.y_train, val_size=0.1, gap=HORIZON - 1)
+train_dataset = TimeSeriesDataset(X_fit, y_fit)
+val_dataset = TimeSeriesDataset(X_val, y_val)
 test_dataset = TimeSeriesDataset(collector.X_test, collector.y_test)
 
 # Model
 model_args = {
-    "input_size": 1,
+    "input_size": len(FEATURES) if FEATURES is not None else 1,
     "hidden_size": 50,
     "num_layers": 5,
-    "output_size": 1,
+    "output_size": HORIZON,
     "dropout": 0.1,
 }
 
 model = LSTMModel(**model_args)
-model = train_model(model, train_dataset, test_dataset, num_epochs=2500)
+model = train_model(
+    model,
+    train_dataset,
+    val_dataset,
+    num_epochs=2500,
+    batch_size=256,
+    shuffle=True,
+    patience=200,
+    checkpoint_path="models/checkpoints/lstm_petra_best.pth",
+)
 
 predictions, actuals = evaluate_model(model, test_dataset)
-rmse = root_mean_squared_error(np.vstack(actuals), np.vstack(predictions))
+rmse = root_mean_squared_error(actuals, predictions)
+price_metrics = compute_metrics(
+    collector.target_scaler.inverse_transform(actuals),
+    collector.target_scaler.inverse_transform(predictions),
+)
 
-print("Test RMSE:", rmse)
+val_metrics, _, _ = evaluate_metrics(model, val_dataset, collector.target_scaler)
 
-ModelManager.save_model(model, "models/lstm_petra.pth", model_args)
+print("Validation metrics (price scale):", val_metrics)
+print("Test RMSE:", rmse)
+print("Test metrics (price scale):", price_metrics)
+
+# Corte do treino: scripts/run_finetune.py atualiza o modelo só com as barras posteriores
+training_info = {
+    "ticker": "PETR4.SA",
+    "start_date": "2023-01-01",
+    "cutoff": collector.train_cutoff(),
+    "mode": "full",
+    "epochs": 2500,
+}
+ModelManager.save_model(
+    model,
+    "models/lstm_petra.pth",
+    model_args,
+    scalers=collector.get_scalers(),
+    training_info=training_info,
+)
 
 # ML FLow
 #
@@ -56,6 +97,12 @@ with mlflow.start_run():
 
     # Log the loss metric
     mlflow.log_metric("RMSE", rmse)
+    mlflow.log_metrics({f"test_{name}": value for name, value in price_metrics.items()})
+    # Validação (usada no early stopping), na escala de preço como no sweep
+    mlflow.log_metrics({f"val_{name}": value for name, value in val_metrics.items()})
+
+    # Scalers e lista de features com a run: a API em modo MLflow os baixa com o modelo
+    ModelManager.log_scalers_mlflow(collector.get_scalers())
 
     # Set a tag that we can use to remind ourselves what this run was for
     mlflow.set_tag("Training Info", "LSTM model for PETRA4")
@@ -72,8 +119,14 @@ with mlflow.start_run():
         registered_model_name="lstm-2000-epochs",
     )
     
-    # Get the model version and set it as the champion
+    # A versão nova vira "challenger" e a API a compara com o champion em shadow
+    # (GET /shadow); só vira champion direto se ainda não existe um
     client = mlflow.MlflowClient()
-    latest_version = client.get_latest_versions("lstm-2000-epochs", stages=["None"])[0].version
-    client.set_registered_model_alias("lstm-2000-epochs", "champion", latest_version)
-    print(f"Model version {latest_version} set as 'champion' alias")
+    latest_version = model_info.registered_model_version
+    try:
+        client.get_model_version_by_alias("lstm-2000-epochs", "champion")
+        alias = "challenger"
+    except mlflow.exceptions.MlflowException:
+        alias = "champion"
+    client.set_registered_model_alias("lstm-2000-epochs", alias, latest_version)
+    print(f"Model version {latest_version} set as '{alias}' alias")
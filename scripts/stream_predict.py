@@ -0,0 +1,80 @@
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import argparse
+
+import numpy as np
+import torch
+
+from data.price_store import CsvFeed
+from src.model.lstm_model import LSTMModel
+from src.serving.streaming import RESYNC_EVERY, SessionStore, StreamingSession
+from src.utils.model_manager import ModelManager
+
+
+def windowed_prediction(model, scalers, closes):
+    # Caminho atual: refaz a janela inteira a cada barra
+    window = scalers["window"]
+    scaled = scalers["feature"].transform(np.asarray(closes[-window:]).reshape(1, window))
+    with torch.no_grad():
+        out = model(torch.tensor(scaled.reshape(1, window, 1), dtype=torch.float32))
+    return float(scalers["target"].inverse_transform(out.numpy().reshape(-1, 1))[0, 0])
+
+
+def simulate(model_path, csv_path, start_date, tickers, max_sessions, resync_every):
+    model = ModelManager.load_model(LSTMModel, model_path)
+    scalers = ModelManager.load_scalers(model_path)
+    if scalers is None:
+        raise SystemExit(f"{model_path} has no saved scalers; retrain with scripts/run_train.py")
+
+    data = CsvFeed(csv_path).fetch("CSV")
+    closes = data["close"].to_numpy()
+    start = int(np.searchsorted(data["date"].values, np.datetime64(start_date)))
+    history, feed = closes[:start], closes[start:]
+
+    # Cada "ticker" simulado reproduz a mesma série do CSV
+    store = SessionStore(max_sessions=max_sessions)
+    names = [f"SIM{i}" for i in range(tickers)]
+    stream_time, window_time, errors = 0.0, 0.0, []
+
+    for i, close in enumerate(feed):
+        seen = np.concatenate([history, feed[: i + 1]])
+        for name in names:
+            # Sessões despejadas pelo LRU são recriadas a partir das barras já vistas
+            session = store.get_or_create(
+                name, lambda: StreamingSession(model, scalers, seen[:-1], resync_every=resync_every)
+            )
+            t0 = time.perf_counter()
+            streamed = session.update(close)
+            stream_time += time.perf_counter() - t0
+
+            t0 = time.perf_counter()
+            windowed = windowed_prediction(model, scalers, seen)
+            window_time += time.perf_counter() - t0
+            errors.append(abs(streamed - windowed))
+
+        print(f"{data['date'].iloc[start + i].date()} close={close:.4f} next={streamed:.4f}")
+
+    updates = len(feed) * len(names)
+    print(f"\n{updates} updates across {len(names)} tickers, {store.stats()}")
+    print(f"streaming: {stream_time / updates * 1e6:.1f} us/update")
+    print(f"windowed:  {window_time / updates * 1e6:.1f} us/update")
+    print(f"mean |streaming - windowed|: {np.mean(errors):.4f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simulate a live quote feed from a CSV with streaming inference")
+    parser.add_argument("--model", type=str, default="models/lstm_petra.pth")
+    parser.add_argument("--csv", type=str, default=os.path.join("data", "PETRA_4.csv"))
+    parser.add_argument("--start_date", type=str, default="2025-01-01", help="Bars from this date on are streamed")
+    parser.add_argument("--tickers", type=int, default=1, help="Number of simulated tickers")
+    parser.add_argument("--max_sessions", type=int, default=1024)
+    parser.add_argument(
+        "--resync_every", type=int, default=RESYNC_EVERY, help="Replay the full window every N bars (0 disables)"
+    )
+    args = parser.parse_args()
+
+    simulate(args.model, args.csv, args.start_date, args.tickers, args.max_sessions, args.resync_every)
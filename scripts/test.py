@@ -5,9 +5,35 @@ from datetime import datetime
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
+import argparse
 import torch
-import mlflow.pytorch
-from mlflow import MlflowClient
+
+def run_artifact_test(artifact):
+    # Valida um artefato exportado (.pt/.onnx) sem importar o MLflow
+    from src.utils.model_manager import ModelManager
+
+    start_time = time.time()
+    print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] Starting artifact test: {artifact}")
+    try:
+        model = ModelManager.load_exported(artifact)
+        scalers = ModelManager.load_scalers(artifact)
+        window = scalers["window"] if scalers is not None else 7
+        n_features = len(scalers.get("features") or ["close"]) if scalers is not None else 1
+        with torch.no_grad():
+            output = model(torch.randn(4, window, n_features))
+        if tuple(output.shape[:1]) != (4,) or not torch.isfinite(output).all():
+            raise ValueError(f"Unexpected output: {output}")
+        print(f"Test inference successful, output shape: {tuple(output.shape)}")
+
+        elapsed_time = time.time() - start_time
+        print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] Test completed in {elapsed_time:.2f} seconds")
+        print("\n✅ TEST RESULT: OK - Artifact is valid and operational")
+        return True
+    except Exception as e:
+        elapsed_time = time.time() - start_time
+        print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] Test failed after {elapsed_time:.2f} seconds")
+        print(f"❌ TEST RESULT: NOT OK - {str(e)}")
+        return False
 
 def run_test():
     start_time = time.time()
@@ -15,6 +41,9 @@ def run_test():
     
     # Connect to MLflow
     try:
+        import mlflow.pytorch
+        from mlflow import MlflowClient
+
         client = MlflowClient()
         mlflow_uri = "http://0.0.0.0:8081"
         if "MLFLOW_TRACKING_URI" in os.environ:
@@ -47,8 +76,21 @@ def run_test():
         # Print model structure
         print(f"Model structure: {model}")
         
+        # Janela e nº de features da run (como a API carrega o champion); sem scalers,
+        # só modelos close-only são servíveis
+        from src.utils.model_manager import SCALERS_ARTIFACT, ModelManager
+
+        input_size = model.lstm.input_size
+        scalers = ModelManager.load_scalers_mlflow(model_info.run_id)
+        if scalers is None and input_size > 1:
+            raise ValueError(f"Model expects {input_size} features but its run has no '{SCALERS_ARTIFACT}' artifact")
+        window = scalers["window"] if scalers is not None else 7
+        n_features = len(scalers.get("features") or ["close"]) if scalers is not None else 1
+        if n_features != input_size:
+            raise ValueError(f"Scalers have {n_features} features but the model expects {input_size}")
+
         # Run a simple inference test with random data
-        test_input = torch.randn(1, 7, 1)  # Batch size 1, sequence length 7, feature dim 1
+        test_input = torch.randn(1, window, input_size)  # Batch size 1, model's window and features
         try:
             with torch.no_grad():
                 output = model(test_input)
@@ -68,6 +110,10 @@ def run_test():
         return False
 
 if __name__ == "__main__":
-    success = run_test()
+    parser = argparse.ArgumentParser(description="Validate the champion model (MLflow) or an exported artifact")
+    parser.add_argument("--artifact", type=str, default=None, help="Exported .pt/.onnx artifact to test instead of the MLflow champion")
+    args = parser.parse_args()
+
+    success = run_artifact_test(args.artifact) if args.artifact else run_test()
     # Exit with appropriate code for CI/CD pipelines
     sys.exit(0 if success else 1)
@@ -5,6 +5,8 @@ import torch.nn as nn
 class LSTMModel(nn.Module):
     def __init__(self, input_size, hidden_size, num_layers, output_size, dropout=0.2):
         super(LSTMModel, self).__init__()
+        # output_size > 1: previsão direta de `output_size` passos à frente em um forward
+        self.output_size = output_size
         self.hidden_size = hidden_size
         self.num_layers = num_layers
 
@@ -21,3 +23,16 @@ class LSTMModel(nn.Module):
         out = out[:, -1, :]
         out = self.fc(out)
         return out
+
+    def forward_with_state(self, x, state=None):
+        # Igual ao forward, mas continua de um (h, c) anterior e o devolve,
+        # permitindo avançar uma barra por vez em modo streaming
+        if state is None:
+            h0 = torch.zeros(self.num_layers, x.size(0), self.hidden_size).to(x.device)
+            c0 = torch.zeros(self.num_layers, x.size(0), self.hidden_size).to(x.device)
+            state = (h0, c0)
+
+        out, state = self.lstm(x, state)
+        out = out[:, -1, :]
+        out = self.fc(out)
+        return out, state
@@ -0,0 +1,36 @@
+import torch
+
+
+def model_device(model):
+    # Modelos quantizados ou ONNX podem não ter parâmetros; nesse caso, CPU
+    for parameter in model.parameters():
+        return parameter.device
+    return torch.device("cpu")
+
+
+class OnnxRuntimeModel:
+    # Adapta uma InferenceSession do onnxruntime à interface usada no serving:
+    # recebe e devolve tensores torch, e tem eval()/parameters() como um nn.Module
+    def __init__(self, file_path, num_threads=None):
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        if num_threads is not None:
+            options.intra_op_num_threads = num_threads
+        self.session = ort.InferenceSession(
+            file_path, sess_options=options, providers=["CPUExecutionProvider"]
+        )
+        self.input_name = self.session.get_inputs()[0].name
+
+    def __call__(self, x):
+        outputs = self.session.run(None, {self.input_name: x.detach().cpu().numpy()})
+        return torch.from_numpy(outputs[0])
+
+    def eval(self):
+        return self
+
+    def parameters(self):
+        return iter(())
+
+    def buffers(self):
+        return iter(())
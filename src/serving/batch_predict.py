@@ -0,0 +1,102 @@
+import contextlib
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import numpy as np
+import torch
+
+from src.model.runtime import model_device
+from src.serving.pipeline import build_input, inverse_target
+from src.serving.prediction_log import input_hash
+from src.utils.instrumentation import BATCH_SIZE, timed
+
+
+def parse_stocks(stocks):
+    # "A,B, C" -> ["A", "B", "C"], sem duplicatas e preservando a ordem
+    seen = dict.fromkeys(s.strip() for s in stocks.split(",") if s.strip())
+    return list(seen)
+
+
+def _forward_chunk(model, chunk, horizon=None, audit=False):
+    device = model_device(model)
+    inputs = torch.from_numpy(np.stack([input_seq for _, input_seq, _ in chunk])).to(device)
+    BATCH_SIZE.observe(len(chunk), path="batch")
+    start = time.perf_counter()
+    with timed("forward"), torch.no_grad():
+        outputs = model(inputs).cpu().numpy()
+    forward_s = time.perf_counter() - start
+    for (stock, input_seq, target_scaler), output in zip(chunk, outputs):
+        path = inverse_target(target_scaler, output)
+        result = {"stock": stock, "predicted_value": float(path[0])}
+        if horizon is not None:
+            result["predicted_path"] = path[:horizon].tolist()
+        if audit:
+            # Para o log de predições: hash da janela e tempo do forward do chunk
+            result["input_hash"] = input_hash(input_seq)
+            result["forward_s"] = forward_s
+        yield result
+
+
+def predict_many(
+    model,
+    stocks,
+    window=30,
+    start_date="2024-01-01",
+    store=None,
+    max_workers=16,
+    chunk_size=256,
+    flush_interval=0.5,
+    scalers=None,
+    horizon=None,
+    audit=False,
+    fetch_executor=None,
+    inference_executor=None,
+):
+    # Busca os tickers em paralelo e roda um forward por chunk de janelas prontas;
+    # os resultados saem assim que cada chunk termina. Na API os executors são os
+    # compartilhados: no máximo `max_workers` buscas ficam no fetch executor por vez,
+    # para um batch grande não enfileirar na frente dos /predict
+    stocks = list(stocks)
+    submitted = 0
+    pending = {}
+    chunk = []
+    last_flush = time.monotonic()
+
+    def forward(part):
+        if inference_executor is None:
+            return list(_forward_chunk(model, part, horizon, audit))
+        # O corpo do gerador só roda dentro do list(), já na thread de inferência
+        return inference_executor.submit(list, _forward_chunk(model, part, horizon, audit)).result()
+
+    with contextlib.ExitStack() as stack:
+        if fetch_executor is None:
+            fetch_executor = stack.enter_context(ThreadPoolExecutor(max_workers=max_workers))
+        try:
+            while True:
+                for stock in stocks[submitted : submitted + max_workers - len(pending)]:
+                    future = fetch_executor.submit(build_input, stock, window, start_date, store, scalers)
+                    pending[future] = stock
+                    submitted += 1
+                if not pending:
+                    break
+                done, _ = wait(pending, timeout=flush_interval, return_when=FIRST_COMPLETED)
+                for future in done:
+                    stock = pending.pop(future)
+                    try:
+                        input_seq, target_scaler = future.result()
+                    except Exception as e:
+                        yield {"stock": stock, "error": str(e)}
+                        continue
+                    chunk.append((stock, input_seq, target_scaler))
+
+                flush_due = time.monotonic() - last_flush >= flush_interval
+                finished = not pending and submitted == len(stocks)
+                if chunk and (len(chunk) >= chunk_size or finished or flush_due):
+                    for i in range(0, len(chunk), chunk_size):
+                        yield from forward(chunk[i : i + chunk_size])
+                    chunk = []
+                    last_flush = time.monotonic()
+        finally:
+            # Cliente desconectou (gerador fechado): buscas que nem começaram saem da fila
+            for future in pending:
+                future.cancel()
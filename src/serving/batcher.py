@@ -0,0 +1,120 @@
+import asyncio
+from collections import Counter
+
+import torch
+
+from src.model.runtime import model_device
+from src.utils.instrumentation import BATCH_SIZE, timed
+
+
+class MicroBatcher:
+    # Junta requests concorrentes por até `max_wait_ms` (ou `max_batch_size`
+    # itens) e roda um único forward batelado, devolvendo cada linha ao seu caller.
+    # O modelo é fixado no submit: com hot-swap no meio, cada request ainda roda no
+    # modelo da entry para a qual a entrada foi escalada
+    def __init__(self, model_getter, max_batch_size=64, max_wait_ms=5.0, executor=None, path="predict"):
+        self.model_getter = model_getter
+        # Label do histograma de tamanho de batch (ex.: "shadow" para o challenger)
+        self.path = path
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.executor = executor
+        self.requests = 0
+        self.batches = 0
+        self.batch_sizes = Counter()
+        self._queue = None
+        self._task = None
+
+    async def start(self):
+        self._queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        while not self._queue.empty():
+            _, _, future = self._queue.get_nowait()
+            if not future.done():
+                future.set_exception(RuntimeError("Batcher stopped"))
+
+    @property
+    def running(self):
+        return self._task is not None
+
+    @property
+    def queue_depth(self):
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def submit(self, x, model=None):
+        if self._task is None:
+            raise RuntimeError("Batcher is not running")
+        if model is None:
+            model = self.model_getter()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((model, x, future))
+        return await future
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            await self._dispatch(batch)
+
+    async def _dispatch(self, batch):
+        # Janelas de tamanhos diferentes (ou de modelos diferentes, durante um
+        # hot-swap) não podem ser empilhadas juntas
+        groups = {}
+        for model, x, future in batch:
+            if not future.cancelled():
+                groups.setdefault((id(model), tuple(x.shape)), (model, []))[1].append((x, future))
+
+        loop = asyncio.get_running_loop()
+        for model, items in groups.values():
+            try:
+                inputs = torch.stack([x for x, _ in items])
+                outputs = await loop.run_in_executor(
+                    self.executor, self._forward, model, inputs, self.path
+                )
+            except Exception as e:
+                for _, future in items:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            self.requests += len(items)
+            self.batches += 1
+            self.batch_sizes[len(items)] += 1
+            for (_, future), output in zip(items, outputs):
+                if not future.done():
+                    future.set_result(output)
+
+    @staticmethod
+    def _forward(model, inputs, path="predict"):
+        BATCH_SIZE.observe(len(inputs), path=path)
+        device = model_device(model)
+        with timed("shadow_forward" if path == "shadow" else "forward"), torch.no_grad():
+            return model(inputs.to(device)).cpu()
+
+    def stats(self):
+        return {
+            "queue_depth": self.queue_depth,
+            "requests": self.requests,
+            "batches": self.batches,
+            "avg_batch_size": self.requests / self.batches if self.batches else 0.0,
+            "batch_sizes": dict(sorted(self.batch_sizes.items())),
+        }
@@ -0,0 +1,67 @@
+import os
+
+# Configuração do serving via variáveis de ambiente
+MODEL_PATH = os.environ.get("MODEL_PATH", "models/lstm_petra.pth")
+MODEL_WATCH_INTERVAL = float(os.environ.get("MODEL_WATCH_INTERVAL", "30"))
+# Pesos do .pth mapeados em memória (read-only, compartilhados entre os workers do uvicorn)
+MODEL_MMAP = os.environ.get("MODEL_MMAP", "1") == "1"
+
+# Opcional: acompanha o alias do MLflow Model Registry (ex.: "champion")
+MLFLOW_TRACKING_URI = os.environ.get("MLFLOW_TRACKING_URI", "http://0.0.0.0:8081")
+MLFLOW_MODEL_NAME = os.environ.get("MLFLOW_MODEL_NAME")
+MLFLOW_MODEL_ALIAS = os.environ.get("MLFLOW_MODEL_ALIAS", "champion")
+
+# Shadow scoring: um challenger (CHALLENGER_MODEL_PATH ou o alias MLFLOW_CHALLENGER_ALIAS)
+# roda fora do caminho da resposta sobre a mesma janela do champion
+SHADOW_ENABLED = os.environ.get("SHADOW_ENABLED", "1") == "1"
+CHALLENGER_MODEL_PATH = os.environ.get("CHALLENGER_MODEL_PATH")
+MLFLOW_CHALLENGER_ALIAS = os.environ.get("MLFLOW_CHALLENGER_ALIAS", "challenger")
+SHADOW_MAX_QUEUE = int(os.environ.get("SHADOW_MAX_QUEUE", "256"))
+SHADOW_MIN_SAMPLES = int(os.environ.get("SHADOW_MIN_SAMPLES", "50"))
+SHADOW_MARGIN = float(os.environ.get("SHADOW_MARGIN", "0.02"))
+SHADOW_AUTO_PROMOTE = os.environ.get("SHADOW_AUTO_PROMOTE", "0") == "1"
+
+# Price store local (data/store) com cache em memória
+PRICE_STORE_DIR = os.environ.get("PRICE_STORE_DIR", os.path.join("data", "store"))
+PRICE_STORE_TTL = float(os.environ.get("PRICE_STORE_TTL", "300"))
+PRICE_STORE_MAX_ITEMS = int(os.environ.get("PRICE_STORE_MAX_ITEMS", "256"))
+PRICE_FEED = os.environ.get("PRICE_FEED", "yfinance")
+
+# Micro-batching do forward no /predict
+BATCHING_ENABLED = os.environ.get("BATCHING_ENABLED", "1") == "1"
+BATCH_MAX_SIZE = int(os.environ.get("BATCH_MAX_SIZE", "64"))
+BATCH_MAX_WAIT_MS = float(os.environ.get("BATCH_MAX_WAIT_MS", "5"))
+
+# /predict/batch (vários tickers por chamada)
+BATCH_FETCH_WORKERS = int(os.environ.get("BATCH_FETCH_WORKERS", "16"))
+BATCH_MAX_TICKERS = int(os.environ.get("BATCH_MAX_TICKERS", "1000"))
+
+# Executores dedicados e backpressure. O default de threads do torch divide os
+# cores entre os workers do uvicorn (WEB_CONCURRENCY) para não haver oversubscription
+WEB_CONCURRENCY = int(os.environ.get("WEB_CONCURRENCY", "1"))
+TORCH_NUM_THREADS = int(
+    os.environ.get("TORCH_NUM_THREADS", max(1, (os.cpu_count() or 1) // WEB_CONCURRENCY))
+)
+FETCH_WORKERS = int(os.environ.get("FETCH_WORKERS", "32"))
+INFERENCE_WORKERS = int(os.environ.get("INFERENCE_WORKERS", "1"))
+MAX_INFLIGHT = int(os.environ.get("MAX_INFLIGHT", "256"))
+RETRY_AFTER_SECONDS = int(os.environ.get("RETRY_AFTER_SECONDS", "1"))
+
+# Cache de respostas do /predict; com PREDICTION_CACHE_PATH, um SQLite local
+# compartilhado entre os workers
+PREDICTION_CACHE_ENABLED = os.environ.get("PREDICTION_CACHE_ENABLED", "1") == "1"
+PREDICTION_CACHE_MAX_ITEMS = int(os.environ.get("PREDICTION_CACHE_MAX_ITEMS", "4096"))
+PREDICTION_CACHE_PATH = os.environ.get("PREDICTION_CACHE_PATH")
+
+# Profiler do torch por request (/predict?profile=true); traces vão para PROFILE_DIR
+PROFILING_ENABLED = os.environ.get("PROFILING_ENABLED", "0") == "1"
+PROFILE_DIR = os.environ.get("PROFILE_DIR", "profiles")
+
+# Log de auditoria das predições (JSONL em segmentos, escrito em background);
+# scripts/compact_prediction_log.py compacta os segmentos em Parquet por dia
+PREDICTION_LOG_ENABLED = os.environ.get("PREDICTION_LOG_ENABLED", "1") == "1"
+PREDICTION_LOG_DIR = os.environ.get("PREDICTION_LOG_DIR", os.path.join("logs", "predictions"))
+PREDICTION_LOG_QUEUE_SIZE = int(os.environ.get("PREDICTION_LOG_QUEUE_SIZE", "10000"))
+PREDICTION_LOG_FLUSH_INTERVAL = float(os.environ.get("PREDICTION_LOG_FLUSH_INTERVAL", "1"))
+PREDICTION_LOG_MAX_BYTES = int(os.environ.get("PREDICTION_LOG_MAX_BYTES", str(64 * 1024 * 1024)))
+PREDICTION_LOG_ROTATE_SECONDS = float(os.environ.get("PREDICTION_LOG_ROTATE_SECONDS", "3600"))
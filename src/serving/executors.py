@@ -0,0 +1,66 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import torch
+
+
+def configure_torch_threads(num_threads):
+    torch.set_num_threads(num_threads)
+    try:
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        # Só pode ser chamado antes do primeiro trabalho paralelo do processo
+        pass
+
+
+def make_executors(fetch_workers, inference_workers):
+    fetch_executor = ThreadPoolExecutor(max_workers=fetch_workers, thread_name_prefix="fetch")
+    inference_executor = ThreadPoolExecutor(
+        max_workers=inference_workers, thread_name_prefix="inference"
+    )
+    return fetch_executor, inference_executor
+
+
+class InflightLimiter:
+    # Conta requests em andamento; acima do limite o caller deve responder 503
+    def __init__(self, max_inflight):
+        self.max_inflight = max_inflight
+        self.inflight = 0
+        self.rejected = 0
+        self._lock = threading.Lock()
+
+    def try_acquire(self):
+        with self._lock:
+            if self.inflight >= self.max_inflight:
+                self.rejected += 1
+                return False
+            self.inflight += 1
+            return True
+
+    def release(self):
+        with self._lock:
+            self.inflight -= 1
+
+    def stats(self):
+        return {
+            "inflight": self.inflight,
+            "max_inflight": self.max_inflight,
+            "rejected": self.rejected,
+        }
+
+
+def release_once(limiter):
+    # Release idempotente para respostas em stream: o fim do gerador e o
+    # BackgroundTask podem chamar os dois, mas a vaga só volta uma vez
+    lock = threading.Lock()
+    released = False
+
+    def release():
+        nonlocal released
+        with lock:
+            if released:
+                return
+            released = True
+        limiter.release()
+
+    return release
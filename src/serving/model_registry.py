@@ -0,0 +1,178 @@
+import os
+import threading
+import time
+
+import torch
+
+from src.utils.instrumentation import timed
+from src.utils.model_manager import SCALERS_ARTIFACT, ModelManager
+
+
+class ModelEntry:
+    def __init__(self, name, model, source, version, load_time_s, scalers=None, mmap=False):
+        self.name = name
+        self.model = model
+        self.scalers = scalers
+        self.source = source
+        self.version = version
+        self.load_time_s = load_time_s
+        self.mmap = mmap
+        self.loaded_at = time.time()
+        self.memory_bytes = sum(
+            t.numel() * t.element_size()
+            for t in list(model.parameters()) + list(model.buffers())
+        )
+        if self.memory_bytes == 0 and os.path.exists(source):
+            # Artefatos quantizados/ONNX não expõem parâmetros; usa o tamanho do arquivo
+            self.memory_bytes = os.path.getsize(source)
+
+    def stats(self):
+        return {
+            "name": self.name,
+            "source": self.source,
+            "version": self.version,
+            "load_time_s": round(self.load_time_s, 4),
+            "memory_bytes": self.memory_bytes,
+            "mmap": self.mmap,
+            "window": self.scalers["window"] if self.scalers is not None else None,
+            "loaded_at": self.loaded_at,
+        }
+
+
+# Requests pegam a entry via get() e mantêm a referência ao modelo, então o
+# hot-swap só troca a entrada do dict e não derruba requests em andamento.
+class ModelRegistry:
+
+    def __init__(self, model_class, mmap=False):
+        self.model_class = model_class
+        # mmap: pesos de .pth mapeados do arquivo e compartilhados entre workers
+        self.mmap = mmap
+        self._entries = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._watcher = None
+        self._swap_listeners = []
+        self._refresh_listeners = []
+
+    def on_swap(self, callback):
+        # callback(name, previous_entry, entry), chamado quando a versão muda
+        self._swap_listeners.append(callback)
+
+    def on_refresh(self, callback):
+        # callback(), chamado a cada ciclo do watcher depois do refresh: o refresh só
+        # acompanha entradas já carregadas, modelos ainda ausentes entram por aqui
+        self._refresh_listeners.append(callback)
+
+    @staticmethod
+    def _file_version(path):
+        return str(os.stat(path).st_mtime_ns)
+
+    def load(self, name, path):
+        version = self._file_version(path)
+        start = time.perf_counter()
+        mmap = self.mmap and path.endswith(".pth")
+        if path.endswith(".pth"):
+            model = ModelManager.load_model(self.model_class, path, mmap=mmap)
+        else:
+            model = ModelManager.load_exported(path)
+        scalers = ModelManager.load_scalers(path)
+        entry = ModelEntry(name, model, path, version, time.perf_counter() - start, scalers, mmap)
+        self._swap(entry)
+        return entry
+
+    def load_mlflow(self, name, model_name, alias):
+        import mlflow.pytorch
+        from mlflow import MlflowClient
+
+        model_version = MlflowClient().get_model_version_by_alias(model_name, alias)
+        version = model_version.version
+        device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+        start = time.perf_counter()
+        with timed("model_load"):
+            model = mlflow.pytorch.load_model(
+                f"models:/{model_name}@{alias}", map_location=device
+            )
+        model.eval()
+        scalers = ModelManager.load_scalers_mlflow(model_version.run_id)
+        input_size = getattr(getattr(model, "lstm", None), "input_size", 1)
+        if scalers is None and input_size > 1:
+            # Sem a lista de features não dá para montar a entrada (window, n_features)
+            raise ValueError(
+                f"models:/{model_name}@{alias} expects {input_size} features but its run "
+                f"has no '{SCALERS_ARTIFACT}' artifact (log it with ModelManager.log_scalers_mlflow)"
+            )
+        entry = ModelEntry(
+            name,
+            model,
+            f"models:/{model_name}@{alias}",
+            str(version),
+            time.perf_counter() - start,
+            scalers,
+        )
+        self._swap(entry)
+        return entry
+
+    def _swap(self, entry):
+        with self._lock:
+            previous = self._entries.get(entry.name)
+            self._entries[entry.name] = entry
+        if previous is not None and previous.version != entry.version:
+            print(
+                f"Model '{entry.name}' swapped: version {previous.version} -> {entry.version}"
+            )
+            for callback in self._swap_listeners:
+                callback(entry.name, previous, entry)
+
+    def get(self, name="champion"):
+        with self._lock:
+            entry = self._entries.get(name)
+        if entry is None:
+            raise KeyError(f"Model '{name}' is not loaded")
+        return entry
+
+    def stats(self):
+        with self._lock:
+            entries = list(self._entries.values())
+        return [entry.stats() for entry in entries]
+
+    def refresh(self):
+        with self._lock:
+            entries = list(self._entries.values())
+
+        for entry in entries:
+            try:
+                if entry.source.startswith("models:/"):
+                    from mlflow import MlflowClient
+
+                    model_name, alias = entry.source[len("models:/"):].split("@")
+                    current = MlflowClient().get_model_version_by_alias(model_name, alias)
+                    if str(current.version) != entry.version:
+                        self.load_mlflow(entry.name, model_name, alias)
+                elif self._file_version(entry.source) != entry.version:
+                    self.load(entry.name, entry.source)
+            except Exception as e:
+                # Mantém o modelo atual servindo se o novo artefato falhar
+                print(f"Error refreshing model '{entry.name}': {e}")
+
+    def start_watcher(self, interval=30.0):
+        if self._watcher is not None:
+            return
+        self._stop.clear()
+
+        def _watch():
+            while not self._stop.wait(interval):
+                self.refresh()
+                for callback in self._refresh_listeners:
+                    try:
+                        callback()
+                    except Exception as e:
+                        print(f"Error in model refresh listener: {e}")
+
+        self._watcher = threading.Thread(target=_watch, name="model-watcher", daemon=True)
+        self._watcher.start()
+
+    def stop_watcher(self):
+        self._stop.set()
+        if self._watcher is not None:
+            self._watcher.join(timeout=5)
+            self._watcher = None
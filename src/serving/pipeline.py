@@ -0,0 +1,73 @@
+import numpy as np
+
+from data.process_data import DataCollector
+from src.utils.instrumentation import timed
+
+
+def feature_names(scalers):
+    # Artefatos antigos (ou sem scalers) usam só o close
+    if scalers is None or scalers.get("features") is None:
+        return ["close"]
+    return list(scalers["features"])
+
+
+def resolve_window(window, scalers):
+    if scalers is None:
+        return window if window is not None else 30
+    if window is not None and window != scalers["window"]:
+        raise ValueError(f"Model was trained with window={scalers['window']}, got window={window}")
+    return scalers["window"]
+
+
+def resolve_horizon(horizon, scalers):
+    # None: só o próximo passo (resposta de sempre). O caminho inteiro sai do
+    # mesmo forward, então só é possível pedir até o horizonte do treino
+    if horizon is None:
+        return None
+    trained = scalers.get("horizon", 1) if scalers is not None else 1
+    if not 1 <= horizon <= trained:
+        raise ValueError(f"Model was trained with horizon={trained}, got horizon={horizon}")
+    return horizon
+
+
+@timed("build_input")
+def build_input(stock, window, start_date, store=None, scalers=None):
+    # Busca os dados e monta a última janela (window, n_features), já escalada, usada na predição
+    features = scalers.get("features") if scalers is not None else None
+    collector = DataCollector(stock, store=store, features=features)
+    collector.get_data(start_date=start_date)
+
+    if collector.data is None:
+        raise RuntimeError("DataCollector missing 'data' attribute with fetched prices")
+
+    if features is not None:
+        # Features calculadas sobre o histórico e escaladas por coluna; só as
+        # últimas `window` linhas são transformadas
+        matrix = collector.feature_matrix()
+        if matrix.shape[0] < window:
+            raise ValueError(f"Not enough data to form a window of size {window}")
+        input_seq = scalers["feature"].transform(matrix[-window:]).astype(np.float32)
+        return input_seq, scalers["target"]
+
+    close_prices = collector.data["close"].to_numpy()
+    if close_prices.shape[0] < window:
+        raise ValueError(f"Not enough data to form a window of size {window}")
+    latest_window = close_prices[-window:].reshape(1, window)
+
+    if scalers is not None:
+        # Scalers salvos com o modelo: só a última janela é transformada
+        feature_scaler, target_scaler = scalers["feature"], scalers["target"]
+    else:
+        # Artefato sem scalers: reajusta sobre todo o histórico (caminho antigo)
+        collector.split_data(test_size=0.1, window=window)
+        collector.standard_scale()
+        feature_scaler, target_scaler = collector.scaler, collector.target_scaler
+
+    input_seq = feature_scaler.transform(latest_window).reshape(window, 1).astype(np.float32)
+    return input_seq, target_scaler
+
+
+@timed("inverse_transform")
+def inverse_target(target_scaler, values):
+    values = np.asarray(values, dtype=np.float64).reshape(-1, 1)
+    return target_scaler.inverse_transform(values)[:, 0]
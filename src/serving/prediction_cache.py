@@ -0,0 +1,107 @@
+import json
+import sqlite3
+import threading
+from collections import OrderedDict
+
+
+def prediction_key(stock, window, start_date, model_version, last_date):
+    # A predição só muda quando chega uma barra nova ou o modelo é trocado
+    return f"{stock}|{window}|{start_date}|{model_version}|{last_date}"
+
+
+class PredictionCache:
+    # LRU em memória por worker e, opcionalmente, um tier em SQLite (arquivo local)
+    # compartilhado entre os workers do uvicorn
+    def __init__(self, max_items=4096, path=None):
+        self.max_items = max_items
+        self.path = path
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        if path is not None:
+            self._db = sqlite3.connect(path, timeout=5, check_same_thread=False, isolation_level=None)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS predictions "
+                "(key TEXT PRIMARY KEY, stock TEXT NOT NULL, value TEXT NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS predictions_stock ON predictions (stock)")
+
+    def _remember(self, key, value):
+        self._items[key] = value
+        self._items.move_to_end(key)
+        while len(self._items) > self.max_items:
+            self._items.popitem(last=False)
+            self.evictions += 1
+
+    def get(self, key):
+        # key=None: a chave não pôde ser montada (ex.: preços fora do TTL), conta como miss
+        with self._lock:
+            if key is None:
+                self.misses += 1
+                return None
+            value = self._items.get(key)
+            if value is not None:
+                self._items.move_to_end(key)
+                self.memory_hits += 1
+                return value
+            if self._db is not None:
+                row = self._db.execute("SELECT value FROM predictions WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    value = json.loads(row[0])
+                    self._remember(key, value)
+                    self.disk_hits += 1
+                    return value
+            self.misses += 1
+            return None
+
+    def put(self, key, stock, value):
+        with self._lock:
+            self._remember(key, value)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO predictions (key, stock, value) VALUES (?, ?, ?)",
+                    (key, stock, json.dumps(value)),
+                )
+
+    def invalidate(self, stock=None):
+        # Sem ticker limpa tudo (ex.: hot-swap do modelo); com ticker, só as
+        # entradas dele (ex.: chegou uma barra nova)
+        with self._lock:
+            self.invalidations += 1
+            if stock is None:
+                self._items.clear()
+            else:
+                prefix = f"{stock}|"
+                for key in [k for k in self._items if k.startswith(prefix)]:
+                    del self._items[key]
+            if self._db is not None:
+                if stock is None:
+                    self._db.execute("DELETE FROM predictions")
+                else:
+                    self._db.execute("DELETE FROM predictions WHERE stock = ?", (stock,))
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def stats(self):
+        hits = self.memory_hits + self.disk_hits
+        total = hits + self.misses
+        return {
+            "size": len(self._items),
+            "hits": hits,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": hits / total if total else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "shared": self.path is not None,
+        }
@@ -0,0 +1,171 @@
+import glob
+import hashlib
+import json
+import os
+import queue
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+
+ACTIVE_SUFFIX = ".jsonl.active"
+
+
+def input_hash(input_seq):
+    # Hash curto da janela escalada: identifica a entrada exata sem guardar o tensor
+    return hashlib.blake2b(input_seq.tobytes(), digest_size=8).hexdigest()
+
+
+class PredictionLog:
+    # Log append-only de predições: o request só enfileira (put_nowait) e uma thread
+    # escreve em lote, com um fsync por lote. Com a fila cheia o registro é descartado
+    # e contado, nunca bloqueia o /predict. Segmentos rotacionam por tamanho/idade;
+    # o ativo termina em .jsonl.active e vira .jsonl quando fecha
+    def __init__(
+        self,
+        directory,
+        max_queue=10_000,
+        batch_size=512,
+        flush_interval=1.0,
+        max_bytes=64 * 1024 * 1024,
+        rotate_seconds=3600,
+    ):
+        self.directory = directory
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_bytes = max_bytes
+        self.rotate_seconds = rotate_seconds
+        self.logged = 0
+        self.dropped = 0
+        self.written = 0
+        self.fsyncs = 0
+        self.rotations = 0
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._file = None
+        self._path = None
+        self._opened_at = 0.0
+        self._thread = None
+        self._stop = threading.Event()
+
+    def start(self):
+        if self._thread is not None:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="prediction-log", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        # Esvazia a fila e fecha o segmento atual
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+
+    def log(self, record):
+        try:
+            self._queue.put_nowait(record)
+            self.logged += 1
+        except queue.Full:
+            self.dropped += 1
+
+    def _drain(self):
+        batch = []
+        try:
+            batch.append(self._queue.get(timeout=self.flush_interval))
+            while len(batch) < self.batch_size:
+                batch.append(self._queue.get_nowait())
+        except queue.Empty:
+            pass
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._drain()
+            if batch:
+                self._write(batch)
+            elif self._file is not None and time.time() - self._opened_at >= self.rotate_seconds:
+                self._close_segment()
+            if self._stop.is_set() and self._queue.empty():
+                break
+        self._close_segment()
+
+    def _open_segment(self):
+        # pid no nome: cada worker do uvicorn escreve nos seus próprios segmentos
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S")
+        name = f"predictions-{stamp}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._path = os.path.join(self.directory, name + ACTIVE_SUFFIX)
+        self._file = open(self._path, "a", encoding="utf-8")
+        self._opened_at = time.time()
+
+    def _close_segment(self):
+        if self._file is None:
+            return
+        self._file.close()
+        os.replace(self._path, self._path[: -len(".active")])
+        self._file = None
+        self._path = None
+        self.rotations += 1
+
+    def _write(self, batch):
+        if self._file is None:
+            self._open_segment()
+        self._file.write("".join(json.dumps(record, default=str) + "\n" for record in batch))
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self.fsyncs += 1
+        self.written += len(batch)
+        if (
+            self._file.tell() >= self.max_bytes
+            or time.time() - self._opened_at >= self.rotate_seconds
+        ):
+            self._close_segment()
+
+    def stats(self):
+        return {
+            "enabled": True,
+            "queue_depth": self._queue.qsize(),
+            "logged": self.logged,
+            "written": self.written,
+            "dropped": self.dropped,
+            "fsyncs": self.fsyncs,
+            "segments_closed": self.rotations,
+        }
+
+
+def closed_segments(directory):
+    return sorted(glob.glob(os.path.join(directory, "predictions-*.jsonl")))
+
+
+def compact(directory, output, remove=True):
+    # Junta os segmentos fechados em Parquet particionado por dia (output/date=AAAA-MM-DD/),
+    # um arquivo novo por compactação; os segmentos só são apagados depois da escrita
+    import pandas as pd
+
+    segments = closed_segments(directory)
+    if not segments:
+        return {"segments": 0, "records": 0, "files": []}
+
+    records = []
+    for path in segments:
+        with open(path, encoding="utf-8") as f:
+            records += [json.loads(line) for line in f if line.strip()]
+    # Colunas planas (latency_fetch_s, ...) em vez de structs aninhados
+    frame = pd.json_normalize(records, sep="_")
+    frame["ts"] = pd.to_datetime(frame["ts"], unit="s", utc=True)
+    frame["date"] = frame["ts"].dt.strftime("%Y-%m-%d")
+
+    files = []
+    batch_id = uuid.uuid4().hex[:12]
+    for day, rows in frame.groupby("date"):
+        partition = os.path.join(output, f"date={day}")
+        os.makedirs(partition, exist_ok=True)
+        path = os.path.join(partition, f"part-{batch_id}.parquet")
+        rows.drop(columns="date").to_parquet(path, index=False)
+        files.append(path)
+
+    if remove:
+        for path in segments:
+            os.remove(path)
+    return {"segments": len(segments), "records": len(frame), "files": files}
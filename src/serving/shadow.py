@@ -0,0 +1,128 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from src.serving.pipeline import feature_names
+
+MODELS = ("champion", "challenger")
+
+
+def input_adapter(champion_scalers, challenger_scalers):
+    # Reaproveita a janela já escalada com os scalers do champion. Os dois são
+    # StandardScaler, então passar para os scalers do challenger é uma afim por coluna
+    if champion_scalers is None and challenger_scalers is None:
+        return lambda x: x
+    if champion_scalers is None or challenger_scalers is None:
+        raise ValueError("Champion and challenger must both ship scalers (or both not)")
+    if champion_scalers["window"] != challenger_scalers["window"]:
+        raise ValueError(
+            f"Challenger window {challenger_scalers['window']} differs from champion window {champion_scalers['window']}"
+        )
+    names = feature_names(champion_scalers)
+    if names != feature_names(challenger_scalers):
+        raise ValueError(f"Challenger features {feature_names(challenger_scalers)} differ from champion features {names}")
+
+    source, target = champion_scalers["feature"], challenger_scalers["feature"]
+    # Close-only: um scaler por posição da janela -> (window, 1); features: (1, n_features)
+    scale = (source.scale_ / target.scale_).reshape(-1, len(names)).astype(np.float32)
+    shift = ((source.mean_ - target.mean_) / target.scale_).reshape(-1, len(names)).astype(np.float32)
+    return lambda x: x * scale + shift
+
+
+class ShadowTracker:
+    # Erro online do champion e do challenger no mesmo conjunto de predições.
+    # Cada predição de 1 passo fica pendente por (ticker, última barra) até a barra
+    # seguinte fechar, ou seja, até existir outra barra depois dela
+    def __init__(self, min_samples=50, margin=0.02, max_pending=8):
+        self.min_samples = min_samples
+        self.margin = margin
+        self.max_pending = max_pending
+        self.recorded = 0
+        self.skipped = 0
+        self.failed = 0
+        self.promotions = 0
+        self.challenger_version = None
+        # Versão já promovida: o challenger igual ao champion não é mais comparado
+        self.promoted_version = None
+        self._pending = {}
+        self._sums = {name: [0, 0.0, 0.0] for name in MODELS}
+        self._lock = threading.Lock()
+
+    def record(self, ticker, last_date, champion, challenger):
+        with self._lock:
+            pending = self._pending.setdefault(ticker, OrderedDict())
+            # Só a 1ª predição por barra conta, senão tickers muito consultados pesam mais
+            if last_date in pending:
+                return
+            pending[last_date] = {"champion": champion, "challenger": challenger}
+            while len(pending) > self.max_pending:
+                pending.popitem(last=False)
+            self.recorded += 1
+
+    def resolve(self, ticker, data):
+        # data: histórico do ticker (date, close); a última barra ainda pode ser revista
+        if data is None or len(data) < 2:
+            return 0
+        with self._lock:
+            pending = self._pending.get(ticker)
+            if not pending:
+                return 0
+            dates = data["date"].values
+            closes = data["close"].to_numpy()
+            resolved = 0
+            for last_date in list(pending):
+                index = np.searchsorted(dates, np.datetime64(last_date), side="right")
+                if index >= len(dates) - 1:
+                    continue
+                realized = closes[index]
+                for name, predicted in pending.pop(last_date).items():
+                    error = predicted - realized
+                    sums = self._sums[name]
+                    sums[0] += 1
+                    sums[1] += error * error
+                    sums[2] += abs(error)
+                resolved += 1
+            return resolved
+
+    def errors(self):
+        with self._lock:
+            return {
+                name: {
+                    "samples": n,
+                    "rmse": float(np.sqrt(sq / n)) if n else None,
+                    "mae": float(abs_sum / n) if n else None,
+                }
+                for name, (n, sq, abs_sum) in self._sums.items()
+            }
+
+    def should_promote(self):
+        # Challenger precisa de amostras suficientes e de um RMSE menor por uma margem
+        errors = self.errors()
+        champion, challenger = errors["champion"], errors["challenger"]
+        if challenger["samples"] < self.min_samples or not champion["rmse"]:
+            return False
+        return challenger["rmse"] < champion["rmse"] * (1 - self.margin)
+
+    def reset(self, challenger_version=None):
+        with self._lock:
+            self.challenger_version = challenger_version
+            self._pending.clear()
+            self._sums = {name: [0, 0.0, 0.0] for name in MODELS}
+
+    def stats(self):
+        with self._lock:
+            pending = sum(len(p) for p in self._pending.values())
+        return {
+            "challenger_version": self.challenger_version,
+            "recorded": self.recorded,
+            "pending": pending,
+            "skipped": self.skipped,
+            "failed": self.failed,
+            "promotions": self.promotions,
+            "promoted_version": self.promoted_version,
+            "min_samples": self.min_samples,
+            "margin": self.margin,
+            "errors": self.errors(),
+            "promote": self.should_promote(),
+        }
@@ -0,0 +1,35 @@
+import time
+
+_PROCESS_START = time.perf_counter()
+
+
+class StartupTimer:
+    # Registra quanto tempo cada fase do startup levou, a partir do momento em que
+    # o módulo foi importado (ou de `start`), para expor em /ready e /stats
+    def __init__(self, start=None):
+        self.start = _PROCESS_START if start is None else start
+        self._last = self.start
+        self.phases = {}
+        self.ready = False
+        self.error = None
+
+    def mark(self, name):
+        now = time.perf_counter()
+        self.phases[name] = round(now - self._last, 4)
+        self._last = now
+
+    def set_ready(self):
+        self.mark("ready")
+        self.ready = True
+
+    def fail(self, error):
+        self.mark("failed")
+        self.error = str(error)
+
+    def report(self):
+        return {
+            "ready": self.ready,
+            "error": self.error,
+            "total_s": round(self._last - self.start, 4),
+            "phases_s": dict(self.phases),
+        }
@@ -0,0 +1,107 @@
+import threading
+from collections import OrderedDict, deque
+
+import numpy as np
+import torch
+
+from src.model.runtime import model_device
+
+# Replay completo a cada 5 barras: desvio limitado em relação ao forward com janela,
+# e 4 de cada 5 updates continuam sendo um único passo do LSTM
+RESYNC_EVERY = 5
+
+
+class StreamingSession:
+    # Mantém (h, c) e as últimas `window` barras de um ticker. A janela inicial é
+    # escalada como no /predict (scaler por posição); as barras seguintes usam a
+    # média/desvio da última posição, que é onde cada barra nova entra.
+    # `resync_every` refaz a janela a partir do estado zero a cada N barras, para
+    # o estado não se afastar do que o modelo viu no treino (janelas fixas). Sem
+    # resync (0/None) o erro acumula sem limite, então o padrão é limitado.
+    def __init__(self, model, scalers, history, resync_every=RESYNC_EVERY):
+        if scalers.get("features") is not None:
+            raise ValueError("Streaming sessions only support close-only models")
+        self.model = model
+        self.window = scalers["window"]
+        self.feature_scaler = scalers["feature"]
+        self.target_scaler = scalers["target"]
+        self.resync_every = resync_every
+        self.device = model_device(model)
+        self.buffer = deque(maxlen=self.window)
+        self.steps = 0
+        self.state = None
+        self.last_prediction = None
+        self._lock = threading.Lock()
+
+        history = np.asarray(history, dtype=np.float64)
+        if len(history) < self.window:
+            raise ValueError(f"Need at least {self.window} bars to start a session")
+        self.buffer.extend(history[-self.window:])
+        self._replay()
+
+    def _scale_bar(self, close):
+        return (close - self.feature_scaler.mean_[-1]) / self.feature_scaler.scale_[-1]
+
+    def _predict(self, x):
+        with torch.no_grad():
+            out, self.state = self.model.forward_with_state(x.to(self.device), self.state)
+        value = float(out.cpu().reshape(-1)[0])
+        self.last_prediction = value * self.target_scaler.scale_[0] + self.target_scaler.mean_[0]
+        return self.last_prediction
+
+    def _replay(self):
+        window = np.array(self.buffer)
+        scaled = (window - self.feature_scaler.mean_) / self.feature_scaler.scale_
+        self.state = None
+        return self._predict(torch.tensor(scaled.reshape(1, self.window, 1), dtype=torch.float32))
+
+    def update(self, close):
+        # Uma barra nova -> um passo do LSTM -> próxima predição
+        with self._lock:
+            self.buffer.append(float(close))
+            self.steps += 1
+            if self.resync_every and self.steps % self.resync_every == 0:
+                return self._replay()
+            x = torch.tensor([[[self._scale_bar(float(close))]]], dtype=torch.float32)
+            return self._predict(x)
+
+
+class SessionStore:
+    # LRU de sessões por ticker; a menos usada é descartada acima de max_sessions
+    def __init__(self, max_sessions=1024):
+        self.max_sessions = max_sessions
+        self.evictions = 0
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, ticker):
+        with self._lock:
+            session = self._sessions.get(ticker)
+            if session is not None:
+                self._sessions.move_to_end(ticker)
+            return session
+
+    def put(self, ticker, session):
+        with self._lock:
+            self._sessions[ticker] = session
+            self._sessions.move_to_end(ticker)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_create(self, ticker, factory):
+        session = self.get(ticker)
+        if session is None:
+            session = factory()
+            self.put(ticker, session)
+        return session
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def stats(self):
+        return {
+            "sessions": len(self._sessions),
+            "max_sessions": self.max_sessions,
+            "evictions": self.evictions,
+        }
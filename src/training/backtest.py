@@ -0,0 +1,205 @@
+import contextlib
+import io
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import torch
+
+from src.model.lstm_model import LSTMModel
+from src.training.train import evaluate_model, train_model
+from src.utils.dataset import TimeSeriesDataset
+from src.utils.features import build_features
+from src.utils.metrics import compute_metrics
+from src.utils.shared_arrays import attach_array, share_array
+from src.utils.windows import make_windows
+
+
+def walk_forward_folds(n_windows, initial_train, test_size, step=None, max_train=None, gap=0):
+    # Índices de janela (train_start, train_end, test_start, test_end) de cada fold.
+    # Treino expansivo (ou rolante, com max_train); `gap` janelas entre treino e
+    # teste evitam que targets de horizonte > 1 do treino caiam no período de teste
+    step = step or test_size
+    folds = []
+    test_start = initial_train + gap
+    while test_start < n_windows:
+        train_end = test_start - gap
+        train_start = 0 if max_train is None else max(0, train_end - max_train)
+        folds.append((train_start, train_end, test_start, min(test_start + test_size, n_windows)))
+        test_start += step
+    return folds
+
+
+def _init_worker(num_threads):
+    torch.set_num_threads(num_threads)
+    torch.set_num_interop_threads(1)
+
+
+def _run_fold(model, series, dates, fold, window, horizon, epochs, config):
+    train_start, train_end, test_start, test_end = fold
+
+    # Scaler por feature ajustado só nas linhas vistas pelo treino (sem vazamento);
+    # a série escalada é montada uma vez e as janelas do fold são views sobre ela
+    fit_rows = series[train_start : train_end + window + horizon - 1]
+    mean, std = fit_rows.mean(axis=0), fit_rows.std(axis=0)
+    std[std == 0] = 1.0
+    scaled = ((series - mean) / std).astype(np.float32)
+    X, y = make_windows(scaled, window, horizon)
+
+    train_dataset = TimeSeriesDataset(X[train_start:train_end], y[train_start:train_end])
+    test_dataset = TimeSeriesDataset(X[test_start:test_end], y[test_start:test_end])
+
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        model = train_model(
+            model,
+            train_dataset,
+            None,
+            num_epochs=epochs,
+            batch_size=config["batch_size"],
+            learning_rate=config["lr"],
+            shuffle=True,
+        )
+    train_s = time.perf_counter() - start
+
+    # Scoring do fold inteiro em batches grandes, depois volta à escala de preço
+    predictions, actuals = evaluate_model(model, test_dataset)
+    predictions = predictions * std[0] + mean[0]
+    actuals = actuals * std[0] + mean[0]
+
+    result = {
+        "train_start": dates[train_start + window],
+        "train_end": dates[train_end - 1 + window],
+        "test_start": dates[test_start + window],
+        "test_end": dates[test_end - 1 + window],
+        "n_train": train_end - train_start,
+        "n_test": test_end - test_start,
+        "epochs": epochs,
+        "train_s": train_s,
+    }
+    result.update(compute_metrics(actuals, predictions))
+    return model, result
+
+
+def run_chain(ticker, descriptor, dates, folds, fold_ids, config):
+    # Folds de um ticker em sequência; com warm_start, cada fold continua do modelo
+    # do fold anterior e treina só `warm_epochs` épocas
+    block, series = attach_array(descriptor)
+    window, horizon = config["window"], config["horizon"]
+    model_args = {
+        "input_size": series.shape[1],
+        "hidden_size": config["hidden_size"],
+        "num_layers": config["num_layers"],
+        "output_size": horizon,
+        "dropout": config["dropout"],
+    }
+    results, model = [], None
+    try:
+        torch.manual_seed(config["seed"])
+        for fold_id, fold in zip(fold_ids, folds):
+            warm = config["warm_start"] and model is not None
+            if not warm:
+                model = LSTMModel(**model_args)
+            epochs = config["warm_epochs"] if warm else config["epochs"]
+            model, result = _run_fold(model, series, dates, fold, window, horizon, epochs, config)
+            results.append(dict(result, ticker=ticker, fold=fold_id, warm_start=warm))
+    finally:
+        del series
+        try:
+            block.close()
+        except BufferError:
+            pass
+    return results
+
+
+def run_backtest(
+    prices,
+    window=30,
+    horizon=1,
+    features=None,
+    initial_train=756,
+    test_size=63,
+    step=None,
+    max_train=None,
+    epochs=100,
+    warm_epochs=20,
+    warm_start=True,
+    batch_size=256,
+    lr=0.005,
+    hidden_size=50,
+    num_layers=2,
+    dropout=0.1,
+    max_workers=2,
+    threads_per_worker=1,
+    seed=0,
+    on_result=None,
+):
+    # prices: {ticker: DataFrame com date/close (e OHLCV se houver features que usem)}.
+    # Com warm_start, cada ticker é uma cadeia sequencial de folds e os tickers rodam
+    # em paralelo; sem warm_start os folds são independentes e rodam todos em paralelo
+    config = {
+        "window": window,
+        "horizon": horizon,
+        "epochs": epochs,
+        "warm_epochs": warm_epochs,
+        "warm_start": warm_start,
+        "batch_size": batch_size,
+        "lr": lr,
+        "hidden_size": hidden_size,
+        "num_layers": num_layers,
+        "dropout": dropout,
+        "seed": seed,
+    }
+    blocks, tasks = [], []
+    try:
+        for ticker, frame in prices.items():
+            if features is None:
+                series = frame["close"].to_numpy(dtype=np.float32).reshape(-1, 1)
+                offset = 0
+            else:
+                series, offset = build_features(frame, features)
+            dates = frame["date"].to_numpy()[offset:]
+            n_windows = len(series) - window - horizon + 1
+            folds = walk_forward_folds(n_windows, initial_train, test_size, step, max_train, gap=horizon - 1)
+            if not folds:
+                print(f"Skipping {ticker}: {len(series)} rows is not enough for one fold")
+                continue
+
+            block, descriptor = share_array(np.asarray(series, dtype=np.float32))
+            blocks.append(block)
+            fold_ids = list(range(len(folds)))
+            if warm_start:
+                tasks.append((ticker, descriptor, dates, folds, fold_ids))
+            else:
+                tasks += [(ticker, descriptor, dates, [f], [i]) for i, f in zip(fold_ids, folds)]
+
+        results = []
+        if max_workers == 0:
+            # Em processo (debug/testes)
+            for task in tasks:
+                for result in run_chain(*task, config):
+                    results.append(result)
+                    if on_result is not None:
+                        on_result(result)
+        else:
+            context = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(
+                max_workers=max_workers,
+                mp_context=context,
+                initializer=_init_worker,
+                initargs=(threads_per_worker,),
+            ) as executor:
+                futures = [executor.submit(run_chain, *task, config) for task in tasks]
+                for future in as_completed(futures):
+                    for result in future.result():
+                        results.append(result)
+                        if on_result is not None:
+                            on_result(result)
+    finally:
+        for block in blocks:
+            block.close()
+            block.unlink()
+
+    results.sort(key=lambda r: (r["ticker"], r["fold"]))
+    return results
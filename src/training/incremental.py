@@ -0,0 +1,128 @@
+import contextlib
+import copy
+import io
+import time
+
+import numpy as np
+import pandas as pd
+import torch
+
+from src.training.train import evaluate_metrics, train_model
+from src.utils.dataset import TimeSeriesDataset
+from src.utils.features import build_features
+from src.utils.windows import make_windows
+
+
+class WindowSource:
+    # Janelas (views) sobre o histórico com os scalers do modelo já em produção: o
+    # fine-tuning não reajusta scalers, senão a entrada do serving mudaria de escala
+    def __init__(self, data, scalers, window, horizon=1):
+        self.window = window
+        self.horizon = horizon
+        self.scalers = scalers
+        features = scalers.get("features")
+        if features is not None:
+            matrix, offset = build_features(data, features)
+            _, self._y = make_windows(matrix, window, horizon)
+            # Matriz escalada uma vez; as janelas continuam views sobre ela
+            self._X, _ = make_windows(scalers["feature"].transform(matrix).astype(np.float32), window, horizon)
+            self._per_window = False
+        else:
+            offset = 0
+            self._X, self._y = make_windows(data["close"].to_numpy(), window, horizon)
+            # Close-only: um scaler por posição da janela, aplicado só às linhas escolhidas
+            self._per_window = True
+        dates = data["date"].to_numpy()[offset:]
+        # Data do último target de cada janela
+        self.end_dates = dates[window + horizon - 1 : window + horizon - 1 + len(self._X)]
+
+    def __len__(self):
+        return len(self._X)
+
+    def dataset(self, indices):
+        X = np.asarray(self._X[indices], dtype=np.float32)
+        if self._per_window:
+            X = self.scalers["feature"].transform(X).astype(np.float32)
+        y = self.scalers["target"].transform(np.asarray(self._y[indices]).reshape(-1, 1))
+        return TimeSeriesDataset(X, y.reshape(len(indices), self.horizon))
+
+
+def replay_indices(end, recent=128, older=256, seed=0):
+    # Buffer de replay: as `recent` janelas logo antes de `end` mais uma amostra
+    # aleatória de `older` janelas mais antigas, contra esquecimento do histórico
+    recent_start = max(0, end - recent)
+    rng = np.random.default_rng(seed)
+    sampled = rng.choice(recent_start, size=min(older, recent_start), replace=False) if recent_start else []
+    return np.sort(np.concatenate([np.asarray(sampled, dtype=np.int64), np.arange(recent_start, end)]))
+
+
+def fine_tune(
+    model,
+    data,
+    scalers,
+    cutoff,
+    epochs=20,
+    lr=0.001,
+    batch_size=256,
+    recent=128,
+    older=256,
+    val_size=60,
+    tolerance=0.0,
+    seed=0,
+):
+    # As `val_size` janelas mais recentes ficam de fora e decidem se o modelo novo
+    # é aceito; o treino usa as janelas com target depois de `cutoff` + o replay
+    horizon = scalers.get("horizon", 1)
+    source = WindowSource(data, scalers, scalers["window"], horizon)
+    val_start = len(source) - val_size
+    # Mesmo gap do walk_forward_folds: com horizon > 1 os targets das últimas janelas
+    # de treino cairiam dentro do período de validação
+    train_end = val_start - (horizon - 1)
+    if train_end <= 0:
+        raise ValueError(f"Not enough windows ({len(source)}) for val_size={val_size}")
+
+    cutoff = np.datetime64(pd.Timestamp(cutoff))
+    fresh_start = int(np.searchsorted(source.end_dates, cutoff, side="right"))
+    result = {
+        "cutoff": pd.Timestamp(cutoff),
+        "new_windows": max(0, train_end - fresh_start),
+        "val_windows": val_size,
+        "accepted": False,
+    }
+    if fresh_start >= train_end:
+        result["reason"] = "no new bars since the last training cutoff"
+        return None, result
+
+    fresh = np.arange(fresh_start, train_end)
+    train_indices = np.concatenate([replay_indices(fresh_start, recent, older, seed), fresh])
+    train_dataset = source.dataset(train_indices)
+    val_dataset = source.dataset(np.arange(val_start, len(source)))
+
+    before, _, _ = evaluate_metrics(model, val_dataset, scalers["target"])
+    candidate = copy.deepcopy(model)
+    torch.manual_seed(seed)
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        candidate = train_model(
+            candidate,
+            train_dataset,
+            None,
+            num_epochs=epochs,
+            batch_size=batch_size,
+            learning_rate=lr,
+            shuffle=True,
+        )
+    after, _, _ = evaluate_metrics(candidate, val_dataset, scalers["target"])
+
+    result.update({
+        "train_windows": len(train_indices),
+        "train_s": time.perf_counter() - start,
+        "new_cutoff": pd.Timestamp(source.end_dates[train_end - 1]),
+        "before": before,
+        "after": after,
+        # Só salva se o RMSE na validação recente não piorar (além da tolerância)
+        "accepted": after["rmse"] <= before["rmse"] * (1 + tolerance),
+    })
+    if not result["accepted"]:
+        result["reason"] = f"validation RMSE regressed ({before['rmse']:.4f} -> {after['rmse']:.4f})"
+    return candidate, result
@@ -0,0 +1,205 @@
+import itertools
+import math
+import multiprocessing
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import torch
+
+from src.model.lstm_model import LSTMModel
+from src.training.train import evaluate_metrics, train_model
+from src.utils.dataset import TimeSeriesDataset
+from src.utils.shared_arrays import attach_array, share_array
+from src.utils.windows import split_validation
+
+DEFAULT_SPACE = {
+    "hidden_size": [32, 50, 64],
+    "num_layers": [1, 2, 3],
+    "window": [7, 14, 30],
+    "lr": [0.001, 0.005],
+    "dropout": [0.0, 0.1],
+}
+
+
+def expand_space(space, n_trials=None, seed=0):
+    # Grid completo; com n_trials, uma amostra aleatória dele
+    keys = list(space)
+    grid = [dict(zip(keys, values)) for values in itertools.product(*(space[k] for k in keys))]
+    if n_trials is not None and n_trials < len(grid):
+        grid = random.Random(seed).sample(grid, n_trials)
+    return grid
+
+
+def build_window_data(collector, windows, test_size=0.2, horizon=1, val_size=0.1):
+    # Um dataset escalado por tamanho de janela, em shared memory para os trials.
+    # Validação (pruning, early stopping, ranking) sai do fim das janelas de treino;
+    # o teste só entra nas métricas finais
+    blocks, data = [], {}
+    for window in sorted(set(windows)):
+        collector.split_data(test_size=test_size, window=window, horizon=horizon)
+        collector.standard_scale()
+        X_train, X_val, y_train, y_val = split_validation(
+            collector.X_train, collector.y_train, val_size=val_size, gap=horizon - 1
+        )
+        splits = {
+            "X_train": X_train, "y_train": y_train,
+            "X_val": X_val, "y_val": y_val,
+            "X_test": collector.X_test, "y_test": collector.y_test,
+        }
+        descriptors = {}
+        for name, array in splits.items():
+            block, descriptors[name] = share_array(np.asarray(array, dtype=np.float32))
+            blocks.append(block)
+        data[window] = {"arrays": descriptors, "scalers": collector.get_scalers()}
+    return blocks, data
+
+
+class MedianPruner:
+    # Interrompe um trial cuja val loss, em uma época de checagem, fica acima da
+    # mediana das val losses que os outros trials já reportaram na mesma época
+    def __init__(self, reports, lock, warmup=50, every=25, min_trials=4):
+        self.reports = reports
+        self.lock = lock
+        self.warmup = warmup
+        self.every = every
+        self.min_trials = min_trials
+
+    def should_prune(self, epoch, val_loss):
+        if val_loss is None or epoch < self.warmup or (epoch - self.warmup) % self.every:
+            return False
+        with self.lock:
+            previous = self.reports.get(epoch, [])
+            self.reports[epoch] = previous + [val_loss]
+        return len(previous) >= self.min_trials and val_loss > float(np.median(previous))
+
+
+_pruner = None
+
+
+def _init_worker(num_threads, reports, lock, prune_config):
+    global _pruner
+    torch.set_num_threads(num_threads)
+    torch.set_num_interop_threads(1)
+    _pruner = MedianPruner(reports, lock, **prune_config) if prune_config is not None else None
+
+
+def _train_trial(params, arrays, target_scaler, num_epochs, batch_size, patience):
+    model_args = {
+        "input_size": arrays["X_train"].shape[-1],
+        "hidden_size": params["hidden_size"],
+        "num_layers": params["num_layers"],
+        "output_size": arrays["y_train"].shape[-1],
+        "dropout": params["dropout"],
+    }
+    # Datasets são views sobre a shared memory: nenhum trial copia os dados
+    train_dataset = TimeSeriesDataset(arrays["X_train"], arrays["y_train"])
+    val_dataset = TimeSeriesDataset(arrays["X_val"], arrays["y_val"])
+    test_dataset = TimeSeriesDataset(arrays["X_test"], arrays["y_test"])
+    history, pruned = [], []
+
+    def on_epoch_end(epoch, train_loss, val_loss):
+        history.append(val_loss)
+        if _pruner is not None and _pruner.should_prune(epoch, val_loss):
+            pruned.append(epoch)
+            return True
+        return False
+
+    model = train_model(
+        LSTMModel(**model_args),
+        train_dataset,
+        val_dataset,
+        num_epochs=num_epochs,
+        batch_size=batch_size,
+        learning_rate=params["lr"],
+        shuffle=True,
+        patience=patience,
+        on_epoch_end=on_epoch_end,
+        log_every=max(1, num_epochs // 10),
+    )
+    val_metrics, _, _ = evaluate_metrics(model, val_dataset, target_scaler)
+    test_metrics, _, _ = evaluate_metrics(model, test_dataset, target_scaler)
+    metrics = {f"val_{name}": value for name, value in val_metrics.items()}
+    metrics.update({f"test_{name}": value for name, value in test_metrics.items()})
+    return model, model_args, metrics, history, bool(pruned)
+
+
+def run_trial(trial_id, params, window_data, num_epochs, batch_size, patience):
+    start = time.perf_counter()
+    blocks, arrays = [], {}
+    for name, descriptor in window_data["arrays"].items():
+        block, arrays[name] = attach_array(descriptor)
+        blocks.append(block)
+
+    try:
+        model, model_args, metrics, history, pruned = _train_trial(
+            params, arrays, window_data["scalers"]["target"], num_epochs, batch_size, patience
+        )
+    finally:
+        arrays.clear()
+        for block in blocks:
+            try:
+                block.close()
+            except BufferError:
+                # Ainda há views vivas (ex.: traceback de uma exceção)
+                pass
+
+    return {
+        "trial": trial_id,
+        "params": params,
+        "model_args": model_args,
+        "metrics": metrics,
+        "val_loss_history": history,
+        "pruned": pruned,
+        "epochs": len(history),
+        "duration_s": time.perf_counter() - start,
+        "state_dict": {k: v.cpu() for k, v in model.state_dict().items()},
+    }
+
+
+def run_sweep(
+    collector,
+    trials,
+    num_epochs=500,
+    batch_size=256,
+    patience=50,
+    max_workers=2,
+    threads_per_trial=1,
+    prune_config=None,
+    on_result=None,
+    horizon=1,
+):
+    blocks, data = build_window_data(collector, [t["window"] for t in trials], horizon=horizon)
+    context = multiprocessing.get_context("spawn")
+    manager = context.Manager()
+    results = []
+    try:
+        with ProcessPoolExecutor(
+            max_workers=max_workers,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(threads_per_trial, manager.dict(), manager.Lock(), prune_config),
+        ) as executor:
+            futures = [
+                executor.submit(
+                    run_trial, i, params, data[params["window"]], num_epochs, batch_size, patience
+                )
+                for i, params in enumerate(trials)
+            ]
+            for future in as_completed(futures):
+                result = future.result()
+                result["scalers"] = data[result["params"]["window"]]["scalers"]
+                results.append(result)
+                if on_result is not None:
+                    on_result(result)
+    finally:
+        manager.shutdown()
+        for block in blocks:
+            block.close()
+            block.unlink()
+
+    # Melhor trial primeiro (menor RMSE de validação na escala de preço); o RMSE de
+    # teste não participa da escolha
+    results.sort(key=lambda r: r["metrics"]["val_rmse"] if math.isfinite(r["metrics"]["val_rmse"]) else math.inf)
+    return results
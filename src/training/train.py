@@ -1,6 +1,61 @@
+import os
+import time
+
+import numpy as np
 import torch
 import torch.nn as nn
-from torch.utils.data import DataLoader
+from numpy.lib.stride_tricks import as_strided
+
+from src.utils.metrics import compute_metrics
+
+
+def _window_series(X):
+    # X de make_windows é uma view em que a janela i+1 começa uma linha depois da i:
+    # devolve a série base (T, F) por trás dela, ou None se X já foi materializado
+    # (ex.: close-only escalado por posição da janela)
+    if X.ndim == 2:
+        X = X[..., None]
+    n, window, n_features = X.shape
+    if n > 1 and X.strides[0] != X.strides[1]:
+        return None
+    series = as_strided(X, shape=(n + window - 1, n_features), strides=X.strides[1:], writeable=False)
+    # Cópia de (T, F) só: a view acima é read-only e pode já ser contígua
+    return np.array(series, dtype=np.float32)
+
+
+def _dataset_tensors(dataset, device):
+    # Junta o dataset inteiro em dois tensores no device, uma única vez
+    if hasattr(dataset, "X") and hasattr(dataset, "y"):
+        X = np.asarray(dataset.X)
+        y = np.ascontiguousarray(dataset.y, dtype=np.float32).reshape(len(X), -1)
+        y = torch.from_numpy(y if y.flags.writeable else y.copy())
+        series = _window_series(X)
+        if series is not None:
+            # Só a série base (T, F) vai para o device; as janelas são uma view (unfold)
+            # e cada batch copia apenas as janelas que indexa
+            window = X.shape[1]
+            X = torch.from_numpy(series).to(device).unfold(0, window, 1).transpose(1, 2)
+            return X, y.to(device)
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        if X.ndim == 2:
+            X = X[..., None]
+        # Views de sliding_window_view são read-only; torch.from_numpy exige cópia nesse caso
+        X = torch.from_numpy(X if X.flags.writeable else X.copy())
+    else:
+        items = [dataset[i] for i in range(len(dataset))]
+        X = torch.stack([x for x, _ in items])
+        y = torch.stack([t for _, t in items]).reshape(len(items), -1)
+    return X.to(device), y.to(device)
+
+
+def _validation_loss(model, X, y, criterion, batch_size, use_bf16):
+    model.eval()
+    total = torch.zeros((), device=X.device)
+    with torch.no_grad(), torch.autocast(X.device.type, dtype=torch.bfloat16, enabled=use_bf16):
+        for start in range(0, len(X), batch_size):
+            outputs = model(X[start : start + batch_size])
+            total += criterion(outputs.float(), y[start : start + batch_size]) * len(outputs)
+    return (total / len(X)).item()
 
 
 def train_model(
@@ -10,53 +65,134 @@ def train_model(
     num_epochs=50,
     batch_size=64,
     learning_rate=0.005,
+    shuffle=False,
+    patience=None,
+    checkpoint_path=None,
+    use_bf16=False,
+    compile_model=False,
+    on_epoch_end=None,
+    log_every=1,
 ):
-    train_loader = DataLoader(train_dataset, batch_size=batch_size, shuffle=False)
-    test_loader = DataLoader(test_dataset, batch_size=batch_size, shuffle=False)
-
     device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
     model = model.to(device)
 
+    # Dados pré-colados no device: cada batch é só um slice/index de tensor (sobre a
+    # view de janelas quando o dataset vem de make_windows)
+    X_train, y_train = _dataset_tensors(train_dataset, device)
+    has_validation = test_dataset is not None and len(test_dataset) > 0
+    if has_validation:
+        X_val, y_val = _dataset_tensors(test_dataset, device)
+
+    forward = torch.compile(model) if compile_model else model
     criterion = nn.MSELoss()
     optimizer = torch.optim.Adam(model.parameters(), lr=learning_rate)
 
+    n_samples = len(X_train)
+    best_loss, best_state, bad_epochs = float("inf"), None, 0
+
     for epoch in range(num_epochs):
+        start_time = time.perf_counter()
         model.train()
-        running_loss = 0.0
-        for inputs, targets in train_loader:
-            inputs, targets = (
-                inputs.to(device),
-                targets.to(device),
-            )  # <-- USE device here
-            outputs = model(inputs)
-            loss = criterion(outputs, targets)
-
-            optimizer.zero_grad()
+        order = torch.randperm(n_samples, device=device) if shuffle else None
+        # Loss acumulada no device; só sincroniza uma vez por época
+        running_loss = torch.zeros((), device=device)
+        for start in range(0, n_samples, batch_size):
+            if order is None:
+                inputs = X_train[start : start + batch_size]
+                targets = y_train[start : start + batch_size]
+            else:
+                idx = order[start : start + batch_size]
+                inputs, targets = X_train[idx], y_train[idx]
+
+            with torch.autocast(device.type, dtype=torch.bfloat16, enabled=use_bf16):
+                outputs = forward(inputs)
+            loss = criterion(outputs.float(), targets)
+
+            optimizer.zero_grad(set_to_none=True)
             loss.backward()
             optimizer.step()
 
-            running_loss += loss.item()
+            running_loss += loss.detach() * len(inputs)
+
+        avg_loss = (running_loss / n_samples).item()
+        samples_per_sec = n_samples / (time.perf_counter() - start_time)
+        message = f"Epoch [{epoch + 1}/{num_epochs}], Loss: {avg_loss:.4f}"
+
+        if has_validation:
+            val_loss = _validation_loss(forward, X_val, y_val, criterion, 4096, use_bf16)
+            message += f", Val Loss: {val_loss:.4f}"
+            if val_loss < best_loss:
+                best_loss, bad_epochs = val_loss, 0
+                best_state = {k: v.detach().clone() for k, v in model.state_dict().items()}
+                if checkpoint_path:
+                    os.makedirs(os.path.dirname(checkpoint_path) or ".", exist_ok=True)
+                    torch.save(best_state, checkpoint_path)
+            else:
+                bad_epochs += 1
+
+        if (epoch + 1) % log_every == 0:
+            print(f"{message}, {samples_per_sec:.0f} samples/s")
+
+        # Callback opcional (ex.: pruning no sweep); retornar True interrompe o treino
+        if on_epoch_end is not None and on_epoch_end(
+            epoch, avg_loss, val_loss if has_validation else None
+        ):
+            print(f"Training stopped by callback at epoch {epoch + 1}")
+            break
 
-        avg_loss = running_loss / len(train_loader)
-        print(f"Epoch [{epoch + 1}/{num_epochs}], Loss: {avg_loss:.4f}")
+        if patience is not None and bad_epochs >= patience:
+            print(f"Early stopping at epoch {epoch + 1}, best Val Loss: {best_loss:.4f}")
+            break
+
+    # Com early stopping, devolve os pesos da melhor época de validação
+    if patience is not None and best_state is not None:
+        model.load_state_dict(best_state)
 
     return model
 
 
-def evaluate_model(model, test_dataset):
-    test_loader = DataLoader(test_dataset, batch_size=1, shuffle=False)
+def _iter_batches(dataset, batch_size):
+    # Fatia o dataset em batches grandes sem materializar tudo de uma vez
+    if hasattr(dataset, "X") and hasattr(dataset, "y"):
+        for start in range(0, len(dataset), batch_size):
+            X = np.asarray(dataset.X[start : start + batch_size], dtype=np.float32)
+            if X.ndim == 2:
+                X = X[..., None]
+            y = np.asarray(dataset.y[start : start + batch_size], dtype=np.float32)
+            yield torch.from_numpy(np.ascontiguousarray(X)), y.reshape(len(X), -1)
+    else:
+        X, y = _dataset_tensors(dataset, torch.device("cpu"))
+        for start in range(0, len(X), batch_size):
+            yield X[start : start + batch_size], y[start : start + batch_size].numpy()
 
-    device = torch.device(
-        "cuda" if torch.cuda.is_available() else "cpu"
-    )  # <-- Add this
-    model = model.to(device)  # <-- Move model to device
 
+def evaluate_model(model, test_dataset, batch_size=4096):
+    device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+    model = model.to(device)
     model.eval()
-    predictions, actuals = [], []
+
+    n_samples = len(test_dataset)
+    predictions, actuals = None, None
     with torch.no_grad():
-        for inputs, targets in test_loader:
-            inputs = inputs.to(device)  # <-- Use device, not model.device
-            outputs = model(inputs)
-            predictions.append(outputs.cpu().numpy())
-            actuals.append(targets.numpy())
+        for start, (inputs, targets) in zip(
+            range(0, n_samples, batch_size), _iter_batches(test_dataset, batch_size)
+        ):
+            outputs = model(inputs.to(device)).cpu().numpy()
+            if predictions is None:
+                # Saídas pré-alocadas e contíguas: (N, output_size)
+                predictions = np.empty((n_samples, outputs.shape[1]), dtype=np.float32)
+                actuals = np.empty((n_samples, targets.shape[1]), dtype=np.float32)
+            predictions[start : start + len(outputs)] = outputs
+            actuals[start : start + len(outputs)] = targets
+    if predictions is None:
+        return np.empty((0, 1), dtype=np.float32), np.empty((0, 1), dtype=np.float32)
     return predictions, actuals
+
+
+def evaluate_metrics(model, test_dataset, target_scaler=None, batch_size=4096):
+    # Avalia e calcula as métricas de uma vez; com target_scaler, na escala de preço
+    predictions, actuals = evaluate_model(model, test_dataset, batch_size)
+    if target_scaler is not None:
+        predictions = target_scaler.inverse_transform(predictions.reshape(-1, 1)).reshape(predictions.shape)
+        actuals = target_scaler.inverse_transform(actuals.reshape(-1, 1)).reshape(actuals.shape)
+    return compute_metrics(actuals, predictions), predictions, actuals
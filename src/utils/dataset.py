@@ -1,14 +1,22 @@
+import numpy as np
 import torch
 from torch.utils.data import Dataset
 
 
 class TimeSeriesDataset(Dataset):
+    # X pode ser uma view de janelas (src.utils.windows); cada item é convertido
+    # sob demanda, então só a janela pedida é copiada para o tensor
     def __init__(self, X, y):
-        self.X = torch.tensor(X, dtype=torch.float32)
-        self.y = torch.tensor(y, dtype=torch.float32).unsqueeze(1)
+        self.X = np.asarray(X)
+        self.y = np.asarray(y).reshape(len(self.X), -1)
 
     def __len__(self):
         return len(self.X)
 
     def __getitem__(self, idx):
-        return self.X[idx], self.y[idx]
+        x = self.X[idx]
+        if self.X.ndim == 2:
+            x = x[..., None]
+        x = torch.from_numpy(np.ascontiguousarray(x, dtype=np.float32))
+        y = torch.from_numpy(np.ascontiguousarray(self.y[idx], dtype=np.float32))
+        return x, y
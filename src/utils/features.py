@@ -0,0 +1,80 @@
+import re
+
+import numpy as np
+
+# Colunas brutas que os feeds podem trazer além de `date`
+OHLCV_COLUMNS = ("open", "high", "low", "close", "volume")
+
+# Conjunto usado no treino multi-feature; `close` é sempre a coluna 0 (target)
+DEFAULT_FEATURES = ("close", "return_1", "sma_ratio_10", "volatility_10")
+
+
+def rolling_mean(x, n):
+    # Média móvel por soma acumulada: O(T), sem loop em Python nem pandas.rolling.
+    # NaNs iniciais (ex.: o 1º retorno) são pulados para não contaminar a soma
+    x = np.asarray(x, dtype=np.float64)
+    out = np.full(len(x), np.nan)
+    valid = np.flatnonzero(~np.isnan(x))
+    start = valid[0] if len(valid) else len(x)
+    if len(x) - start >= n:
+        c = np.cumsum(np.concatenate(([0.0], x[start:])))
+        out[start + n - 1 :] = (c[n:] - c[:-n]) / n
+    return out
+
+
+def rolling_std(x, n):
+    # Desvio padrão populacional móvel via E[x²] - E[x]²; pensado para retornos
+    # (valores pequenos e centrados), não para preços
+    mean = rolling_mean(x, n)
+    mean_sq = rolling_mean(np.square(np.asarray(x, dtype=np.float64)), n)
+    return np.sqrt(np.maximum(mean_sq - np.square(mean), 0.0))
+
+
+def log_returns(close):
+    close = np.asarray(close, dtype=np.float64)
+    out = np.full(len(close), np.nan)
+    out[1:] = np.diff(np.log(close))
+    return out
+
+
+def _column(frame, name):
+    if name not in frame:
+        raise ValueError(f"Feature requires column '{name}', which the price data does not have")
+    return frame[name].to_numpy(dtype=np.float64)
+
+
+def compute_feature(frame, name):
+    if name in OHLCV_COLUMNS:
+        return _column(frame, name)
+    if name == "return_1":
+        return log_returns(_column(frame, "close"))
+    if name == "range":
+        return (_column(frame, "high") - _column(frame, "low")) / _column(frame, "close")
+    if name == "log_volume":
+        return np.log1p(_column(frame, "volume"))
+
+    match = re.fullmatch(r"(sma_ratio|volatility)_(\d+)", name)
+    if match is None:
+        raise ValueError(f"Unknown feature '{name}'")
+    kind, n = match.group(1), int(match.group(2))
+    close = _column(frame, "close")
+    if kind == "sma_ratio":
+        return close / rolling_mean(close, n) - 1.0
+    return rolling_std(log_returns(close), n)
+
+
+def build_features(frame, names=DEFAULT_FEATURES):
+    # Matriz (T', n_features) float32 contígua, sem as linhas iniciais de aquecimento
+    # das janelas móveis; devolve também quantas linhas do frame foram descartadas
+    names = list(names)
+    if names[0] != "close":
+        raise ValueError("The first feature must be 'close' (it is the prediction target)")
+
+    matrix = np.empty((len(frame), len(names)), dtype=np.float32)
+    offset = 0
+    for j, name in enumerate(names):
+        column = compute_feature(frame, name)
+        valid = np.flatnonzero(~np.isnan(column))
+        offset = max(offset, valid[0] if len(valid) else len(column))
+        matrix[:, j] = column
+    return matrix[offset:], offset
@@ -0,0 +1,89 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+
+# Métricas em processo no formato texto do Prometheus. Com vários workers do
+# uvicorn cada processo tem os seus contadores (o scrape vê o worker que respondeu)
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024)
+
+
+def _labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in labels) + "}"
+
+
+class Histogram:
+    def __init__(self, name, help_text, buckets, label_names=()):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(buckets)
+        self.label_names = tuple(label_names)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple((name, labels[name]) for name in self.label_names)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = {key: (list(counts), total, n) for key, (counts, total, n) in self._series.items()}
+        for key, (counts, total, n) in sorted(series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), counts):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_labels(key + (('le', bound),))} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(key)} {total}")
+            lines.append(f"{self.name}_count{_labels(key)} {n}")
+        return lines
+
+    def summary(self):
+        with self._lock:
+            return {
+                ",".join(str(v) for _, v in key): {"count": n, "avg_s": total / n if n else 0.0}
+                for key, (_, total, n) in self._series.items()
+            }
+
+
+STAGE_SECONDS = Histogram(
+    "lstm_stage_duration_seconds", "Time spent in each pipeline stage", LATENCY_BUCKETS, ("stage",)
+)
+BATCH_SIZE = Histogram("lstm_forward_batch_size", "Rows per forward pass", SIZE_BUCKETS, ("path",))
+
+_collectors = []
+
+
+def register_collector(name, help_text, metric_type, collect):
+    # collect() -> {labels tuple: valor}; lido a cada render (ex.: contadores de cache)
+    _collectors.append((name, help_text, metric_type, collect))
+
+
+@contextmanager
+def timed(stage):
+    # Também funciona como decorator (@timed("split_data"))
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_SECONDS.observe(time.perf_counter() - start, stage=stage)
+
+
+def render():
+    lines = STAGE_SECONDS.render() + BATCH_SIZE.render()
+    for name, help_text, metric_type, collect in _collectors:
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {metric_type}"]
+        for labels, value in sorted(collect().items()):
+            lines.append(f"{name}{_labels(labels)} {value}")
+    return "\n".join(lines) + "\n"
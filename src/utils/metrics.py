@@ -11,3 +11,35 @@ def root_mean_squared_error(y_true, y_pred):
 
 def mean_absolute_error(y_true, y_pred):
     return np.mean(np.abs(y_true - y_pred))
+
+
+def mean_absolute_percentage_error(y_true, y_pred):
+    return np.mean(np.abs((y_true - y_pred) / y_true)) * 100
+
+
+def directional_accuracy(y_true, y_pred):
+    # Fração de passos em que a predição acerta a direção do movimento em
+    # relação ao valor real anterior (usa o primeiro passo do horizonte)
+    y_true = np.asarray(y_true).reshape(len(y_true), -1)[:, 0]
+    y_pred = np.asarray(y_pred).reshape(len(y_pred), -1)[:, 0]
+    if len(y_true) < 2:
+        return float("nan")
+    true_direction = np.sign(y_true[1:] - y_true[:-1])
+    pred_direction = np.sign(y_pred[1:] - y_true[:-1])
+    return np.mean(true_direction == pred_direction)
+
+
+def compute_metrics(y_true, y_pred):
+    errors = y_true - y_pred
+    mse = np.mean(errors**2)
+    metrics = {
+        "rmse": float(np.sqrt(mse)),
+        "mae": float(np.mean(np.abs(errors))),
+        "mape": float(mean_absolute_percentage_error(y_true, y_pred)),
+        "directional_accuracy": float(directional_accuracy(y_true, y_pred)),
+    }
+    # Multi-horizonte: o erro cresce com a distância, então reporta o RMSE por passo
+    if np.ndim(errors) == 2 and errors.shape[1] > 1:
+        for step, step_mse in enumerate(np.mean(errors**2, axis=0), start=1):
+            metrics[f"rmse_h{step}"] = float(np.sqrt(step_mse))
+    return metrics
@@ -0,0 +1,83 @@
+import time
+
+
+class MlflowBatchLogger:
+    # Acumula runs (params, métricas finais e séries por step) e envia cada uma
+    # com um único log_batch, em vez de uma chamada HTTP por param/métrica
+    def __init__(self, experiment_name, flush_every=16):
+        import mlflow
+        from mlflow import MlflowClient
+
+        self.client = MlflowClient()
+        experiment = mlflow.set_experiment(experiment_name)
+        self.experiment_id = experiment.experiment_id
+        self.flush_every = flush_every
+        self.run_ids = {}
+        self._pending = []
+
+    def add_run(self, run_name, params, metrics, series=None, tags=None):
+        self._pending.append((run_name, params, metrics, series or {}, tags or {}))
+        if len(self._pending) >= self.flush_every:
+            self.flush()
+
+    def flush(self):
+        from mlflow.entities import Metric, Param, RunTag
+
+        for run_name, params, metrics, series, tags in self._pending:
+            run = self.client.create_run(self.experiment_id, run_name=run_name)
+            run_id = run.info.run_id
+            timestamp = int(time.time() * 1000)
+            metric_list = [Metric(k, float(v), timestamp, 0) for k, v in metrics.items()]
+            for name, values in series.items():
+                metric_list += [
+                    Metric(name, float(v), timestamp, step)
+                    for step, v in enumerate(values)
+                    if v is not None
+                ]
+            param_list = [Param(k, str(v)) for k, v in params.items()]
+            tag_list = [RunTag(k, str(v)) for k, v in tags.items()]
+
+            # O MLflow aceita até 1000 métricas por log_batch
+            for i in range(0, max(len(metric_list), 1), 1000):
+                self.client.log_batch(
+                    run_id,
+                    metrics=metric_list[i : i + 1000],
+                    params=param_list if i == 0 else [],
+                    tags=tag_list if i == 0 else [],
+                )
+            self.client.set_terminated(run_id)
+            self.run_ids[run_name] = run_id
+        self._pending = []
+
+
+def promote_if_better(model_name, version, metric_name, value, alias="champion"):
+    # Move o alias para `version` se a métrica (menor é melhor) superar a do
+    # campeão atual, ou se ainda não houver campeão. Campeão sem a métrica não
+    # é comparável: mantém o alias e avisa
+    from mlflow import MlflowClient
+
+    client = MlflowClient()
+    try:
+        champion = client.get_model_version_by_alias(model_name, alias)
+    except Exception:
+        champion = None
+
+    if champion is not None:
+        champion_metrics = client.get_run(champion.run_id).data.metrics
+        champion_value = champion_metrics.get(metric_name)
+        if champion_value is None:
+            print(
+                f"Warning: '{alias}' version {champion.version} has no '{metric_name}' metric, "
+                f"not promoting version {version} ({metric_name} {value:.4f})"
+            )
+            return False
+        if champion_value <= value:
+            print(
+                f"Keeping '{alias}' at version {champion.version} "
+                f"({metric_name} {champion_value:.4f} <= {value:.4f})"
+            )
+            return False
+
+    client.set_registered_model_alias(model_name, alias, version)
+    print(f"Model version {version} set as '{alias}' alias ({metric_name} {value:.4f})")
+    return True
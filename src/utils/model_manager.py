@@ -1,26 +1,104 @@
 import json
 import os
 
+import joblib
 import torch
 
+from src.utils.instrumentation import timed
+
+# Scalers dentro da run do MLflow: o modo MLflow da API precisa deles tanto quanto o .pth
+SCALERS_ARTIFACT = "scalers/model_scalers.joblib"
+
 
 class ModelManager:
     @staticmethod
-    def save_model(model, file_path, model_args):
-        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    def _write_atomic(path, write):
+        # Escreve num arquivo novo e troca de uma vez (os.replace)
+        tmp_path = path + ".tmp"
+        write(tmp_path)
+        os.replace(tmp_path, path)
 
-        # Salva pesos do modelo
-        torch.save(model.state_dict(), file_path)
-        print(f"Model saved to {file_path}")
+    @staticmethod
+    def save_model(model, file_path, model_args, scalers=None, training_info=None):
+        os.makedirs(os.path.dirname(file_path) or ".", exist_ok=True)
+        base = os.path.splitext(file_path)[0]
+
+        def dump_json(data):
+            def write(path):
+                with open(path, "w") as f:
+                    json.dump(data, f, indent=4, default=str)
+            return write
 
-        # Salva metadata
+        # Arquivos auxiliares antes dos pesos: o watcher do registry só olha o mtime
+        # do .pth, então quando ele muda metadata e scalers já são os novos
         metadata_path = file_path.replace(".pth", "_metadata.json")
-        with open(metadata_path, "w") as f:
-            json.dump(model_args, f, indent=4)
+        ModelManager._write_atomic(metadata_path, dump_json(model_args))
         print(f"Model metadata saved to {metadata_path}")
 
+        # Salva os scalers ajustados no treino junto com o modelo
+        if scalers is not None:
+            scalers_path = base + "_scalers.joblib"
+            ModelManager._write_atomic(scalers_path, lambda path: joblib.dump(scalers, path))
+            print(f"Model scalers saved to {scalers_path}")
+
+        # Dados do treino (ticker, corte, janela...) usados pelo fine-tuning incremental;
+        # fica fora do _metadata.json, que vira os kwargs do modelo
+        if training_info is not None:
+            training_path = base + "_training.json"
+            ModelManager._write_atomic(training_path, dump_json(training_info))
+            print(f"Model training info saved to {training_path}")
+
+        # Pesos por último, num arquivo novo trocado de uma vez: workers que mapeiam
+        # o .pth (mmap) continuam lendo o inode antigo até recarregar
+        ModelManager._write_atomic(file_path, lambda path: torch.save(model.state_dict(), path))
+        print(f"Model saved to {file_path}")
+
+    @staticmethod
+    def load_metadata(file_path):
+        with open(file_path.replace(".pth", "_metadata.json"), "r") as f:
+            return json.load(f)
+
+    @staticmethod
+    def load_training_info(file_path):
+        training_path = os.path.splitext(file_path)[0] + "_training.json"
+        if not os.path.exists(training_path):
+            return None
+        with open(training_path, "r") as f:
+            return json.load(f)
+
+    @staticmethod
+    def log_scalers_mlflow(scalers):
+        # Chamado dentro de uma run ativa (mlflow.start_run)
+        import tempfile
+
+        import mlflow
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, os.path.basename(SCALERS_ARTIFACT))
+            joblib.dump(scalers, path)
+            mlflow.log_artifact(path, artifact_path=os.path.dirname(SCALERS_ARTIFACT))
+
     @staticmethod
-    def load_model(model_class, file_path):
+    def load_scalers_mlflow(run_id):
+        # None para versões registradas antes dos scalers irem para o MLflow
+        import mlflow
+
+        try:
+            path = mlflow.artifacts.download_artifacts(run_id=run_id, artifact_path=SCALERS_ARTIFACT)
+        except Exception:
+            return None
+        return joblib.load(path)
+
+    @staticmethod
+    def load_scalers(file_path):
+        scalers_path = os.path.splitext(file_path)[0] + "_scalers.joblib"
+        if not os.path.exists(scalers_path):
+            return None
+        return joblib.load(scalers_path)
+
+    @staticmethod
+    @timed("model_load")
+    def load_model(model_class, file_path, mmap=False):
         import json
 
         device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
@@ -29,10 +107,88 @@ class ModelManager:
         with open(metadata_path, "r") as f:
             model_args = json.load(f)
 
-        model = model_class(**model_args)
-        model.load_state_dict(torch.load(file_path, map_location=device))
-        model = model.to(device)
+        if mmap and device.type == "cpu":
+            # Os parâmetros apontam para o próprio arquivo mapeado: as páginas ficam
+            # no page cache e são compartilhadas por todos os workers que carregam o
+            # mesmo .pth. O módulo nasce em "meta" para não alocar pesos descartáveis
+            state = torch.load(file_path, map_location="cpu", mmap=True, weights_only=True)
+            with torch.device("meta"):
+                model = model_class(**model_args)
+            model.load_state_dict(state, assign=True)
+        else:
+            model = model_class(**model_args)
+            model.load_state_dict(torch.load(file_path, map_location=device))
+            model = model.to(device)
         model.eval()
 
         print(f"Model loaded from {file_path}")
         return model
+
+    @staticmethod
+    def export_model(model, file_path, example_input, quantize=False, scalers=None):
+        # Exporta para TorchScript (.pt) ou ONNX (.onnx), com quantização int8
+        # dinâmica opcional das camadas LSTM e Linear
+        os.makedirs(os.path.dirname(file_path) or ".", exist_ok=True)
+        model = model.cpu().eval()
+        example_input = example_input.cpu()
+
+        if file_path.endswith(".pt"):
+            if quantize:
+                model = torch.ao.quantization.quantize_dynamic(
+                    model, {torch.nn.LSTM, torch.nn.Linear}, dtype=torch.qint8
+                )
+            with torch.no_grad():
+                traced = torch.jit.trace(model, example_input)
+            torch.jit.save(traced, file_path)
+        elif file_path.endswith(".onnx"):
+            fp32_path = file_path.replace(".onnx", "_fp32.onnx") if quantize else file_path
+            torch.onnx.export(
+                model,
+                (example_input,),
+                fp32_path,
+                input_names=["x"],
+                output_names=["y"],
+                dynamic_axes={"x": {0: "batch", 1: "window"}, "y": {0: "batch"}},
+                dynamo=False,
+            )
+            if quantize:
+                from onnxruntime.quantization import QuantType, quantize_dynamic
+
+                quantize_dynamic(fp32_path, file_path, weight_type=QuantType.QInt8)
+                os.remove(fp32_path)
+        else:
+            raise ValueError(f"Unsupported export format: {file_path} (use .pt or .onnx)")
+        print(f"Model exported to {file_path}")
+
+        if scalers is not None:
+            scalers_path = os.path.splitext(file_path)[0] + "_scalers.joblib"
+            joblib.dump(scalers, scalers_path)
+            print(f"Model scalers saved to {scalers_path}")
+
+    @staticmethod
+    @timed("model_load")
+    def load_exported(file_path):
+        # Carrega o artefato exportado sem precisar da classe do modelo nem do MLflow
+        if file_path.endswith(".pt"):
+            model = torch.jit.load(file_path, map_location="cpu")
+            model.eval()
+        elif file_path.endswith(".onnx"):
+            from src.model.runtime import OnnxRuntimeModel
+
+            model = OnnxRuntimeModel(file_path)
+        else:
+            raise ValueError(f"Unsupported export format: {file_path} (use .pt or .onnx)")
+        print(f"Exported model loaded from {file_path}")
+        return model
+
+    @staticmethod
+    def check_parity(reference, candidate, inputs, atol=1e-4):
+        with torch.no_grad():
+            expected = reference(inputs).cpu()
+            actual = candidate(inputs).cpu()
+        diff = (expected - actual).abs()
+        return {
+            "max_abs_diff": float(diff.max()),
+            "mean_abs_diff": float(diff.mean()),
+            "ok": bool(diff.max() <= atol),
+        }
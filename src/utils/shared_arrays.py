@@ -0,0 +1,19 @@
+from multiprocessing import shared_memory
+
+import numpy as np
+
+
+def share_array(array):
+    # Copia o array para um bloco de shared memory; devolve o bloco (o dono deve
+    # chamar close()/unlink()) e um descritor picklable para os workers
+    array = np.ascontiguousarray(array)
+    block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[...] = array
+    return block, (block.name, array.shape, array.dtype.str)
+
+
+def attach_array(descriptor):
+    # O bloco precisa ficar referenciado enquanto o array for usado
+    name, shape, dtype = descriptor
+    block = shared_memory.SharedMemory(name=name)
+    return block, np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf)
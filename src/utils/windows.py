@@ -0,0 +1,41 @@
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+# Janelas deslizantes como views (sem cópia) sobre `series`.
+# series (T,) -> X (N, window); series (T, n_features) -> X (N, window, n_features).
+# y é (N, horizon), tirado da coluna `target`.
+def make_windows(series, window, horizon=1, target=0):
+    series = np.asarray(series)
+    n = len(series) - window - horizon + 1
+    if n <= 0:
+        raise ValueError(
+            f"Not enough data ({len(series)} rows) for window={window} and horizon={horizon}"
+        )
+
+    if series.ndim == 1:
+        X = sliding_window_view(series, window)[:n]
+        target_series = series
+    else:
+        # (T - window + 1, n_features, window) -> (N, window, n_features)
+        X = sliding_window_view(series, window, axis=0)[:n].transpose(0, 2, 1)
+        target_series = series[:, target]
+
+    y = sliding_window_view(target_series[window:], horizon)[:n]
+    return X, y
+
+
+def split_windows(X, y, test_size=0.2):
+    split_index = int((1 - test_size) * len(X))
+    return X[:split_index], X[split_index:], y[:split_index], y[split_index:]
+
+
+def split_validation(X, y, val_size=0.1, gap=0):
+    # Validação (early stopping, pruning, escolha do modelo) das últimas janelas de
+    # treino, para o teste ficar só com as métricas finais. `gap` janelas entre as
+    # duas partes (horizon - 1) evitam targets de treino dentro da validação
+    val_start = len(X) - max(1, int(val_size * len(X)))
+    fit_end = val_start - gap
+    if fit_end <= 0:
+        raise ValueError(f"Not enough training windows ({len(X)}) for val_size={val_size} and gap={gap}")
+    return X[:fit_end], X[val_start:], y[:fit_end], y[val_start:]
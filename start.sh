@@ -1,8 +1,12 @@
 #!/bin/bash
 set -e
 
-echo "Running data processing script..."
-python data/process_data.py || echo "[WARNING] data/process_data.py failed, continuing..."
+# Cache pré-compilado do modelo: com MODEL_PATH=*.pt, exporta o TorchScript uma
+# vez a partir do .pth para que a API não precise reconstruir o módulo no startup
+if [[ "${MODEL_PATH:-}" == *.pt && ! -f "$MODEL_PATH" ]]; then
+    echo "Exporting TorchScript model cache to $MODEL_PATH..."
+    python scripts/export_model.py --output "$MODEL_PATH" || echo "[WARNING] model export failed, continuing..."
+fi
 
 #python scripts/run_train.py || echo "[WARNING] scripts/run_train.py failed, continuing..."
 
@@ -11,7 +15,7 @@ mlflow server --host 0.0.0.0 --port 8081 &
 MLFLOW_PID=$!
 
 echo "Starting FastAPI server..."
-uvicorn api:app --host 0.0.0.0 --port 8000 &
+uvicorn api:app --host 0.0.0.0 --port 8000 --workers "${WEB_CONCURRENCY:-1}" &
 FASTAPI_PID=$!
 
 # Wait for any process to exit
@@ -0,0 +1,48 @@
+import os
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(ROOT)
+
+# Config do serving lida no import do api: feed CSV, store temporário, sem shadow/log
+os.environ.update({
+    "MODEL_PATH": os.path.join(ROOT, "models", "lstm_petra.pth"),
+    "PRICE_FEED": "csv",
+    "PRICE_STORE_DIR": tempfile.mkdtemp(prefix="test_store_"),
+    "SHADOW_ENABLED": "0",
+    "PREDICTION_LOG_ENABLED": "0",
+})
+
+from fastapi.testclient import TestClient
+
+import api
+
+
+def test_ready_is_503_until_model_is_warm(monkeypatch):
+    monkeypatch.chdir(ROOT)
+    release = threading.Event()
+    load_champion = api.load_champion
+
+    def slow_load():
+        release.wait(timeout=30)
+        load_champion()
+
+    monkeypatch.setattr(api, "load_champion", slow_load)
+    with TestClient(api.app) as client:
+        response = client.get("/ready")
+        assert response.status_code == 503 and response.json()["ready"] is False
+        response = client.get("/predict")
+        assert response.status_code == 503 and "Retry-After" in response.headers
+
+        release.set()
+        deadline = time.monotonic() + 30
+        response = client.get("/ready")
+        while response.status_code != 200:
+            assert time.monotonic() < deadline, response.json()
+            time.sleep(0.05)
+            response = client.get("/ready")
+        assert {"load_model", "warm_forward"} <= set(response.json()["phases_s"])
+        assert client.get("/predict").status_code == 200
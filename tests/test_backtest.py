@@ -0,0 +1,41 @@
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import numpy as np
+import pandas as pd
+
+from src.training.backtest import run_backtest, walk_forward_folds
+
+
+def test_folds_expand_and_leave_a_gap_for_the_horizon():
+    folds = walk_forward_folds(100, initial_train=40, test_size=20, gap=2)
+
+    assert folds == [(0, 40, 42, 62), (0, 60, 62, 82), (0, 80, 82, 100)]
+    rolling = walk_forward_folds(100, initial_train=40, test_size=20, max_train=40)
+    assert [f[:2] for f in rolling] == [(0, 40), (20, 60), (40, 80)]
+
+
+def test_backtest_warm_starts_folds_in_process():
+    closes = 20 + np.cumsum(np.random.default_rng(0).normal(0, 0.2, 400))
+    prices = {"SYN": pd.DataFrame({"date": pd.bdate_range("2020-01-01", periods=400), "close": closes})}
+
+    results = run_backtest(
+        prices,
+        window=10,
+        initial_train=200,
+        test_size=60,
+        epochs=2,
+        warm_epochs=1,
+        hidden_size=8,
+        num_layers=1,
+        dropout=0.0,
+        max_workers=0,
+    )
+
+    assert [r["fold"] for r in results] == [0, 1, 2, 3]
+    assert [r["warm_start"] for r in results] == [False, True, True, True]
+    assert [r["epochs"] for r in results] == [2, 1, 1, 1]
+    assert all(r["train_end"] < r["test_start"] for r in results)
+    assert all(np.isfinite(r["rmse"]) for r in results)
@@ -0,0 +1,85 @@
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+CSV_PATH = os.path.join(os.path.dirname(__file__), "..", "data", "PETRA_4.csv")
+
+from data.price_store import CsvFeed, PriceStore
+from src.model.lstm_model import LSTMModel
+from src.serving import batch_predict
+from src.serving.executors import InflightLimiter, make_executors, release_once
+
+
+def test_predict_many_uses_shared_executors(monkeypatch):
+    inflight, peak = [0], [0]
+    lock = threading.Lock()
+
+    def fake_build_input(stock, window, start_date, store, scalers):
+        with lock:
+            inflight[0] += 1
+            peak[0] = max(peak[0], inflight[0])
+        time.sleep(0.01)
+        with lock:
+            inflight[0] -= 1
+        if stock == "BAD":
+            raise ValueError("no data")
+        return np.full((window, 1), len(stock), dtype=np.float32), None
+
+    monkeypatch.setattr(batch_predict, "build_input", fake_build_input)
+    monkeypatch.setattr(batch_predict, "inverse_target", lambda scaler, output: output)
+    model = LSTMModel(input_size=1, hidden_size=4, num_layers=1, output_size=1, dropout=0.0).eval()
+    forward_threads = set()
+    model.register_forward_hook(lambda *args: forward_threads.add(threading.current_thread().name))
+
+    fetch_executor, inference_executor = make_executors(8, 1)
+    stocks = [f"T{i}" for i in range(20)] + ["BAD"]
+    try:
+        results = list(batch_predict.predict_many(
+            model, stocks, window=5, max_workers=3, chunk_size=4,
+            fetch_executor=fetch_executor, inference_executor=inference_executor,
+        ))
+    finally:
+        fetch_executor.shutdown()
+        inference_executor.shutdown()
+
+    assert sorted(r["stock"] for r in results) == sorted(stocks)
+    assert [r["error"] for r in results if "error" in r] == ["no data"]
+    # Nunca mais que max_workers buscas no executor compartilhado, forward só na inferência
+    assert peak[0] <= 3
+    assert forward_threads and all(name.startswith("inference") for name in forward_threads)
+
+
+def test_release_once_returns_slot_a_single_time():
+    limiter = InflightLimiter(1)
+    assert limiter.try_acquire()
+    assert not limiter.try_acquire()
+    release = release_once(limiter)
+    release()
+    release()
+    assert limiter.inflight == 0 and limiter.try_acquire()
+
+
+class FailingFeed:
+    # CSV para PETR4.SA; qualquer outro ticker falha como um feed fora do ar
+    def __init__(self):
+        self.feed = CsvFeed(CSV_PATH)
+
+    def fetch(self, ticker, start=None):
+        if ticker != "PETR4.SA":
+            raise ConnectionError(f"feed unavailable for {ticker}")
+        return self.feed.fetch(ticker, start=start)
+
+
+def test_failed_fetch_yields_error_row_not_fallback_prices(tmp_path):
+    store = PriceStore(feed=FailingFeed(), root=str(tmp_path))
+    model = LSTMModel(input_size=1, hidden_size=4, num_layers=1, output_size=1, dropout=0.0).eval()
+
+    results = {r["stock"]: r for r in batch_predict.predict_many(model, ["PETR4.SA", "VALE3.SA"], window=10, store=store)}
+
+    assert "predicted_value" in results["PETR4.SA"]
+    assert results["VALE3.SA"] == {"stock": "VALE3.SA", "error": "feed unavailable for VALE3.SA"}
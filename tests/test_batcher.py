@@ -0,0 +1,54 @@
+import asyncio
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import torch
+
+from src.model.lstm_model import LSTMModel
+from src.serving.batcher import MicroBatcher
+
+
+def test_concurrent_requests_share_one_forward():
+    torch.manual_seed(0)
+    model = LSTMModel(input_size=1, hidden_size=8, num_layers=1, output_size=1, dropout=0.0).eval()
+    inputs = torch.randn(10, 7, 1)
+
+    async def run():
+        batcher = MicroBatcher(lambda: model, max_batch_size=16, max_wait_ms=50)
+        await batcher.start()
+        outputs = await asyncio.gather(*(batcher.submit(x) for x in inputs))
+        await batcher.stop()
+        return outputs, batcher.stats()
+
+    outputs, stats = asyncio.run(run())
+
+    with torch.no_grad():
+        expected = model(inputs)
+    torch.testing.assert_close(torch.stack(outputs), expected)
+    assert stats["batches"] == 1
+    assert stats["requests"] == 10
+
+
+def test_requests_keep_the_model_they_submitted_with():
+    # Hot-swap no meio da janela do batcher: cada request roda no modelo da sua entry
+    torch.manual_seed(0)
+    old, new = (LSTMModel(input_size=1, hidden_size=8, num_layers=1, output_size=1, dropout=0.0).eval() for _ in range(2))
+    current = {"model": new}
+    inputs = torch.randn(6, 7, 1)
+
+    async def run():
+        batcher = MicroBatcher(lambda: current["model"], max_batch_size=16, max_wait_ms=50)
+        await batcher.start()
+        models = [old, new] * 3
+        outputs = await asyncio.gather(*(batcher.submit(x, model) for x, model in zip(inputs, models)))
+        await batcher.stop()
+        return models, outputs, batcher.stats()
+
+    models, outputs, stats = asyncio.run(run())
+
+    with torch.no_grad():
+        for x, model, output in zip(inputs, models, outputs):
+            torch.testing.assert_close(output, model(x.unsqueeze(0))[0])
+    assert stats["batches"] == 2
@@ -0,0 +1,28 @@
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from benchmarks.run_benchmarks import compare, result
+
+
+def test_compare_flags_only_gated_regressions_beyond_tolerance():
+    baseline = {
+        "split": result(10.0, "ms"),
+        "train": result(1000.0, "samples/s", better="higher"),
+        "p99": result(20.0, "ms", gate=False),
+        "new_in_baseline_only": result(1.0, "ms"),
+    }
+    results = {
+        "split": result(16.0, "ms"),
+        "train": result(900.0, "samples/s", better="higher"),
+        "p99": result(80.0, "ms", gate=False),
+        "not_in_baseline": result(5.0, "ms"),
+    }
+
+    rows = {name: (change, regressed) for name, _, _, change, regressed in compare(results, baseline, 0.5)}
+
+    assert set(rows) == {"split", "train", "p99"}
+    assert rows["split"] == (0.6, True)
+    assert abs(rows["train"][0] - 0.1) < 1e-9 and not rows["train"][1]
+    assert rows["p99"] == (3.0, False)
@@ -0,0 +1,52 @@
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import numpy as np
+import pandas as pd
+import torch
+
+from data.price_store import CsvFeed
+from data.process_data import DataCollector
+from src.model.lstm_model import LSTMModel
+from src.utils.features import DEFAULT_FEATURES, build_features, rolling_mean, rolling_std
+
+CSV_PATH = os.path.join(os.path.dirname(__file__), "..", "data", "PETRA_4.csv")
+
+
+def test_rolling_kernels_match_pandas():
+    x = np.random.default_rng(0).normal(size=500)
+    x[0] = np.nan
+    series = pd.Series(x)
+
+    assert np.allclose(rolling_mean(x, 10), series.rolling(10).mean(), equal_nan=True)
+    assert np.allclose(rolling_std(x, 10), series.rolling(10).std(ddof=0), equal_nan=True)
+
+
+def test_build_features_drops_warmup_rows():
+    prices = CsvFeed(CSV_PATH).fetch("PETR4.SA")
+    matrix, offset = build_features(prices, DEFAULT_FEATURES)
+
+    assert matrix.dtype == np.float32 and matrix.flags.c_contiguous
+    assert offset == 10 and matrix.shape == (len(prices) - 10, len(DEFAULT_FEATURES))
+    assert not np.isnan(matrix).any()
+    assert np.allclose(matrix[:, 0], prices["close"].to_numpy()[offset:])
+
+
+def test_collector_shares_one_feature_matrix_across_windows():
+    collector = DataCollector("PETR4.SA", features=DEFAULT_FEATURES)
+    collector.data = CsvFeed(CSV_PATH).fetch("PETR4.SA")
+    matrix = collector.feature_matrix()
+
+    for window in (7, 30):
+        collector.split_data(test_size=0.2, window=window)
+        collector.standard_scale()
+        assert collector.feature_matrix() is matrix
+        assert collector.X_train.shape[1:] == (window, len(DEFAULT_FEATURES))
+        assert np.shares_memory(collector.X_train, collector.X_test)
+
+    model = LSTMModel(input_size=len(DEFAULT_FEATURES), hidden_size=8, num_layers=1, output_size=1, dropout=0.0)
+    out = model(torch.tensor(np.asarray(collector.X_test[:4]), dtype=torch.float32))
+    assert out.shape == (4, 1)
+    assert collector.get_scalers()["features"] == list(DEFAULT_FEATURES)
@@ -0,0 +1,71 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from data.process_data import DataCollector
+from src.model.lstm_model import LSTMModel
+from src.training.incremental import fine_tune, replay_indices
+from src.utils.model_manager import ModelManager
+
+
+def synthetic_data(n):
+    rng = np.random.default_rng(0)
+    dates = pd.bdate_range("2020-01-01", periods=n)
+    close = 30 + np.cumsum(rng.normal(0, 0.3, n))
+    return pd.DataFrame({"date": dates, "close": close})
+
+
+def test_replay_mixes_recent_and_older_windows():
+    indices = replay_indices(1000, recent=10, older=20)
+    assert len(indices) == 30 and len(set(indices)) == 30
+    np.testing.assert_array_equal(indices[-10:], np.arange(990, 1000))
+    assert indices.max() < 1000
+
+
+def test_fine_tune_only_on_bars_after_cutoff(tmp_path):
+    data = synthetic_data(400)
+    features = ["close", "return_1"]
+    collector = DataCollector("TEST", features=features)
+    collector.data = data.iloc[:300]
+    collector.split_data(test_size=0.2, window=10)
+    collector.standard_scale()
+    scalers = collector.get_scalers()
+    cutoff = collector.train_cutoff()
+
+    model_args = {"input_size": 2, "hidden_size": 8, "num_layers": 1, "output_size": 1, "dropout": 0.0}
+    path = str(tmp_path / "model.pth")
+    ModelManager.save_model(LSTMModel(**model_args), path, model_args, scalers, training_info={"cutoff": cutoff})
+    info = ModelManager.load_training_info(path)
+    assert pd.Timestamp(info["cutoff"]) == cutoff
+
+    model = ModelManager.load_model(LSTMModel, path)
+    candidate, result = fine_tune(model, data, scalers, info["cutoff"], epochs=2, val_size=20)
+    assert candidate is not None
+    # 400 linhas -> 1 de aquecimento das features, 10 de janela: 389 janelas, 20 de validação
+    assert result["new_cutoff"] == data["date"].iloc[379]
+    assert result["new_windows"] == 369 - (collector.y_train.shape[0])
+    assert {"rmse", "mae"} <= set(result["before"]) and {"rmse", "mae"} <= set(result["after"])
+
+    # Sem barras novas depois do novo corte, nada é treinado
+    candidate, result = fine_tune(model, data, scalers, result["new_cutoff"], epochs=2, val_size=20)
+    assert candidate is None and result["new_windows"] == 0
+
+
+def test_fine_tune_leaves_horizon_gap_before_validation():
+    data = synthetic_data(200)
+    collector = DataCollector("TEST")
+    collector.data = data.iloc[:150]
+    collector.split_data(test_size=0.2, window=10, horizon=3)
+    collector.standard_scale()
+    scalers = collector.get_scalers()
+
+    model = LSTMModel(input_size=1, hidden_size=8, num_layers=1, output_size=3, dropout=0.0)
+    _, result = fine_tune(model, data, scalers, collector.train_cutoff(), epochs=1, val_size=20)
+    # 200 linhas -> 188 janelas, validação a partir da 168; o último target de treino
+    # (janela 165, barras 175..177) fica antes do 1º target da validação (barra 178)
+    assert result["new_cutoff"] == data["date"].iloc[177]
+    assert result["new_cutoff"] < data["date"].iloc[168 + 10]
@@ -0,0 +1,22 @@
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.utils.instrumentation import Histogram
+
+
+def test_histogram_renders_cumulative_buckets_per_label():
+    histogram = Histogram("test_seconds", "Test histogram", (0.1, 1.0), ("stage",))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value, stage="forward")
+    histogram.observe(0.2, stage="load")
+
+    lines = histogram.render()
+
+    assert 'test_seconds_bucket{stage="forward",le="0.1"} 2' in lines
+    assert 'test_seconds_bucket{stage="forward",le="1.0"} 3' in lines
+    assert 'test_seconds_bucket{stage="forward",le="+Inf"} 4' in lines
+    assert 'test_seconds_count{stage="forward"} 4' in lines
+    assert 'test_seconds_bucket{stage="load",le="1.0"} 1' in lines
+    assert histogram.summary()["forward"]["count"] == 4
@@ -0,0 +1,62 @@
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import numpy as np
+import torch
+
+from src.model.lstm_model import LSTMModel
+from src.training.train import evaluate_model
+from src.utils.dataset import TimeSeriesDataset
+from src.utils.metrics import compute_metrics, directional_accuracy, mean_absolute_percentage_error
+from src.utils.windows import make_windows
+
+
+def test_batched_evaluate_matches_per_sample_forward():
+    torch.manual_seed(0)
+    # Multi-horizonte e N (43) que não é múltiplo do batch_size
+    closes = np.sin(np.arange(50, dtype=np.float32) / 5)
+    X, y = make_windows(closes, window=5, horizon=3)
+    dataset = TimeSeriesDataset(X, y)
+    model = LSTMModel(input_size=1, hidden_size=8, num_layers=1, output_size=3, dropout=0.0)
+
+    predictions, actuals = evaluate_model(model, dataset, batch_size=8)
+
+    assert len(dataset) % 8 != 0
+    assert predictions.shape == actuals.shape == (len(dataset), 3)
+    with torch.no_grad():
+        expected = np.vstack([model(dataset[i][0].unsqueeze(0)).numpy() for i in range(len(dataset))])
+    np.testing.assert_allclose(predictions, expected, atol=1e-6)
+    np.testing.assert_array_equal(actuals, np.asarray(y, dtype=np.float32))
+
+
+def test_mape_known_values():
+    # |10-11|/10 = 10%, |20-18|/20 = 10%, |40-40|/40 = 0%
+    y_true = np.array([10.0, 20.0, 40.0])
+    y_pred = np.array([11.0, 18.0, 40.0])
+    assert np.isclose(mean_absolute_percentage_error(y_true, y_pred), 20.0 / 3)
+
+
+def test_directional_accuracy_known_values():
+    # Real: sobe, cai, sobe; a predição acerta a primeira e a terceira direção
+    y_true = np.array([10.0, 11.0, 10.0, 12.0])
+    y_pred = np.array([0.0, 12.0, 11.5, 13.0])
+    assert np.isclose(directional_accuracy(y_true, y_pred), 2 / 3)
+    # Multi-horizonte usa só o primeiro passo
+    y_pred_h = np.column_stack([y_pred, -y_pred])
+    assert np.isclose(directional_accuracy(y_true, y_pred_h), 2 / 3)
+    assert np.isnan(directional_accuracy(y_true[:1], y_pred[:1]))
+
+
+def test_compute_metrics_reports_rmse_per_horizon_step():
+    y_true = np.array([[1.0, 2.0], [3.0, 4.0]])
+    y_pred = np.array([[2.0, 2.0], [3.0, 7.0]])
+
+    metrics = compute_metrics(y_true, y_pred)
+
+    # Passo 1: erros (1, 0) -> sqrt(0.5); passo 2: erros (0, 3) -> sqrt(4.5)
+    assert np.isclose(metrics["rmse_h1"], np.sqrt(0.5))
+    assert np.isclose(metrics["rmse_h2"], np.sqrt(4.5))
+    assert np.isclose(metrics["rmse"], np.sqrt(10 / 4))
+    assert "rmse_h1" not in compute_metrics(y_true[:, :1], y_pred[:, :1])
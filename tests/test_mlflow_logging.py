@@ -0,0 +1,35 @@
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.utils.mlflow_logging import promote_if_better
+
+
+def test_promote_if_better_skips_champion_without_metric(tmp_path, capsys):
+    import mlflow
+    from mlflow import MlflowClient
+
+    mlflow.set_tracking_uri(f"file://{tmp_path}/mlruns")
+    mlflow.set_experiment("test")
+    client = MlflowClient()
+    client.create_registered_model("m")
+
+    def version(metrics):
+        with mlflow.start_run() as run:
+            mlflow.log_metrics(metrics)
+        return client.create_model_version("m", f"{run.info.artifact_uri}/model", run.info.run_id).version
+
+    # Campeão antigo sem val_rmse (só RMSE): não há com o que comparar
+    legacy = version({"RMSE": 0.1})
+    client.set_registered_model_alias("m", "champion", legacy)
+    candidate = version({"val_rmse": 1.0})
+    assert not promote_if_better("m", candidate, "val_rmse", 1.0)
+    assert "has no 'val_rmse' metric" in capsys.readouterr().out
+    assert client.get_model_version_by_alias("m", "champion").version == legacy
+
+    client.set_registered_model_alias("m", "champion", candidate)
+    assert not promote_if_better("m", version({"val_rmse": 1.5}), "val_rmse", 1.5)
+    better = version({"val_rmse": 0.5})
+    assert promote_if_better("m", better, "val_rmse", 0.5)
+    assert client.get_model_version_by_alias("m", "champion").version == better
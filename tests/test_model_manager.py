@@ -0,0 +1,124 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+import torch
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from data.price_store import CsvFeed, PriceStore
+from data.process_data import DataCollector
+from src.model.lstm_model import LSTMModel
+from src.serving.pipeline import build_input
+from src.utils.model_manager import ModelManager
+
+CSV_PATH = os.path.join(os.path.dirname(__file__), "..", "data", "PETRA_4.csv")
+
+
+def test_mmap_load_matches_copy(tmp_path):
+    model_args = {"input_size": 2, "hidden_size": 8, "num_layers": 2, "output_size": 3, "dropout": 0.0}
+    path = str(tmp_path / "model.pth")
+    ModelManager.save_model(LSTMModel(**model_args), path, model_args)
+    assert not os.path.exists(path + ".tmp")
+
+    copied = ModelManager.load_model(LSTMModel, path).cpu()
+    mapped = ModelManager.load_model(LSTMModel, path, mmap=True)
+    x = torch.randn(4, 10, 2)
+    with torch.no_grad():
+        assert torch.equal(copied(x), mapped(x))
+
+    # Os pesos vêm do arquivo mapeado, não de uma cópia alocada pelo módulo
+    with open(f"/proc/{os.getpid()}/maps") as f:
+        assert path in f.read()
+
+
+def test_save_model_replaces_weights_last(tmp_path, monkeypatch):
+    # O watcher do registry recarrega quando o mtime do .pth muda: os arquivos
+    # auxiliares precisam já estar no lugar nesse momento
+    replaced = []
+    replace = os.replace
+    monkeypatch.setattr(os, "replace", lambda src, dst: (replaced.append(os.path.basename(dst)), replace(src, dst)))
+
+    model_args = {"input_size": 1, "hidden_size": 4, "num_layers": 1, "output_size": 1, "dropout": 0.0}
+    path = str(tmp_path / "model.pth")
+    ModelManager.save_model(LSTMModel(**model_args), path, model_args, scalers={"window": 5}, training_info={"cutoff": "2024-01-02"})
+
+    assert replaced == ["model_metadata.json", "model_scalers.joblib", "model_training.json", "model.pth"]
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(".tmp")]
+    assert ModelManager.load_scalers(path) == {"window": 5}
+
+
+@pytest.mark.parametrize("features", [None, ["close", "return_1", "volatility_10"]])
+def test_saved_scalers_rebuild_training_inputs(tmp_path, features):
+    full = pd.read_csv(CSV_PATH, parse_dates=["date"])
+    full = full[full["date"] >= "2023-01-01"].reset_index(drop=True)
+    collector = DataCollector("PETR4.SA", features=features)
+    collector.data = full
+    collector.split_data(test_size=0.2, window=10)
+    collector.standard_scale()
+
+    model_args = {"input_size": len(features or ["close"]), "hidden_size": 4, "num_layers": 1, "output_size": 1, "dropout": 0.0}
+    path = str(tmp_path / "model.pth")
+    ModelManager.save_model(LSTMModel(**model_args), path, model_args, collector.get_scalers())
+    scalers = ModelManager.load_scalers(path)
+
+    # Sem a última barra, a janela servida é a última janela de teste do treino
+    csv = str(tmp_path / "serving.csv")
+    full.iloc[:-1].to_csv(csv, index=False)
+    store = PriceStore(feed=CsvFeed(csv), root=str(tmp_path / "store"))
+    input_seq, target_scaler = build_input("PETR4.SA", 10, "2023-01-01", store, scalers)
+
+    expected = np.asarray(collector.X_test[-1], dtype=np.float32).reshape(10, -1)
+    np.testing.assert_allclose(input_seq, expected, rtol=1e-5, atol=1e-5)
+    np.testing.assert_allclose(
+        target_scaler.transform(full["close"].iloc[-1:].to_numpy().reshape(-1, 1)),
+        collector.y_test[-1:].reshape(-1, 1),
+        rtol=1e-5,
+    )
+
+
+def test_mlflow_entry_loads_logged_scalers(tmp_path):
+    import mlflow
+    from sklearn.preprocessing import StandardScaler
+
+    from src.serving.model_registry import ModelRegistry
+
+    mlflow.set_tracking_uri(f"file://{tmp_path}/mlruns")
+    mlflow.set_experiment("test")
+    scalers = {
+        "feature": StandardScaler().fit(np.random.rand(20, 2)),
+        "target": StandardScaler().fit(np.random.rand(20, 1)),
+        "window": 5,
+        "horizon": 1,
+        "features": ["close", "return_1"],
+    }
+    client = mlflow.MlflowClient()
+    for alias, log_scalers in (("champion", True), ("legacy", False)):
+        with mlflow.start_run():
+            if log_scalers:
+                ModelManager.log_scalers_mlflow(scalers)
+            info = mlflow.pytorch.log_model(LSTMModel(2, 4, 1, 1), artifact_path="model", registered_model_name="lstm")
+        client.set_registered_model_alias("lstm", alias, info.registered_model_version)
+
+    registry = ModelRegistry(LSTMModel)
+    entry = registry.load_mlflow("champion", "lstm", "champion")
+    assert entry.scalers["features"] == ["close", "return_1"] and entry.scalers["window"] == 5
+
+    # Modelo multi-feature sem scalers na run: falha no load, não no 1º request
+    with pytest.raises(ValueError, match="expects 2 features"):
+        registry.load_mlflow("legacy", "lstm", "legacy")
+
+
+@pytest.mark.parametrize("suffix,quantize,atol", [(".pt", False, 1e-4), (".onnx", False, 1e-4), (".pt", True, 5e-2)])
+def test_exported_model_matches_eager(tmp_path, suffix, quantize, atol):
+    torch.manual_seed(0)
+    model = LSTMModel(input_size=3, hidden_size=16, num_layers=2, output_size=2, dropout=0.0).eval()
+    path = str(tmp_path / f"model{suffix}")
+    ModelManager.export_model(model, path, torch.randn(1, 10, 3), quantize=quantize)
+
+    exported = ModelManager.load_exported(path)
+    # Batch diferente do exemplo usado na exportação
+    parity = ModelManager.check_parity(model, exported, torch.randn(64, 10, 3), atol=atol)
+    assert parity["ok"], parity
@@ -0,0 +1,89 @@
+import os
+import sys
+import time
+
+import torch
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.model.lstm_model import LSTMModel
+from src.serving.model_registry import ModelRegistry
+from src.utils.model_manager import ModelManager
+
+MODEL_ARGS = {"input_size": 1, "hidden_size": 4, "num_layers": 1, "output_size": 1, "dropout": 0.0}
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+def loaded(registry, name):
+    try:
+        registry.get(name)
+        return True
+    except KeyError:
+        return False
+
+
+def save(path, seed, mtime):
+    torch.manual_seed(seed)
+    ModelManager.save_model(LSTMModel(**MODEL_ARGS), path, MODEL_ARGS)
+    # mtime explícito: a versão do arquivo é o st_mtime_ns
+    os.utime(path, ns=(mtime, mtime))
+
+
+def test_refresh_hot_swaps_without_touching_inflight_entry(tmp_path):
+    registry = ModelRegistry(LSTMModel)
+    path = str(tmp_path / "model.pth")
+    save(path, seed=0, mtime=1_000_000_000)
+    swaps = []
+    registry.on_swap(lambda name, previous, entry: swaps.append((name, previous.version, entry.version)))
+
+    old = registry.load("champion", path)
+    x = torch.randn(2, 5, 1)
+    with torch.no_grad():
+        before = old.model(x)
+
+    registry.refresh()
+    assert registry.get("champion") is old and swaps == []
+
+    save(path, seed=1, mtime=2_000_000_000)
+    registry.refresh()
+    new = registry.get("champion")
+    assert new is not old and swaps == [("champion", old.version, new.version)]
+    # Um request que já pegou a entry antiga continua com o modelo antigo
+    with torch.no_grad():
+        assert torch.equal(old.model(x), before)
+        assert not torch.equal(new.model(x), before)
+
+    # Artefato quebrado: o refresh falha e o modelo atual segue servindo
+    with open(path, "wb") as f:
+        f.write(b"not a checkpoint")
+    os.utime(path, ns=(3_000_000_000, 3_000_000_000))
+    registry.refresh()
+    assert registry.get("champion") is new
+
+
+def test_watcher_loads_model_missing_at_startup(tmp_path):
+    registry = ModelRegistry(LSTMModel)
+    path = str(tmp_path / "challenger.pth")
+
+    def retry():
+        if not loaded(registry, "challenger"):
+            registry.load("challenger", path)
+
+    registry.on_refresh(retry)
+    registry.start_watcher(interval=0.05)
+    try:
+        # Arquivo ainda não existe: o listener falha e o watcher segue vivo
+        time.sleep(0.2)
+        assert not loaded(registry, "challenger")
+        ModelManager.save_model(LSTMModel(**MODEL_ARGS), path, MODEL_ARGS)
+        assert wait_for(lambda: loaded(registry, "challenger"))
+    finally:
+        registry.stop_watcher()
@@ -0,0 +1,41 @@
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.serving.prediction_cache import PredictionCache, prediction_key
+
+
+def test_lru_counters_and_ticker_invalidation():
+    cache = PredictionCache(max_items=2)
+    a = prediction_key("A", 30, "2024-01-01", "v1", "2024-06-03")
+    b = prediction_key("B", 30, "2024-01-01", "v1", "2024-06-03")
+    c = prediction_key("C", 30, "2024-01-01", "v1", "2024-06-03")
+
+    assert cache.get(a) is None
+    cache.put(a, "A", {"stock": "A", "predicted_value": 1.0})
+    cache.put(b, "B", {"stock": "B", "predicted_value": 2.0})
+    assert cache.get(a) == {"stock": "A", "predicted_value": 1.0}
+    cache.put(c, "C", {"stock": "C", "predicted_value": 3.0})
+
+    # B era o menos usado
+    assert cache.get(b) is None
+    cache.invalidate("A")
+    assert cache.get(a) is None
+    assert cache.get(c) is not None
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["evictions"]) == (2, 3, 1)
+
+
+def test_disk_tier_is_shared_between_instances(tmp_path):
+    path = str(tmp_path / "predictions.db")
+    key = prediction_key("A", 30, "2024-01-01", "v1", "2024-06-03")
+    writer, reader = PredictionCache(path=path), PredictionCache(path=path)
+
+    writer.put(key, "A", {"stock": "A", "predicted_value": 1.0})
+    assert reader.get(key) == {"stock": "A", "predicted_value": 1.0}
+    assert reader.stats()["disk_hits"] == 1
+
+    writer.invalidate()
+    assert PredictionCache(path=path).get(key) is None
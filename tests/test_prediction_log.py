@@ -0,0 +1,48 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.serving.prediction_log import PredictionLog, closed_segments, compact, input_hash
+
+
+def test_log_rotation_and_daily_compaction(tmp_path):
+    log = PredictionLog(str(tmp_path / "log"), batch_size=8, flush_interval=0.05, max_bytes=2_000)
+    log.start()
+    window = np.arange(30, dtype=np.float32).reshape(30, 1)
+    for i in range(40):
+        log.log({
+            # Dois dias distintos (UTC)
+            "ts": 1_717_000_000.0 + (i % 2) * 86_400,
+            "stock": "PETR4.SA",
+            "model_version": "v1",
+            "input_hash": input_hash(window),
+            "predicted_path": [30.0 + i],
+            "latency": {"fetch_s": 0.01, "forward_s": 0.002},
+        })
+    log.stop()
+
+    stats = log.stats()
+    assert stats["written"] == 40 and stats["dropped"] == 0
+    segments = closed_segments(str(tmp_path / "log"))
+    assert len(segments) == stats["segments_closed"] > 1
+
+    summary = compact(str(tmp_path / "log"), str(tmp_path / "parquet"))
+    assert summary["records"] == 40
+    assert sorted(os.listdir(tmp_path / "parquet")) == ["date=2024-05-29", "date=2024-05-30"]
+    assert closed_segments(str(tmp_path / "log")) == []
+
+    frame = pd.read_parquet(tmp_path / "parquet")
+    assert len(frame) == 40
+    assert {"latency_fetch_s", "latency_forward_s", "input_hash"} <= set(frame.columns)
+
+
+def test_full_queue_drops_instead_of_blocking(tmp_path):
+    # Sem start(): nada consome a fila
+    log = PredictionLog(str(tmp_path), max_queue=2)
+    for i in range(5):
+        log.log({"ts": 0.0, "i": i})
+    assert (log.logged, log.dropped) == (2, 3)
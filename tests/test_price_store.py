@@ -0,0 +1,107 @@
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pandas as pd
+
+from data.price_store import CsvFeed, PriceStore
+from data.process_data import DataCollector
+
+CSV_PATH = os.path.join(os.path.dirname(__file__), "..", "data", "PETRA_4.csv")
+
+
+class RecordingFeed:
+    # Stub que serve o CSV até `cutoff` e registra os starts pedidos
+    def __init__(self, cutoff):
+        self.feed = CsvFeed(CSV_PATH)
+        self.cutoff = pd.to_datetime(cutoff)
+        self.starts = []
+
+    def fetch(self, ticker, start=None):
+        self.starts.append(start)
+        data = self.feed.fetch(ticker, start=start)
+        return data[data["date"] <= self.cutoff].reset_index(drop=True)
+
+
+def test_get_range_matches_pandas_filter(tmp_path):
+    store = PriceStore(feed=CsvFeed(CSV_PATH), root=str(tmp_path))
+    full = pd.read_csv(CSV_PATH, parse_dates=["date"])
+
+    result = store.get_range("PETR4.SA", "2020-01-01", "2020-06-30")
+    expected = full[(full["date"] >= "2020-01-01") & (full["date"] <= "2020-06-30")]
+
+    assert result["close"].tolist() == expected["close"].tolist()
+    assert os.path.exists(tmp_path / "PETR4.SA.parquet")
+
+
+def test_refresh_fetches_only_missing_tail(tmp_path):
+    feed = RecordingFeed("2023-12-29")
+    PriceStore(feed=feed, root=str(tmp_path)).history("PETR4.SA")
+
+    feed.cutoff = pd.to_datetime("2024-06-28")
+    store = PriceStore(feed=feed, root=str(tmp_path), ttl=0)
+    data = store.history("PETR4.SA")
+
+    assert feed.starts[0] is None
+    assert feed.starts[1] == pd.to_datetime("2023-12-28")
+    assert data["date"].is_monotonic_increasing
+    assert not data["date"].duplicated().any()
+    assert data["date"].iloc[-1] == pd.to_datetime("2024-06-28")
+
+
+def test_memory_layer_serves_within_ttl(tmp_path):
+    feed = RecordingFeed("2024-12-31")
+    store = PriceStore(feed=feed, root=str(tmp_path), ttl=60)
+    store.history("PETR4.SA")
+    store.history("PETR4.SA")
+
+    assert len(feed.starts) == 1
+    assert store.hits == 1 and store.misses == 1
+
+
+def test_collector_reads_through_store(tmp_path):
+    store = PriceStore(feed=CsvFeed(CSV_PATH), root=str(tmp_path))
+    collector = DataCollector("PETR4.SA", store=store)
+    collector.get_data(start_date="2024-01-01")
+
+    assert collector.data["date"].iloc[0] >= pd.to_datetime("2024-01-01")
+
+
+def test_on_update_fires_only_when_last_bar_changes(tmp_path):
+    feed = RecordingFeed("2023-12-29")
+    store = PriceStore(feed=feed, root=str(tmp_path), ttl=0)
+    updates = []
+    store.on_update(lambda ticker, last_date: updates.append((ticker, last_date)))
+
+    store.history("PETR4.SA")
+    store.history("PETR4.SA")
+    feed.cutoff = pd.to_datetime("2024-06-28")
+    store.history("PETR4.SA")
+
+    assert updates == [("PETR4.SA", pd.to_datetime("2024-06-28"))]
+    assert store.fresh_last_date("PETR4.SA") is None
+
+
+class EmptyTailFeed:
+    # Histórico completo na 1ª busca; depois o feed "rate limited" devolve frame vazio
+    def __init__(self):
+        self.feed = CsvFeed(CSV_PATH)
+
+    def fetch(self, ticker, start=None):
+        data = self.feed.fetch(ticker)
+        if start is None:
+            return data.iloc[:5]
+        return data.iloc[:0]
+
+
+def test_empty_tail_keeps_cached_bars(tmp_path):
+    store = PriceStore(feed=EmptyTailFeed(), root=str(tmp_path), ttl=0)
+    updates = []
+    store.on_update(lambda ticker, last_date: updates.append(last_date))
+
+    lengths = [len(store.history("PETR4.SA")) for _ in range(3)]
+
+    assert lengths == [5, 5, 5]
+    assert updates == []
+    assert len(pd.read_parquet(tmp_path / "PETR4.SA.parquet")) == 5
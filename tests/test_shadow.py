@@ -0,0 +1,44 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import StandardScaler
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.serving.shadow import ShadowTracker, input_adapter
+
+
+def test_input_adapter_matches_challenger_scaling():
+    rng = np.random.default_rng(0)
+    rows = rng.normal(30, 5, size=(200, 3))
+    features = ["close", "return_1", "volatility_10"]
+    champion = {"feature": StandardScaler().fit(rows[:100]), "window": 7, "features": features}
+    challenger = {"feature": StandardScaler().fit(rows[50:]), "window": 7, "features": features}
+
+    window = rows[-7:]
+    adapt = input_adapter(champion, challenger)
+    adapted = adapt(champion["feature"].transform(window).astype(np.float32))
+    assert np.allclose(adapted, challenger["feature"].transform(window), atol=1e-5)
+
+
+def test_tracker_waits_for_settled_bar_and_promotes():
+    tracker = ShadowTracker(min_samples=2, margin=0.1)
+    dates = pd.bdate_range("2024-06-03", periods=4)
+    closes = [10.0, 11.0, 12.0, 13.0]
+
+    tracker.record("A", dates[0], champion=10.0, challenger=11.0)
+    tracker.record("A", dates[0], champion=0.0, challenger=0.0)  # mesma barra: ignorada
+    # A barra seguinte (dates[1]) ainda é a última e pode ser revista
+    assert tracker.resolve("A", pd.DataFrame({"date": dates[:2], "close": closes[:2]})) == 0
+
+    tracker.record("A", dates[1], champion=11.0, challenger=12.5)
+    assert tracker.resolve("A", pd.DataFrame({"date": dates, "close": closes})) == 2
+    errors = tracker.errors()
+    assert errors["champion"]["samples"] == errors["challenger"]["samples"] == 2
+    assert errors["challenger"]["rmse"] < errors["champion"]["rmse"]
+    assert tracker.should_promote()
+
+    tracker.reset("v2")
+    assert not tracker.should_promote()
@@ -0,0 +1,79 @@
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import numpy as np
+import torch
+from sklearn.preprocessing import StandardScaler
+
+from src.model.lstm_model import LSTMModel
+from src.serving.streaming import SessionStore, StreamingSession
+from src.utils.windows import make_windows
+
+
+def make_scalers(closes, window):
+    X, y = make_windows(closes, window)
+    return {
+        "feature": StandardScaler().fit(X),
+        "target": StandardScaler().fit(y),
+        "window": window,
+    }
+
+
+def test_session_warm_start_matches_windowed_forward():
+    torch.manual_seed(0)
+    closes = np.cumsum(np.random.default_rng(0).normal(size=200)) + 50
+    scalers = make_scalers(closes, window=10)
+    model = LSTMModel(input_size=1, hidden_size=8, num_layers=2, output_size=1, dropout=0.0).eval()
+
+    session = StreamingSession(model, scalers, closes)
+
+    scaled = scalers["feature"].transform(closes[-10:].reshape(1, 10))
+    with torch.no_grad():
+        out = model(torch.tensor(scaled.reshape(1, 10, 1), dtype=torch.float32))
+    expected = scalers["target"].inverse_transform(out.numpy())[0, 0]
+    assert np.isclose(session.last_prediction, expected, atol=1e-5)
+
+    # Um passo com resync a cada barra equivale a refazer a janela inteira
+    session.resync_every = 1
+    streamed = session.update(closes[-1] + 1.0)
+    assert list(session.buffer)[-1] == closes[-1] + 1.0
+    scaled = scalers["feature"].transform(np.asarray(session.buffer).reshape(1, 10))
+    with torch.no_grad():
+        out = model(torch.tensor(scaled.reshape(1, 10, 1), dtype=torch.float32))
+    assert np.isclose(streamed, scalers["target"].inverse_transform(out.numpy())[0, 0], atol=1e-5)
+
+
+def test_session_steps_stay_close_to_windowed_forward():
+    torch.manual_seed(0)
+    closes = np.cumsum(np.random.default_rng(0).normal(size=300)) + 50
+    scalers = make_scalers(closes[:200], window=10)
+    model = LSTMModel(input_size=1, hidden_size=8, num_layers=2, output_size=1, dropout=0.0).eval()
+
+    def windowed(buffer):
+        scaled = scalers["feature"].transform(np.asarray(buffer).reshape(1, 10))
+        with torch.no_grad():
+            out = model(torch.tensor(scaled.reshape(1, 10, 1), dtype=torch.float32))
+        return scalers["target"].inverse_transform(out.numpy())[0, 0]
+
+    def deviations(session):
+        return np.array([abs(session.update(close) - windowed(session.buffer)) for close in closes[200:]])
+
+    # Padrão limitado: os passos de 1 barra (sem replay) ficam perto do forward com janela
+    bounded = deviations(StreamingSession(model, scalers, closes[:200]))
+    unbounded = deviations(StreamingSession(model, scalers, closes[:200], resync_every=None))
+    assert bounded.max() < 0.03
+    assert bounded.mean() < unbounded.mean() / 2
+
+
+def test_session_store_evicts_least_recently_used():
+    store = SessionStore(max_sessions=2)
+    store.put("A", "a")
+    store.put("B", "b")
+    store.get("A")
+    store.put("C", "c")
+
+    assert store.get("B") is None
+    assert store.get("A") == "a"
+    assert store.evictions == 1
@@ -0,0 +1,65 @@
+import os
+import sys
+import threading
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from data.process_data import DataCollector
+from src.training import sweep
+from src.training.sweep import MedianPruner, build_window_data, expand_space, run_trial
+
+
+def test_expand_space_grid_and_sample():
+    space = {"hidden_size": [8, 16], "num_layers": [1, 2, 3], "lr": [0.01]}
+    grid = expand_space(space)
+    assert len(grid) == 6 and {"hidden_size": 16, "num_layers": 3, "lr": 0.01} in grid
+
+    sample = expand_space(space, n_trials=3, seed=1)
+    assert len(sample) == 3 and all(params in grid for params in sample)
+    assert sample == expand_space(space, n_trials=3, seed=1)
+
+
+def test_median_pruner_compares_with_other_trials_at_checkpoints():
+    pruner = MedianPruner({}, threading.Lock(), warmup=10, every=5, min_trials=2)
+    # Antes do warmup e fora das épocas de checagem nada é podado nem registrado
+    assert not pruner.should_prune(5, 100.0)
+    assert not pruner.should_prune(12, 100.0)
+    assert pruner.reports == {}
+
+    # Poucos trials reportados ainda: não poda
+    assert not pruner.should_prune(10, 1.0)
+    assert not pruner.should_prune(10, 3.0)
+    # Mediana de [1, 3] = 2
+    assert pruner.should_prune(10, 2.5)
+    assert not pruner.should_prune(10, 1.5)
+    assert pruner.reports[10] == [1.0, 3.0, 2.5, 1.5]
+
+
+def test_run_trial_in_process_on_shared_memory(monkeypatch):
+    monkeypatch.setattr(sweep, "_pruner", None)
+    rng = np.random.default_rng(0)
+    collector = DataCollector("TEST")
+    collector.data = pd.DataFrame({
+        "date": pd.bdate_range("2020-01-01", periods=300),
+        "close": 30 + np.cumsum(rng.normal(0, 0.3, 300)),
+    })
+
+    blocks, data = build_window_data(collector, [10], horizon=2)
+    try:
+        params = {"hidden_size": 8, "num_layers": 1, "window": 10, "lr": 0.01, "dropout": 0.0}
+        result = run_trial(0, params, data[10], num_epochs=3, batch_size=64, patience=None)
+    finally:
+        for block in blocks:
+            block.close()
+            block.unlink()
+
+    shapes = {name: descriptor[1] for name, descriptor in data[10]["arrays"].items()}
+    # 300 linhas -> 289 janelas; 231 de treino, das quais 23 de validação e 1 de gap
+    assert shapes["X_train"][0] == 207 and shapes["X_val"][0] == 23 and shapes["X_test"][0] == 58
+    assert result["epochs"] == 3 and not result["pruned"]
+    assert result["model_args"]["output_size"] == 2
+    assert {"val_rmse", "test_rmse", "val_mae", "test_mae"} <= set(result["metrics"])
+    assert result["metrics"]["val_rmse"] != result["metrics"]["test_rmse"]
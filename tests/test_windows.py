@@ -0,0 +1,102 @@
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import numpy as np
+import pandas as pd
+import torch
+
+from data.process_data import DataCollector
+from src.training.train import _dataset_tensors
+from src.utils.dataset import TimeSeriesDataset
+from src.utils.windows import make_windows, split_validation
+
+
+def test_windows_match_python_loop():
+    closes = np.arange(100, dtype=np.float64)
+    X, y = make_windows(closes, window=7)
+
+    X_loop = np.array([closes[i - 7 : i] for i in range(7, len(closes))])
+    y_loop = np.array([closes[i] for i in range(7, len(closes))])
+
+    np.testing.assert_array_equal(X, X_loop)
+    np.testing.assert_array_equal(y[:, 0], y_loop)
+    assert np.shares_memory(X, closes) and np.shares_memory(y, closes)
+
+
+def test_multi_feature_and_horizon():
+    series = np.arange(60, dtype=np.float32).reshape(30, 2)
+    X, y = make_windows(series, window=5, horizon=3, target=1)
+
+    assert X.shape == (23, 5, 2)
+    assert y.shape == (23, 3)
+    np.testing.assert_array_equal(X[4], series[4:9])
+    np.testing.assert_array_equal(y[4], series[9:12, 1])
+    assert np.shares_memory(X, series)
+
+
+def test_split_data_keeps_views():
+    collector = DataCollector("TEST")
+    collector.data = pd.DataFrame({"close": np.linspace(1.0, 2.0, 200)})
+    collector.split_data(test_size=0.1, window=20)
+
+    assert collector.X_train.shape == (162, 20)
+    assert collector.X_test.shape == (18, 20)
+    assert collector.y_test.shape == (18,)
+    assert np.shares_memory(collector.X_train, collector.X_test)
+
+
+def test_dataset_indexes_view_lazily():
+    closes = np.arange(50, dtype=np.float64)
+    X, y = make_windows(closes, window=10)
+    dataset = TimeSeriesDataset(X, y)
+
+    x_item, y_item = dataset[3]
+    assert len(dataset) == 40
+    assert tuple(x_item.shape) == (10, 1)
+    assert tuple(y_item.shape) == (1,)
+    assert float(y_item[0]) == 13.0
+
+
+def test_split_data_builds_horizon_targets():
+    collector = DataCollector("TEST")
+    collector.data = pd.DataFrame({"close": np.arange(100, dtype=np.float64)})
+    collector.split_data(test_size=0.2, window=10, horizon=5)
+    collector.standard_scale()
+
+    assert collector.y_train.shape == (68, 5)
+    assert collector.y_test.shape == (18, 5)
+    # Um único target scaler para todos os passos: o caminho volta para os closes seguintes
+    path = collector.target_scaler.inverse_transform(collector.y_test[:1].reshape(-1, 1))[:, 0]
+    np.testing.assert_allclose(path, np.arange(78, 83))
+    assert collector.get_scalers()["horizon"] == 5
+
+
+def test_dataset_tensors_unfold_base_series():
+    series = np.arange(90, dtype=np.float64).reshape(30, 3)
+    X, y = make_windows(series, window=5, horizon=2)
+    X_t, y_t = _dataset_tensors(TimeSeriesDataset(X[:20], y[:20]), torch.device("cpu"))
+
+    # Só as 24 linhas da série base são copiadas; as janelas são uma view sobre elas
+    assert tuple(X_t.shape) == (20, 5, 3) and X_t.dtype == torch.float32
+    assert X_t.untyped_storage().nbytes() == 24 * 3 * 4
+    np.testing.assert_array_equal(X_t[[3, 7]].numpy(), X[[3, 7]])
+    np.testing.assert_array_equal(y_t.numpy(), y[:20])
+
+    # Janelas materializadas (close-only escalado por posição) seguem o caminho antigo
+    closes_X, closes_y = make_windows(np.arange(40, dtype=np.float64), window=6)
+    X_t, _ = _dataset_tensors(TimeSeriesDataset(closes_X * 2.0, closes_y), torch.device("cpu"))
+    np.testing.assert_array_equal(X_t[..., 0].numpy(), closes_X * 2.0)
+
+
+def test_split_validation_takes_tail_of_training_windows_with_gap():
+    series = np.arange(60, dtype=np.float64)
+    X, y = make_windows(series, window=5, horizon=3)
+    X_fit, X_val, y_fit, y_val = split_validation(X[:40], y[:40], val_size=0.25, gap=2)
+
+    assert len(X_val) == 10 and len(X_fit) == 28
+    np.testing.assert_array_equal(X_val[0], X[30])
+    # Os targets de treino terminam antes do 1º target da validação
+    assert y_fit[-1, -1] < y_val[0, 0]
+    assert np.shares_memory(X_fit, X)